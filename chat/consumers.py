@@ -0,0 +1,192 @@
+import json
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+
+"""
+ChatConsumer mantiene el WebSocket de una conversación.
+
+Cada conexión se une al grupo chat_<id_conversation>, de modo que los mensajes,
+acuses de lectura e indicadores de escritura llegan a todos los participantes
+conectados sin que el cliente tenga que consultar la API REST.
+
+Autenticación: usuario de la sesión (AuthMiddlewareStack) o el access token JWT
+en el query string (?token=<access>). Solo los participantes pueden conectarse.
+
+Mensajes que acepta el cliente:
+    - {"type": "send_message", "content": "..."}
+    - {"type": "mark_as_read"}
+    - {"type": "typing", "is_typing": true}
+    - {"type": "sync", "since_id": 123}   → mensajes con id mayor a since_id
+
+Eventos que envía el servidor:
+    - message, read_receipt, typing, sync, error
+"""
+
+
+class ChatConsumer(AsyncWebsocketConsumer):
+    """
+    WebSocket consumer para el chat en tiempo real de una conversación.
+    """
+
+    async def connect(self):
+        """
+        Autentica al usuario, verifica que participe de la conversación
+        y se une al grupo de la conversación.
+        """
+        from .services import chat_service
+
+        self.conversation_id = int(self.scope['url_route']['kwargs']['conversation_id'])
+        self.group_name = chat_service.group_name(self.conversation_id)
+
+        self.user = await self.get_user()
+        if self.user is None or not await self.is_participant(self.user, self.conversation_id):
+            await self.close()
+            return
+
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+        await self.send(text_data=json.dumps({
+            'type': 'connection_established',
+            'conversation_id': self.conversation_id,
+        }))
+
+    async def disconnect(self, close_code):
+        """
+        Sale del grupo de la conversación.
+        """
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def receive(self, text_data):
+        """
+        Recibe acciones del cliente (send_message, mark_as_read, typing, sync).
+        """
+        try:
+            data = json.loads(text_data)
+        except json.JSONDecodeError:
+            await self.send_error('Invalid JSON')
+            return
+
+        message_type = data.get('type')
+
+        if message_type == 'send_message':
+            content = (data.get('content') or '').strip()
+            if not content:
+                await self.send_error('content es requerido')
+                return
+            await self.send_message(content)
+
+        elif message_type == 'mark_as_read':
+            await self.mark_as_read()
+
+        elif message_type == 'typing':
+            await self.channel_layer.group_send(self.group_name, {
+                'type': 'chat_typing',
+                'user_id': self.user.id_user,
+                'is_typing': bool(data.get('is_typing', True)),
+            })
+
+        elif message_type == 'sync':
+            try:
+                since_id = int(data.get('since_id') or 0)
+            except (TypeError, ValueError):
+                await self.send_error('since_id inválido')
+                return
+            messages, has_more = await self.messages_since(since_id)
+            await self.send(text_data=json.dumps({
+                'type': 'sync',
+                'messages': messages,
+                'has_more': has_more,
+            }))
+
+        else:
+            await self.send_error(f'Tipo de mensaje no soportado: {message_type}')
+
+    async def send_error(self, message):
+        await self.send(text_data=json.dumps({
+            'type': 'error',
+            'message': message
+        }))
+
+    # ====================================================
+    # Eventos del grupo de la conversación
+    # ====================================================
+    async def chat_message(self, event):
+        """Envía al cliente un mensaje nuevo"""
+        await self.send(text_data=json.dumps({
+            'type': 'message',
+            'message': event['message'],
+        }))
+
+    async def chat_read(self, event):
+        """Envía el acuse de lectura de otro participante"""
+        await self.send(text_data=json.dumps({
+            'type': 'read_receipt',
+            'reader_id': event['reader_id'],
+            'last_read_id': event['last_read_id'],
+        }))
+
+    async def chat_typing(self, event):
+        """Envía el indicador de escritura (no se reenvía a quien escribe)"""
+        if event['user_id'] == self.user.id_user:
+            return
+        await self.send(text_data=json.dumps({
+            'type': 'typing',
+            'user_id': event['user_id'],
+            'is_typing': event['is_typing'],
+        }))
+
+    # ====================================================
+    # Métodos auxiliares sincronizados a la base de datos
+    # ====================================================
+    @database_sync_to_async
+    def get_user(self):
+        """
+        Obtiene el usuario de la sesión o del token JWT (?token=).
+        Devuelve None si no está autenticado.
+        """
+        user = self.scope.get('user')
+        if user is not None and user.is_authenticated:
+            return user
+
+        token = parse_qs(self.scope.get('query_string', b'').decode()).get('token')
+        if not token:
+            return None
+
+        from rest_framework_simplejwt.authentication import JWTAuthentication
+        from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+        authentication = JWTAuthentication()
+        try:
+            return authentication.get_user(authentication.get_validated_token(token[0]))
+        except (InvalidToken, AuthenticationFailed):
+            return None
+
+    @database_sync_to_async
+    def is_participant(self, user, conversation_id):
+        from .models import Conversation
+        return Conversation.objects.filter(pk=conversation_id, participants=user).exists()
+
+    @database_sync_to_async
+    def send_message(self, content):
+        """Crea el mensaje; el servicio lo publica en el grupo"""
+        from .models import Conversation
+        from .services import chat_service
+        conversation = Conversation.objects.get(pk=self.conversation_id)
+        chat_service.send_message(conversation, self.user, content)
+
+    @database_sync_to_async
+    def mark_as_read(self):
+        """Marca los mensajes recibidos como leídos; el servicio publica el acuse"""
+        from .models import Conversation
+        from .services import chat_service
+        conversation = Conversation.objects.get(pk=self.conversation_id)
+        return chat_service.mark_as_read(conversation, self.user)
+
+    @database_sync_to_async
+    def messages_since(self, since_id):
+        from .services import chat_service
+        messages, has_more = chat_service.messages_since(self.conversation_id, since_id)
+        return [dict(message) for message in messages], has_more
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from chat.services import direct_conversations
+
+
+class Command(BaseCommand):
+    """
+    Registra el par canónico de las conversaciones directas existentes.
+    Uso: python manage.py backfill_conversation_pairs
+    """
+    help = 'Crea las filas de ConversationPair para las conversaciones de dos participantes que no la tienen.'
+
+    def handle(self, *args, **options):
+        created = direct_conversations.backfill()
+        self.stdout.write(self.style.SUCCESS(f'Pares registrados: {created}.'))
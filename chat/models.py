@@ -100,4 +100,52 @@ class Message(models.Model):
         Returns:
             str: Correo del remitente y los primeros 20 caracteres del contenido.
         """
-        return f"{self.sender.email}: {self.content[:20]}"
\ No newline at end of file
+        return f"{self.sender.email}: {self.content[:20]}"
+
+class ConversationPair(models.Model):
+
+    """
+    Clave canónica de una conversación directa entre dos usuarios.
+
+    Guarda el par (id menor, id mayor) de los participantes con un índice
+    único, de modo que buscar la conversación de dos usuarios es una sola
+    consulta indexada y dos llamadas concurrentes a start no pueden crear
+    conversaciones duplicadas. Se mantiene desde chat.services.
+
+    Atributos:
+        conversation (OneToOneField): Conversación directa correspondiente.
+        user_low_id (IntegerField): ID del participante con id menor.
+        user_high_id (IntegerField): ID del participante con id mayor.
+    """
+
+    conversation = models.OneToOneField(
+        Conversation,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='pair'
+    )
+    user_low_id = models.IntegerField()
+    user_high_id = models.IntegerField()
+
+    class Meta:
+        db_table = 'n_conversation_pair'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user_low_id', 'user_high_id'],
+                name='uniq_conversation_pair'
+            ),
+        ]
+
+    @staticmethod
+    def key_for(user_a_id, user_b_id):
+        """
+        Devuelve el par canónico (id menor, id mayor) de dos usuarios.
+
+        Returns:
+            tuple[int, int]: Par ordenado de IDs.
+        """
+        user_a_id, user_b_id = int(user_a_id), int(user_b_id)
+        return min(user_a_id, user_b_id), max(user_a_id, user_b_id)
+
+    def __str__(self):
+        return f"Par {self.user_low_id}-{self.user_high_id} → {self.conversation_id}"
@@ -0,0 +1,12 @@
+from django.urls import re_path
+from . import consumers
+
+
+# ====================================================
+# Rutas de WebSocket para la app de chat
+# ====================================================
+# Cada conversación tiene su propio canal, identificado por id_conversation.
+
+websocket_urlpatterns = [
+    re_path(r'ws/chat/(?P<conversation_id>\d+)/$', consumers.ChatConsumer.as_asgi()),
+]
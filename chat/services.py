@@ -0,0 +1,260 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from profiles.dashboard_cache import dashboard_cache
+from .models import Conversation, ConversationPair, Message
+from .serializers import MessageSerializer
+
+"""
+Servicio de chat en tiempo real.
+
+Centraliza la escritura de mensajes y lecturas para que la API REST y el
+WebSocket (ChatConsumer) compartan la misma lógica, y publica los eventos en
+el grupo de Channels de cada conversación (chat_<id_conversation>).
+
+Eventos publicados al grupo:
+    - chat_message: mensaje nuevo
+    - chat_read: el usuario leyó los mensajes hasta last_read_id
+    - chat_typing: el usuario está (o dejó de estar) escribiendo (lo publica ChatConsumer)
+
+Las conversaciones directas se resuelven por su par canónico de usuarios
+(ConversationPair) a través de direct_conversations, con el id de la
+conversación cacheado por par.
+"""
+
+
+# ====================================================
+# Servicio de Chat
+# ====================================================
+class ChatService:
+    """Servicio para mensajes de chat y su difusión por WebSocket"""
+
+    # Máximo de mensajes devueltos por una sincronización incremental
+    sync_limit = 200
+
+    def __init__(self):
+        self.channel_layer = get_channel_layer()
+
+    @staticmethod
+    def group_name(conversation_id):
+        """Nombre del grupo de Channels de una conversación"""
+        return f'chat_{conversation_id}'
+
+    # ====================================================
+    # Escritura
+    # ====================================================
+    def send_message(self, conversation, sender, content):
+        """
+        Crea un mensaje y lo publica en el grupo de la conversación
+        una vez confirmada la transacción.
+        """
+        message = Message.objects.create(
+            conversation=conversation,
+            sender=sender,
+            content=content
+        )
+        payload = dict(MessageSerializer(message).data)
+        transaction.on_commit(lambda: self._group_send(conversation.id_conversation, {
+            'type': 'chat_message',
+            'message': payload,
+        }))
+        return message
+
+    def mark_as_read(self, conversation, user):
+        """
+        Marca como leídos los mensajes recibidos por el usuario en la
+        conversación y publica el acuse de lectura.
+        Retorna la cantidad de mensajes actualizados.
+        """
+        unread = conversation.messages.filter(read=False).exclude(sender=user)
+        last_read_id = unread.order_by('-id_message').values_list('id_message', flat=True).first()
+        if last_read_id is None:
+            return 0
+
+        updated = unread.filter(id_message__lte=last_read_id).update(read=True)
+        # update() no dispara señales: se invalida el dashboard del lector aquí
+        dashboard_cache.invalidate(user.id_user)
+        transaction.on_commit(lambda: self._group_send(conversation.id_conversation, {
+            'type': 'chat_read',
+            'reader_id': user.id_user,
+            'last_read_id': last_read_id,
+        }))
+        return updated
+
+    # ====================================================
+    # Sincronización incremental
+    # ====================================================
+    def messages_since(self, conversation_id, since_id=0, limit=None):
+        """
+        Retorna (mensajes serializados, has_more) con los mensajes de la
+        conversación posteriores a since_id, en orden de id.
+        """
+        limit = max(1, min(limit or self.sync_limit, self.sync_limit))
+        messages = list(
+            Message.objects.filter(conversation_id=conversation_id, id_message__gt=since_id or 0)
+            .select_related('sender')
+            .order_by('id_message')[:limit + 1]
+        )
+        has_more = len(messages) > limit
+        return MessageSerializer(messages[:limit], many=True).data, has_more
+
+    # ====================================================
+    # Envío al grupo de la conversación
+    # ====================================================
+    def _group_send(self, conversation_id, event):
+        if not self.channel_layer:
+            return
+        try:
+            async_to_sync(self.channel_layer.group_send)(self.group_name(conversation_id), event)
+        except Exception as e:
+            print(f"Error enviando evento de chat: {e}")
+
+
+# ====================================================
+# Resolución de conversaciones directas
+# ====================================================
+class DirectConversationResolver:
+    """
+    Resuelve la conversación entre dos usuarios por su par canónico
+    (id menor, id mayor), cacheando el id de la conversación.
+    """
+
+    key_template = 'chat:pair:{low}:{high}'
+    timeout = 60 * 60 * 24
+
+    def _key(self, pair):
+        return self.key_template.format(low=pair[0], high=pair[1])
+
+    # ====================================================
+    # Lectura
+    # ====================================================
+    def get(self, user_a, user_b):
+        """
+        Retorna la conversación directa entre ambos usuarios o None.
+        Con el par en caché es una sola consulta por clave primaria.
+        """
+        pair = ConversationPair.key_for(user_a.id_user, user_b.id_user)
+        conversation_id = cache.get(self._key(pair))
+        if conversation_id is not None:
+            conversation = Conversation.objects.filter(pk=conversation_id).first()
+            if conversation:
+                return conversation
+            cache.delete(self._key(pair))
+
+        conversation = Conversation.objects.filter(
+            pair__user_low_id=pair[0],
+            pair__user_high_id=pair[1]
+        ).first()
+        if conversation is None and getattr(settings, 'CHAT_LEGACY_PAIR_FALLBACK', True):
+            conversation = self._adopt_legacy(pair)
+        if conversation:
+            cache.set(self._key(pair), conversation.id_conversation, self.timeout)
+        return conversation
+
+    # ====================================================
+    # Escritura
+    # ====================================================
+    def get_or_create(self, user_a, user_b):
+        """
+        Retorna (conversación, creada). Si dos llamadas concurrentes intentan
+        crearla, el índice único del par deja pasar solo una y la otra
+        devuelve la conversación ganadora.
+        """
+        conversation = self.get(user_a, user_b)
+        if conversation:
+            return conversation, False
+
+        pair = ConversationPair.key_for(user_a.id_user, user_b.id_user)
+        try:
+            with transaction.atomic():
+                conversation = Conversation.objects.create()
+                ConversationPair.objects.create(
+                    conversation=conversation,
+                    user_low_id=pair[0],
+                    user_high_id=pair[1]
+                )
+                conversation.participants.set([user_a, user_b])
+        except IntegrityError:
+            conversation = Conversation.objects.get(
+                pair__user_low_id=pair[0],
+                pair__user_high_id=pair[1]
+            )
+            created = False
+        else:
+            created = True
+
+        cache.set(self._key(pair), conversation.id_conversation, self.timeout)
+        return conversation, created
+
+    def _adopt_legacy(self, pair):
+        """
+        Busca una conversación creada antes de existir ConversationPair
+        (por participantes) y le registra su par, para que las siguientes
+        búsquedas usen el índice. Solo con CHAT_LEGACY_PAIR_FALLBACK (activo
+        hasta que se corre backfill_conversation_pairs): es el doble JOIN
+        sobre participantes que el par reemplaza.
+        """
+        conversation = Conversation.objects.filter(
+            participants=pair[0]
+        ).filter(
+            participants=pair[1]
+        ).order_by('id_conversation').first()
+        if conversation is None:
+            return None
+        try:
+            with transaction.atomic():
+                ConversationPair.objects.create(
+                    conversation=conversation,
+                    user_low_id=pair[0],
+                    user_high_id=pair[1]
+                )
+        except IntegrityError:
+            return Conversation.objects.filter(
+                pair__user_low_id=pair[0],
+                pair__user_high_id=pair[1]
+            ).first() or conversation
+        return conversation
+
+    def backfill(self):
+        """
+        Registra el par de todas las conversaciones de dos participantes que
+        aún no lo tienen. Si hay duplicadas se conserva la más antigua.
+        Retorna la cantidad de pares creados.
+        """
+        through = Conversation.participants.through
+        participants = {}
+        rows = (
+            through.objects
+            .filter(conversation__pair__isnull=True)
+            .values_list('conversation_id', 'user_id')
+            .order_by('conversation_id')
+        )
+        for conversation_id, user_id in rows:
+            participants.setdefault(conversation_id, []).append(user_id)
+
+        taken = set(ConversationPair.objects.values_list('user_low_id', 'user_high_id'))
+        new_pairs = []
+        for conversation_id, user_ids in participants.items():
+            if len(user_ids) != 2:
+                continue
+            pair = ConversationPair.key_for(*user_ids)
+            if pair in taken:
+                continue
+            taken.add(pair)
+            new_pairs.append(ConversationPair(
+                conversation_id=conversation_id,
+                user_low_id=pair[0],
+                user_high_id=pair[1]
+            ))
+        ConversationPair.objects.bulk_create(new_pairs, batch_size=1000, ignore_conflicts=True)
+        return len(new_pairs)
+
+
+# ====================================================
+# Instancias globales
+# ====================================================
+chat_service = ChatService()
+direct_conversations = DirectConversationResolver()
@@ -20,6 +20,7 @@ router = DefaultRouter()
 #   - /conversations/start/ → acción personalizada (iniciar conversación)
 #   - /conversations/{id}/send/ → acción personalizada (enviar mensaje)
 #   - /conversations/{id}/mark_as_read/ → acción personalizada (marcar mensajes leídos)
+#   - /conversations/{id}/sync/?since_id=X → acción personalizada (mensajes posteriores a X)
 router.register('conversations', ConversationViewSet, basename='conversation')
 
 # Generar automáticamente la lista de URLs a partir del router
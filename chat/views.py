@@ -5,7 +5,9 @@ from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from django.db.models import Q, Count, Prefetch
 from django.contrib.auth import get_user_model
+from integracion_comunitaria.pagination import KeysetHistoryPagination, paginated_response
 from .models import Conversation, Message
+from .services import chat_service, direct_conversations
 from .serializers import (
     ConversationSerializer,
     MessageSerializer,
@@ -67,19 +69,20 @@ class ConversationViewSet(viewsets.ViewSet):
     
     def retrieve(self, request, pk=None):
         """
-        Devuelve todos los mensajes de una conversación específica.
+        Devuelve el historial de mensajes de una conversación, paginado hacia
+        atrás desde el más reciente con cursores (created_at, id_message).
 
         Args:
-            request (Request): Objeto de solicitud HTTP.
+            request (Request): Objeto de solicitud HTTP. Admite ?before=, ?after= y ?page_size=.
             pk (int): ID de la conversación.
 
         Returns:
-            Response: Lista de mensajes serializados pertenecientes a la conversación.
+            Response: {'previous', 'next', 'results'} con los mensajes en orden cronológico.
         """
         conversation = get_object_or_404(Conversation, pk=pk, participants=request.user)
-        messages = conversation.messages.all()
-        serializer = MessageSerializer(messages, many=True)
-        return Response(serializer.data)
+        messages = conversation.messages.select_related('sender')
+        return paginated_response(request, messages, MessageSerializer,
+                                  KeysetHistoryPagination, view=self)
     
     @action(detail=False, methods=['post'])
     def start(self, request):
@@ -106,16 +109,8 @@ class ConversationViewSet(viewsets.ViewSet):
         if other_user.id_user == request.user.id_user:
             return Response({'error': 'No puedes iniciar una conversación contigo mismo'}, status=400)
         
-        # Buscar si ya existe una conversación entre ambos
-        conversation = Conversation.objects.filter(
-            participants=request.user
-        ).filter(
-            participants=other_user
-        ).distinct().first()
-
-        if not conversation:
-            conversation = Conversation.objects.create()
-            conversation.participants.set([request.user, other_user])
+        # Buscar (o crear) la conversación por el par canónico de usuarios
+        conversation, _ = direct_conversations.get_or_create(request.user, other_user)
 
         serializer = ConversationSerializer(conversation, context={'request': request})
         return Response(serializer.data, status=201)
@@ -137,10 +132,10 @@ class ConversationViewSet(viewsets.ViewSet):
         serializer = CreateMessageSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        message = Message.objects.create(
-            conversation=conversation,
-            sender=request.user,
-            content=serializer.validated_data['content']
+        message = chat_service.send_message(
+            conversation,
+            request.user,
+            serializer.validated_data['content']
         )
         return Response(MessageSerializer(message).data, status=201)
     
@@ -159,6 +154,29 @@ class ConversationViewSet(viewsets.ViewSet):
             Response: Cantidad de mensajes actualizados a estado leído.
         """
         conversation = get_object_or_404(Conversation, pk=pk, participants=request.user)
-        unread_messages = conversation.messages.filter(read=False).exclude(sender=request.user)
-        updated = unread_messages.update(read=True)
-        return Response({'mensajes_actualizados': updated}, status=200)
\ No newline at end of file
+        updated = chat_service.mark_as_read(conversation, request.user)
+        return Response({'mensajes_actualizados': updated}, status=200)
+
+    @action(detail=True, methods=['get'])
+    def sync(self, request, pk=None):
+        """
+        Sincronización incremental: devuelve los mensajes de la conversación
+        con id mayor a ?since_id= (en orden de id), para reconectar sin
+        volver a descargar la conversación completa.
+
+        Args:
+            request (Request): Objeto de solicitud HTTP con since_id y limit opcionales.
+            pk (int): ID de la conversación.
+
+        Returns:
+            Response: {'messages': [...], 'has_more': bool}
+        """
+        get_object_or_404(Conversation, pk=pk, participants=request.user)
+        try:
+            since_id = int(request.query_params.get('since_id', 0))
+            limit = int(request.query_params.get('limit', chat_service.sync_limit))
+        except ValueError:
+            return Response({'error': 'since_id y limit deben ser enteros'}, status=400)
+
+        messages, has_more = chat_service.messages_since(pk, since_id, limit)
+        return Response({'messages': messages, 'has_more': has_more})
\ No newline at end of file
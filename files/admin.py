@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import ImageDerivative
+
+
+@admin.register(ImageDerivative)
+class ImageDerivativeAdmin(admin.ModelAdmin):
+    list_display = ['source_name', 'size', 'format', 'width', 'height', 'date_create']
+    list_filter = ['size', 'format']
+    search_fields = ['source_name']
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class FilesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'files'
+
+    def ready(self):
+        """
+        Importacion de las señales al iniciar la aplicacion.
+        """
+        import files.signals
@@ -0,0 +1,114 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.apps import apps
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import Blob, ImageDerivative
+from .storage import content_addressed_storage
+
+"""
+Referencias y recolección de los blobs de ContentAddressedStorage.
+
+Cada adjunto de BLOB_SOURCES que apunta a un blob suma una referencia al
+crearse y la resta al eliminarse (files.signals; las inserciones con
+bulk_create llaman a acquire directamente). collect() corrige primero los
+contadores contra las tablas (recount) y después borra los blobs sin
+referencias cuyo last_seen supera GRACE_PERIOD, junto con sus derivados.
+"""
+
+# Adjuntos guardados en ContentAddressedStorage (modelo → campo)
+BLOB_SOURCES = {
+    'petitions.PetitionAttachment': 'file',
+    'portfolio.PortfolioAttachment': 'file',
+    'portfolio.MaterialAttachment': 'file',
+}
+
+GRACE_PERIOD = timedelta(days=1)
+
+
+# ====================================================
+# Servicio de blobs
+# ====================================================
+class BlobStore:
+    """Registro, conteo de referencias y recolección de blobs"""
+
+    @staticmethod
+    def is_blob(name):
+        return bool(name) and name.startswith(f'{content_addressed_storage.prefix}/')
+
+    def touch(self, name, sha, size):
+        """Registra el blob (o renueva su last_seen si ya existía)."""
+        if Blob.objects.filter(name=name).update(last_seen=timezone.now()):
+            return
+        try:
+            with transaction.atomic():
+                Blob.objects.create(name=name, sha256=sha, size=size)
+        except IntegrityError:
+            Blob.objects.filter(name=name).update(last_seen=timezone.now())
+
+    def acquire(self, names):
+        """Suma una referencia por cada aparición de cada nombre."""
+        for name, count in Counter(n for n in names if self.is_blob(n)).items():
+            Blob.objects.filter(name=name).update(ref_count=F('ref_count') + count)
+
+    def release(self, name):
+        """Resta una referencia al blob (nunca por debajo de cero)."""
+        if self.is_blob(name):
+            Blob.objects.filter(name=name, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+
+    # ====================================================
+    # Recolección
+    # ====================================================
+    def recount(self):
+        """Recalcula ref_count contando los adjuntos. Retorna los blobs corregidos."""
+        counts = Counter()
+        prefix = f'{content_addressed_storage.prefix}/'
+        for model_label, field_name in BLOB_SOURCES.items():
+            rows = (
+                apps.get_model(model_label)._default_manager
+                .filter(**{f'{field_name}__startswith': prefix})
+                .values(field_name).annotate(total=Count('pk')).order_by()
+            )
+            for row in rows:
+                counts[row[field_name]] += row['total']
+
+        changed = []
+        for blob in Blob.objects.only('id_blob', 'name', 'ref_count').iterator():
+            if blob.ref_count != counts[blob.name]:
+                blob.ref_count = counts[blob.name]
+                changed.append(blob)
+        Blob.objects.bulk_update(changed, ['ref_count'], batch_size=500)
+        return len(changed)
+
+    def collect(self, grace=GRACE_PERIOD):
+        """Borra los blobs sin referencias (y sus derivados). Retorna la cantidad."""
+        self.recount()
+        cutoff = timezone.now() - grace
+        unused = Blob.objects.filter(ref_count=0, last_seen__lt=cutoff).values_list('name', flat=True)
+        collected = 0
+        for name in list(unused):
+            # Se vuelve a verificar con la fila bloqueada: una subida del mismo
+            # contenido (ContentAddressedStorage._save → touch) espera a que
+            # termine el borrado y recién entonces mira si el archivo existe.
+            with transaction.atomic():
+                blob = (
+                    Blob.objects.select_for_update()
+                    .filter(name=name, ref_count=0, last_seen__lt=cutoff)
+                    .first()
+                )
+                if blob is None:
+                    continue
+                derivatives = ImageDerivative.objects.filter(source_name=name)
+                for file_name in derivatives.values_list('file', flat=True):
+                    content_addressed_storage.delete(file_name)
+                derivatives.delete()
+                content_addressed_storage.delete(name)
+                blob.delete()
+            collected += 1
+        return collected
+
+
+blobs = BlobStore()
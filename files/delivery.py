@@ -0,0 +1,169 @@
+import mimetypes
+import os
+import posixpath
+import re
+import time
+from urllib.parse import quote, urlencode
+
+from django.conf import settings
+from django.core import signing
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.crypto import constant_time_compare
+
+"""
+Entrega de archivos de MEDIA con URLs firmadas.
+
+Los archivos bajo PROTECTED_PREFIXES (y sus derivados) solo se sirven con una
+URL firmada de corta duración: el storage (files.storage.SignedMediaStorage)
+agrega ?exp=<vencimiento>&sig=<firma> a cada .url, así que los permisos se
+verifican una sola vez, cuando la API decide devolver el objeto que contiene
+la URL. La descarga solo valida la firma, sin consultar la base.
+
+El vencimiento se redondea a ventanas de MEDIA_URL_TTL segundos: dentro de
+una ventana la URL de un archivo es siempre la misma y el navegador la
+reutiliza desde su caché.
+
+La transferencia de bytes se delega al proxy según MEDIA_DELIVERY:
+    - 'nginx': X-Accel-Redirect a MEDIA_ACCEL_PREFIX (location internal)
+    - 'apache': X-Sendfile con la ruta absoluta (mod_xsendfile)
+    - 'python': Django lo transmite en bloques, con soporte de Range (desarrollo)
+"""
+
+PROTECTED_PREFIXES = (
+    'petitions/',
+    'portfolio_attachments/',
+    'material_attachments/',
+    'profiles/',
+    'blobs/',
+)
+DERIVATIVES_PREFIX = 'derivatives/'
+
+MEDIA_URL_TTL = getattr(settings, 'MEDIA_URL_TTL', 15 * 60)
+MEDIA_DELIVERY = getattr(settings, 'MEDIA_DELIVERY', 'python')
+MEDIA_ACCEL_PREFIX = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/')
+
+STREAM_BLOCK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+# ====================================================
+# Servicio de entrega
+# ====================================================
+class MediaDelivery:
+    """Firma URLs de MEDIA y arma la respuesta de descarga"""
+
+    signer = signing.Signer(salt='files.media')
+
+    @staticmethod
+    def clean_name(path):
+        """
+        Nombre del archivo pedido, o None si la ruta no es canónica (segmentos
+        '.', '..' o vacíos, barra inicial o invertida). Así la verificación de
+        la firma y la lectura del disco usan siempre el mismo nombre.
+        """
+        if not path or '\\' in path or '\x00' in path:
+            return None
+        name = posixpath.normpath(path)
+        if name != path or name.startswith('/'):
+            return None
+        if any(part in ('', '.', '..') for part in name.split('/')):
+            return None
+        return name
+
+    @staticmethod
+    def is_protected(name):
+        """Indica si el archivo (o el original de un derivado) requiere URL firmada."""
+        if name.startswith(DERIVATIVES_PREFIX):
+            name = name[len(DERIVATIVES_PREFIX):]
+        return name.startswith(PROTECTED_PREFIXES)
+
+    def _signature(self, name, expires):
+        return self.signer.signature(f'{name}:{expires}')
+
+    def sign(self, name, now=None):
+        """Query string ?exp=&sig= para el archivo, vigente al menos MEDIA_URL_TTL segundos."""
+        now = int(now if now is not None else time.time())
+        expires = (now // MEDIA_URL_TTL + 2) * MEDIA_URL_TTL
+        return urlencode({'exp': expires, 'sig': self._signature(name, expires)})
+
+    def verify(self, name, expires, signature):
+        """Retorna el vencimiento si la firma es válida y está vigente, o None."""
+        try:
+            expires = int(expires)
+        except (TypeError, ValueError):
+            return None
+        if expires < time.time() or not signature:
+            return None
+        if not constant_time_compare(signature, self._signature(name, expires)):
+            return None
+        return expires
+
+    # ====================================================
+    # Respuestas
+    # ====================================================
+    def response(self, request, name, full_path, expires=None):
+        """
+        Respuesta de descarga del archivo: delegada al proxy o transmitida
+        por Django según MEDIA_DELIVERY.
+        """
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+        if MEDIA_DELIVERY == 'nginx':
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = MEDIA_ACCEL_PREFIX + quote(name)
+        elif MEDIA_DELIVERY == 'apache':
+            response = HttpResponse(content_type=content_type)
+            response['X-Sendfile'] = full_path
+        else:
+            response = self._stream(request, full_path, content_type)
+
+        if expires is None:
+            response['Cache-Control'] = 'public, max-age=86400'
+        else:
+            response['Cache-Control'] = f'private, max-age={max(0, expires - int(time.time()))}'
+        return response
+
+    @staticmethod
+    def _stream(request, full_path, content_type):
+        """Transmite el archivo en bloques; responde 206 a un pedido Range de un solo rango."""
+        size = os.path.getsize(full_path)
+        match = RANGE_RE.match(request.META.get('HTTP_RANGE', '').strip())
+
+        if not match or match.groups() == ('', ''):
+            response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+            response['Accept-Ranges'] = 'bytes'
+            return response
+
+        first, last = match.groups()
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            start = max(size - int(last), 0)
+            end = size - 1
+        if start > end or start >= size:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+        length = end - start + 1
+
+        def chunks():
+            with open(full_path, 'rb') as handle:
+                handle.seek(start)
+                remaining = length
+                while remaining > 0:
+                    block = handle.read(min(STREAM_BLOCK_SIZE, remaining))
+                    if not block:
+                        break
+                    remaining -= len(block)
+                    yield block
+
+        response = StreamingHttpResponse(chunks(), status=206, content_type=content_type)
+        response['Content-Length'] = str(length)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Accept-Ranges'] = 'bytes'
+        return response
+
+
+media_delivery = MediaDelivery()
@@ -0,0 +1,212 @@
+import hashlib
+import mimetypes
+import posixpath
+from io import BytesIO
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from .models import ImageDerivative
+
+"""
+Pipeline de versiones redimensionadas (derivados) de las imágenes subidas.
+
+Al guardar un archivo en alguno de los campos de SOURCES, files.signals agenda
+files.tasks.process_upload, que en segundo plano:
+    - completa mime_type y file_size si el modelo tiene esos campos
+    - genera cada tamaño de SIZES en WebP y JPEG (ImageDerivative)
+
+Los serializers piden las URLs con derivatives.url() o derivatives.variants():
+mientras los derivados no estén listos devuelven la URL del original.
+Los nombres de los derivados de cada imagen se cachean por nombre de archivo
+(la tarea los reemplaza al terminar); las URLs se arman en cada lectura porque
+el storage las firma con vencimiento (files.delivery).
+"""
+
+# Campos de archivo que alimentan el pipeline (modelo → campo)
+SOURCES = {
+    'authentication.User': 'profile_image',
+    'portfolio.PortfolioAttachment': 'file',
+    'portfolio.MaterialAttachment': 'file',
+    'petitions.PetitionAttachment': 'file',
+}
+
+# Lado mayor en píxeles de cada tamaño
+SIZES = {
+    'thumb': 96,
+    'small': 320,
+    'medium': 960,
+}
+
+# Formato → opciones de Pillow (claves como str para indexar las URLs cacheadas)
+FORMATS = {
+    'webp': {'pil_format': 'WEBP', 'options': {'quality': 80, 'method': 4}},
+    'jpeg': {'pil_format': 'JPEG', 'options': {'quality': 82, 'optimize': True, 'progressive': True}},
+}
+
+# Tipos de imagen que no se redimensionan (vectoriales)
+SKIPPED_MIME_TYPES = {'image/svg+xml'}
+
+
+# ====================================================
+# Servicio de derivados
+# ====================================================
+class DerivativeService:
+    """Genera y resuelve las versiones redimensionadas de las imágenes"""
+
+    cache_timeout = 60 * 60 * 24
+    queued_timeout = 60 * 60
+
+    # ====================================================
+    # Lectura (serializers)
+    # ====================================================
+    @staticmethod
+    def _cache_key(name):
+        return f"derivative_names:{hashlib.md5(name.encode()).hexdigest()}"
+
+    @staticmethod
+    def original_url(name):
+        """URL del archivo original (las URLs externas se devuelven tal cual)."""
+        if name.startswith('http'):
+            return name
+        return default_storage.url(name)
+
+    def urls(self, name):
+        """
+        Retorna {tamaño: {formato: url}} con los derivados listos de la imagen,
+        o {} si todavía no hay ninguno.
+        """
+        if not name or name.startswith('http'):
+            return {}
+        key = self._cache_key(name)
+        names = cache.get(key)
+        if names is None:
+            names = self._load_names(name)
+            cache.set(key, names, self.cache_timeout)
+        return {
+            size: {fmt: default_storage.url(file_name) for fmt, file_name in formats.items()}
+            for size, formats in names.items()
+        }
+
+    @staticmethod
+    def _load_names(name):
+        names = {}
+        rows = ImageDerivative.objects.filter(source_name=name).values_list('size', 'format', 'file')
+        for size, fmt, file_name in rows:
+            names.setdefault(size, {})[fmt] = file_name
+        return names
+
+    def url(self, name, size='thumb', fmt='webp'):
+        """URL del derivado pedido o, si todavía no existe, la del original."""
+        if not name:
+            return None
+        return self.urls(name).get(size, {}).get(fmt) or self.original_url(name)
+
+    def variants(self, name):
+        """
+        Retorna {tamaño: {'webp': url, 'jpeg': url}} para todos los tamaños,
+        usando la URL del original donde falte el derivado.
+        """
+        if not name:
+            return None
+        urls = self.urls(name)
+        original = self.original_url(name)
+        return {
+            size: {fmt: urls.get(size, {}).get(fmt) or original for fmt in FORMATS}
+            for size in SIZES
+        }
+
+    # ====================================================
+    # Escritura (tarea en segundo plano)
+    # ====================================================
+    def schedule(self, model_label, name):
+        """
+        Agenda el procesamiento del archivo al confirmar la transacción.
+        Se identifica por el nombre guardado (bulk_create no devuelve los ids
+        en MySQL). Un mismo archivo se agenda una sola vez por modelo y
+        queued_timeout (un blob puede estar en adjuntos de varios modelos).
+        """
+        if not name or name.startswith('http'):
+            return
+        if not cache.add(f"{self._cache_key(name)}:{model_label}:queued", 1, self.queued_timeout):
+            return
+        from .tasks import process_upload
+        transaction.on_commit(lambda: process_upload.delay(model_label, name))
+
+    def process(self, model_label, name):
+        """
+        Completa los metadatos del archivo y genera sus derivados.
+        Retorna la cantidad de derivados generados.
+        """
+        model = apps.get_model(model_label)
+        rows = model._default_manager.filter(**{SOURCES[model_label]: name})
+        if not rows.exists() or not default_storage.exists(name):
+            return 0
+
+        mime_type = mimetypes.guess_type(name)[0]
+        self._fill_metadata(model, rows, name, mime_type)
+
+        if not mime_type or not mime_type.startswith('image/') or mime_type in SKIPPED_MIME_TYPES:
+            return 0
+        if ImageDerivative.objects.filter(source_name=name).exists():
+            return 0  # blob compartido: sus derivados ya se generaron
+        created = self.generate(name)
+        cache.set(self._cache_key(name), self._load_names(name), self.cache_timeout)
+        return created
+
+    @staticmethod
+    def _fill_metadata(model, rows, name, mime_type):
+        """Completa mime_type y file_size en las filas que los tienen vacíos."""
+        field_names = {field.name for field in model._meta.get_fields()}
+        if 'mime_type' in field_names and mime_type:
+            rows.filter(mime_type__isnull=True).update(mime_type=mime_type)
+        if 'file_size' in field_names:
+            rows.filter(file_size__isnull=True).update(file_size=default_storage.size(name))
+
+    @staticmethod
+    def derivative_name(name, size, fmt):
+        """Nombre en el storage: derivatives/<ruta del original sin extensión>/<tamaño>.<formato>"""
+        stem = posixpath.splitext(name)[0]
+        extension = 'jpg' if fmt == 'jpeg' else fmt
+        return f"derivatives/{stem}/{size}.{extension}"
+
+    def generate(self, name):
+        """Genera (o regenera) todos los tamaños y formatos de la imagen."""
+        from PIL import Image, ImageOps
+
+        with default_storage.open(name, 'rb') as source:
+            image = Image.open(source)
+            image = ImageOps.exif_transpose(image)
+            image.load()
+
+        has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+        created = 0
+        for size, max_side in SIZES.items():
+            resized = image.copy()
+            resized.thumbnail((max_side, max_side), Image.LANCZOS)
+            for fmt, spec in FORMATS.items():
+                if fmt == 'jpeg' or not has_alpha:
+                    frame = resized.convert('RGB')
+                else:
+                    frame = resized.convert('RGBA')
+                buffer = BytesIO()
+                frame.save(buffer, spec['pil_format'], **spec['options'])
+                self._store(name, size, fmt, buffer.getvalue(), frame.size)
+                created += 1
+        return created
+
+    def _store(self, name, size, fmt, content, dimensions):
+        target = self.derivative_name(name, size, fmt)
+        if default_storage.exists(target):
+            default_storage.delete(target)
+        stored = default_storage.save(target, ContentFile(content))
+        ImageDerivative.objects.update_or_create(
+            source_name=name, size=size, format=fmt,
+            defaults={'file': stored, 'width': dimensions[0], 'height': dimensions[1]},
+        )
+
+
+derivatives = DerivativeService()
@@ -0,0 +1,34 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from files.derivatives import SOURCES
+from files.tasks import process_upload
+
+
+class Command(BaseCommand):
+    """
+    Agenda el procesamiento de los archivos subidos antes del pipeline de derivados.
+    Uso: python manage.py backfill_image_derivatives [--sync]
+    """
+    help = 'Encola (o ejecuta con --sync) la generación de derivados para los archivos existentes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sync', action='store_true', help='Procesa en este proceso en lugar de encolar.')
+
+    def handle(self, *args, **options):
+        total = 0
+        for model_label, field_name in SOURCES.items():
+            model = apps.get_model(model_label)
+            names = (
+                model._default_manager.exclude(**{f'{field_name}__isnull': True})
+                .exclude(**{field_name: ''})
+                .values_list(field_name, flat=True)
+                .distinct()
+            )
+            for name in names.iterator():
+                if options['sync']:
+                    process_upload(model_label, name)
+                else:
+                    process_upload.delay(model_label, name)
+                total += 1
+        self.stdout.write(self.style.SUCCESS(f'Archivos procesados: {total}.'))
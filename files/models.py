@@ -0,0 +1,124 @@
+import uuid
+
+from django.conf import settings
+from django.db import models
+
+
+# ====================================================
+# Modelo: ImageDerivative
+# ====================================================
+class ImageDerivative(models.Model):
+    """
+    Versión redimensionada de una imagen subida (avatar, portfolio, materiales,
+    adjuntos de peticiones). Se identifica por el nombre del archivo original
+    en el storage, el tamaño y el formato; la genera files.tasks en segundo plano.
+    """
+    class Format(models.TextChoices):
+        WEBP = 'webp', 'WebP'
+        JPEG = 'jpeg', 'JPEG'
+
+    id_derivative = models.BigAutoField(primary_key=True)
+    source_name = models.CharField(max_length=255, db_index=True)
+    size = models.CharField(max_length=20)
+    format = models.CharField(max_length=10, choices=Format.choices)
+    file = models.FileField(upload_to='derivatives/', max_length=255)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    date_create = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'n_image_derivative'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['source_name', 'size', 'format'],
+                name='uniq_image_derivative',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.source_name} [{self.size}.{self.format}]"
+
+
+# ====================================================
+# Modelo: UploadSession
+# ====================================================
+class UploadSession(models.Model):
+    """
+    Subida reanudable de un archivo en partes (files.uploads).
+    Las partes recibidas viven en disco (CHUNKED_UPLOAD_DIR/<id>/) y son la
+    fuente de verdad para reanudar; al completarse la sesión se convierte en
+    un adjunto de petición, portfolio o material.
+    """
+    class Target(models.TextChoices):
+        PETITION = 'petition', 'Petición'
+        PORTFOLIO = 'portfolio', 'Portfolio'
+        MATERIAL = 'material', 'Material'
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Recibiendo partes'
+        PROCESSING = 'processing', 'Ensamblando'
+        COMPLETED = 'completed', 'Completada'
+        FAILED = 'failed', 'Fallida'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_column='id_user',
+        related_name='upload_sessions'
+    )
+    target = models.CharField(max_length=20, choices=Target.choices)
+    target_id = models.IntegerField()
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, null=True, blank=True)
+    total_size = models.BigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    checksum = models.CharField(max_length=64, null=True, blank=True)  # sha256 del archivo completo
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    error = models.CharField(max_length=255, null=True, blank=True)
+    attachment_id = models.IntegerField(null=True, blank=True)
+    date_create = models.DateTimeField(auto_now_add=True)
+    date_update = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = 'n_upload_session'
+
+    def __str__(self):
+        return f"{self.filename} → {self.target} {self.target_id} [{self.status}]"
+
+    @property
+    def total_chunks(self):
+        return max(1, -(-self.total_size // self.chunk_size))
+
+    def expected_chunk_size(self, index):
+        """Tamaño que debe tener la parte index (la última puede ser menor)."""
+        if index == self.total_chunks - 1:
+            return self.total_size - self.chunk_size * index
+        return self.chunk_size
+
+
+# ====================================================
+# Modelo: Blob
+# ====================================================
+class Blob(models.Model):
+    """
+    Archivo guardado una sola vez por contenido (files.storage.ContentAddressedStorage).
+    ref_count cuenta los adjuntos que lo usan; files.blobs.collect borra los
+    que quedan sin referencias después de un período de gracia.
+    """
+    id_blob = models.BigAutoField(primary_key=True)
+    name = models.CharField(max_length=255, unique=True)
+    sha256 = models.CharField(max_length=64, db_index=True)
+    size = models.BigIntegerField()
+    ref_count = models.IntegerField(default=0)
+    date_create = models.DateTimeField(auto_now_add=True)
+    # Última vez que se guardó o reutilizó: protege de la recolección a los
+    # blobs recién subidos cuyo adjunto todavía no se confirmó
+    last_seen = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        db_table = 'n_blob'
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
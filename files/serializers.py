@@ -0,0 +1,47 @@
+from rest_framework import serializers
+
+from .models import UploadSession
+from .uploads import uploads
+
+
+# ====================================================
+# Serializer: UploadSessionCreateSerializer
+# ====================================================
+class UploadSessionCreateSerializer(serializers.Serializer):
+    """
+    Datos para abrir una sesión de subida en partes.
+    - target / target_id: adjunto de petición, portfolio o material
+    - checksum: SHA-256 (hex) opcional del archivo completo
+    """
+    target = serializers.ChoiceField(choices=UploadSession.Target.choices)
+    target_id = serializers.IntegerField(min_value=1)
+    filename = serializers.CharField(max_length=255)
+    content_type = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    total_size = serializers.IntegerField(min_value=1)
+    chunk_size = serializers.IntegerField(min_value=1, required=False)
+    checksum = serializers.RegexField(r'^[0-9a-fA-F]{64}$', required=False)
+
+
+# ====================================================
+# Serializer: UploadSessionSerializer
+# ====================================================
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """
+    Estado de una sesión de subida. received_chunks permite reanudar:
+    el cliente sube solo las partes que faltan.
+    """
+    total_chunks = serializers.IntegerField(read_only=True)
+    received_chunks = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = [
+            'id', 'target', 'target_id', 'filename', 'content_type',
+            'total_size', 'chunk_size', 'total_chunks', 'received_chunks',
+            'status', 'error', 'attachment_id', 'expires_at',
+        ]
+
+    def get_received_chunks(self, obj):
+        if obj.status != UploadSession.Status.PENDING:
+            return []
+        return uploads.received_chunks(obj)
@@ -0,0 +1,51 @@
+from django.db.models.signals import post_delete, post_save
+
+from .blobs import BLOB_SOURCES, blobs
+from .derivatives import SOURCES, derivatives
+
+
+# ====================================================
+# SIGNAL: schedule_derivatives_on_upload
+# ====================================================
+def _receiver_for(model_label, field_name):
+    def schedule_derivatives_on_upload(sender, instance, update_fields=None, **kwargs):
+        """
+        Agenda los derivados cuando se guarda un archivo en el campo.
+        Los save() con update_fields que no incluyen el campo (ej. last_login)
+        se ignoran; los archivos ya agendados se descartan en derivatives.schedule.
+        """
+        if update_fields is not None and field_name not in update_fields:
+            return
+        derivatives.schedule(model_label, getattr(instance, field_name).name)
+    return schedule_derivatives_on_upload
+
+
+for _model_label, _field_name in SOURCES.items():
+    post_save.connect(
+        _receiver_for(_model_label, _field_name),
+        sender=_model_label,
+        weak=False,
+        dispatch_uid=f'files.derivatives:{_model_label}',
+    )
+
+
+# ====================================================
+# SIGNALS: referencias a blobs
+# ====================================================
+def _blob_receivers_for(field_name):
+    def acquire_blob_on_create(sender, instance, created, **kwargs):
+        """Suma una referencia al blob cuando se crea el adjunto."""
+        if created:
+            blobs.acquire([getattr(instance, field_name).name])
+
+    def release_blob_on_delete(sender, instance, **kwargs):
+        """Resta la referencia al eliminar el adjunto (el blob lo borra files.blobs.collect)."""
+        blobs.release(getattr(instance, field_name).name)
+
+    return acquire_blob_on_create, release_blob_on_delete
+
+
+for _model_label, _field_name in BLOB_SOURCES.items():
+    _acquire, _release = _blob_receivers_for(_field_name)
+    post_save.connect(_acquire, sender=_model_label, weak=False, dispatch_uid=f'files.blobs.acquire:{_model_label}')
+    post_delete.connect(_release, sender=_model_label, weak=False, dispatch_uid=f'files.blobs.release:{_model_label}')
@@ -0,0 +1,75 @@
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+
+from .delivery import media_delivery
+
+
+# ====================================================
+# Storage: SignedMediaStorage
+# ====================================================
+class SignedMediaStorage(FileSystemStorage):
+    """
+    Storage por defecto del proyecto. Igual a FileSystemStorage, pero las URLs
+    de los archivos protegidos salen firmadas y con vencimiento (files.delivery),
+    así que todo .url de un FileField/ImageField ya es una URL de descarga válida.
+    """
+
+    def url(self, name):
+        url = super().url(name)
+        if name and media_delivery.is_protected(name):
+            url = f'{url}?{media_delivery.sign(name)}'
+        return url
+
+
+# ====================================================
+# Storage: ContentAddressedStorage
+# ====================================================
+class ContentAddressedStorage(SignedMediaStorage):
+    """
+    Guarda cada contenido una sola vez en blobs/<aa>/<bb>/<sha256><extensión>.
+    El nombre que arma upload_to solo aporta la extensión: subir otra vez el
+    mismo archivo (en otra petición, portfolio o material) devuelve el blob
+    existente sin escribir en disco. Las referencias y la recolección de los
+    blobs sin uso están en files.blobs.
+    """
+    prefix = 'blobs'
+
+    @staticmethod
+    def digest(content):
+        """SHA-256 del contenido, leído en bloques; deja el archivo al inicio."""
+        sha = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks():
+            sha.update(chunk)
+        content.seek(0)
+        return sha.hexdigest()
+
+    def blob_name(self, name, sha):
+        extension = os.path.splitext(name)[1].lower()[:10]
+        return f'{self.prefix}/{sha[:2]}/{sha[2:4]}/{sha}{extension}'
+
+    def name_for(self, content):
+        """Nombre de blob que tendría el archivo (para comparar sin guardarlo)."""
+        return self.blob_name(content.name or '', self.digest(content))
+
+    def _save(self, name, content):
+        from .blobs import blobs
+
+        sha = self.digest(content)
+        target = self.blob_name(name, sha)
+        # touch antes de mirar el disco: renueva last_seen (o espera a que
+        # termine una recolección en curso del mismo blob), así collect no
+        # puede borrar el archivo después de que se decidió reutilizarlo
+        blobs.touch(target, sha, content.size)
+        if not self.exists(target):
+            written = super()._save(target, content)
+            if written != target:
+                # Otro proceso escribió el mismo contenido en paralelo
+                self.delete(written)
+        return target
+
+
+content_addressed_storage = ContentAddressedStorage()
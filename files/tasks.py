@@ -0,0 +1,55 @@
+from celery import shared_task
+
+from .blobs import blobs
+from .derivatives import derivatives
+from .uploads import uploads
+
+
+# ====================================================
+# TAREA: process_upload
+# ====================================================
+@shared_task
+def process_upload(model_label, name):
+    """
+    Completa los metadatos de un archivo subido y genera sus versiones
+    redimensionadas (ver files.derivatives).
+
+    Retorna la cantidad de derivados generados.
+    """
+    return derivatives.process(model_label, name)
+
+
+# ====================================================
+# TAREA: finalize_upload
+# ====================================================
+@shared_task
+def finalize_upload(session_id):
+    """
+    Ensambla las partes de una subida reanudable y crea el adjunto
+    (ver files.uploads). Retorna el id del adjunto o None si falló.
+    """
+    return uploads.finalize(session_id)
+
+
+# ====================================================
+# TAREA: cleanup_upload_sessions
+# ====================================================
+@shared_task
+def cleanup_upload_sessions():
+    """
+    Elimina las sesiones de subida vencidas y sus partes en disco.
+    Retorna la cantidad de sesiones eliminadas.
+    """
+    return uploads.cleanup_expired()
+
+
+# ====================================================
+# TAREA: collect_blobs
+# ====================================================
+@shared_task
+def collect_blobs():
+    """
+    Corrige los contadores de referencias de los blobs y borra los que
+    quedaron sin uso (ver files.blobs). Retorna la cantidad de blobs borrados.
+    """
+    return blobs.collect()
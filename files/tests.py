@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from .delivery import MEDIA_URL_TTL, media_delivery
+from .views import serve_media
+
+
+# ====================================================
+# Firma de URLs de MEDIA
+# ====================================================
+class MediaSignatureTests(SimpleTestCase):
+
+    name = 'petitions/1/photo.jpg'
+
+    def _params(self, query):
+        return dict(part.split('=', 1) for part in query.split('&'))
+
+    def test_sign_and_verify(self):
+        params = self._params(media_delivery.sign(self.name))
+        self.assertEqual(media_delivery.verify(self.name, params['exp'], params['sig']), int(params['exp']))
+
+    def test_signature_is_bound_to_the_name(self):
+        params = self._params(media_delivery.sign(self.name))
+        self.assertIsNone(media_delivery.verify('petitions/2/photo.jpg', params['exp'], params['sig']))
+
+    def test_tampered_expiry_is_rejected(self):
+        params = self._params(media_delivery.sign(self.name))
+        later = int(params['exp']) + MEDIA_URL_TTL
+        self.assertIsNone(media_delivery.verify(self.name, later, params['sig']))
+
+    def test_invalid_values_are_rejected(self):
+        self.assertIsNone(media_delivery.verify(self.name, 'abc', 'sig'))
+        self.assertIsNone(media_delivery.verify(self.name, None, None))
+
+    def test_expired_signature_is_rejected(self):
+        params = self._params(media_delivery.sign(self.name, now=1_000_000))
+        with mock.patch('files.delivery.time.time', return_value=int(params['exp']) + 1):
+            self.assertIsNone(media_delivery.verify(self.name, params['exp'], params['sig']))
+
+    def test_url_is_stable_within_a_window(self):
+        start = MEDIA_URL_TTL * 1000
+        self.assertEqual(media_delivery.sign(self.name, now=start), media_delivery.sign(self.name, now=start + 1))
+
+    def test_clean_name(self):
+        self.assertEqual(media_delivery.clean_name(self.name), self.name)
+        for path in (
+            'x/../petitions/1/photo.jpg',
+            './blobs/aa/bb/file.jpg',
+            'petitions//1/photo.jpg',
+            '/etc/passwd',
+            '..',
+            'petitions\\1\\photo.jpg',
+            '',
+        ):
+            self.assertIsNone(media_delivery.clean_name(path), path)
+
+
+# ====================================================
+# Vista serve_media
+# ====================================================
+class ServeMediaTests(SimpleTestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        os.makedirs(os.path.join(self.media_root, 'petitions', '1'))
+        with open(os.path.join(self.media_root, 'petitions', '1', 'photo.jpg'), 'wb') as handle:
+            handle.write(b'jpeg')
+        with open(os.path.join(self.media_root, 'public.txt'), 'wb') as handle:
+            handle.write(b'public')
+
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        delivery_patch = mock.patch('files.delivery.MEDIA_DELIVERY', 'python')
+        delivery_patch.start()
+        self.addCleanup(delivery_patch.stop)
+        self.factory = RequestFactory()
+
+    def _get(self, path, query=''):
+        return serve_media(self.factory.get(f'/media/{path}?{query}'), path)
+
+    def test_protected_file_requires_signature(self):
+        self.assertEqual(self._get('petitions/1/photo.jpg').status_code, 403)
+
+    def test_protected_file_with_signature(self):
+        query = media_delivery.sign('petitions/1/photo.jpg')
+        response = self._get('petitions/1/photo.jpg', query)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'jpeg')
+
+    def test_public_file_without_signature(self):
+        self.assertEqual(self._get('public.txt').status_code, 200)
+
+    def test_traversal_cannot_skip_the_signature(self):
+        for path in ('x/../petitions/1/photo.jpg', './petitions/1/photo.jpg', 'petitions/./1/photo.jpg'):
+            with self.assertRaises(Http404, msg=path):
+                self._get(path)
+
+    def test_signature_of_other_file_is_rejected(self):
+        query = media_delivery.sign('public.txt')
+        self.assertEqual(self._get('petitions/1/photo.jpg', query).status_code, 403)
@@ -0,0 +1,288 @@
+import hashlib
+import mimetypes
+import os
+import shutil
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .models import UploadSession
+
+"""
+Subidas reanudables en partes para los adjuntos de peticiones, portfolios y
+materiales.
+
+Flujo:
+    1. create_session: el cliente declara archivo, tamaño total y destino;
+       se valida que el destino sea del usuario.
+    2. write_chunk: cada parte se lee del request en bloques y se escribe a
+       disco (CHUNKED_UPLOAD_DIR/<sesión>/<índice>.part) mientras se calcula su
+       SHA-256, sin cargarla en memoria. Una parte con checksum distinto se
+       descarta. Reenviar una parte la reemplaza, así que reanudar es pedir
+       received_chunks() y subir las que faltan.
+    3. complete: con todas las partes presentes la sesión pasa a 'processing'
+       y files.tasks.finalize_upload ensambla el archivo, verifica tamaño y
+       checksum total y crea el adjunto fuera del worker web.
+
+Las sesiones vencidas se eliminan con cleanup_expired (tarea periódica).
+El directorio de partes debe ser compartido por los workers web y Celery.
+"""
+
+CHUNKED_UPLOAD_DIR = getattr(settings, 'CHUNKED_UPLOAD_DIR', os.path.join(settings.BASE_DIR, 'tmp', 'uploads'))
+MAX_UPLOAD_SIZE = getattr(settings, 'CHUNKED_UPLOAD_MAX_SIZE', 200 * 1024 * 1024)
+DEFAULT_CHUNK_SIZE = 5 * 1024 * 1024
+MIN_CHUNK_SIZE = 256 * 1024
+MAX_CHUNK_SIZE = 16 * 1024 * 1024
+SESSION_TTL = timedelta(hours=24)
+
+# Tamaño de los bloques al leer del request y al ensamblar
+BLOCK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """Error de validación de una subida; el mensaje se devuelve al cliente"""
+
+
+# ====================================================
+# Destinos de la subida
+# ====================================================
+def _petition_owned(user, target_id):
+    from petitions.models import Petition
+    customer = getattr(user, 'customer', None)
+    return customer is not None and Petition.objects.filter(
+        pk=target_id, id_customer=customer.id_customer, is_deleted=False
+    ).exists()
+
+
+def _portfolio_owned(user, target_id):
+    from portfolio.models import Portfolio
+    provider = getattr(user, 'provider', None)
+    return provider is not None and Portfolio.objects.filter(
+        pk=target_id, id_provider=provider.id_provider
+    ).exists()
+
+
+def _material_owned(user, target_id):
+    from portfolio.models import Material
+    provider = getattr(user, 'provider', None)
+    return provider is not None and Material.objects.filter(
+        pk=target_id, id_provider=provider.id_provider, is_deleted=False
+    ).exists()
+
+
+def _create_petition_attachment(session, file):
+    from petitions.models import PetitionAttachment
+    return PetitionAttachment.objects.create(
+        id_petition_id=session.target_id, file=file, id_user_create=session.user_id
+    )
+
+
+def _create_portfolio_attachment(session, file):
+    from portfolio.models import PortfolioAttachment
+    mime_type = session.content_type or ''
+    if mime_type.startswith('image/'):
+        file_type = PortfolioAttachment.FileType.IMAGE
+    elif mime_type.startswith('video/'):
+        file_type = PortfolioAttachment.FileType.VIDEO
+    elif mime_type.startswith(('application/', 'text/')):
+        file_type = PortfolioAttachment.FileType.DOCUMENT
+    else:
+        file_type = PortfolioAttachment.FileType.OTHER
+    return PortfolioAttachment.objects.create(
+        id_portfolio_id=session.target_id, file=file, file_type=file_type,
+        mime_type=session.content_type, file_size=session.total_size,
+        id_user_upload=session.user_id,
+    )
+
+
+def _create_material_attachment(session, file):
+    from portfolio.models import MaterialAttachment
+    return MaterialAttachment.objects.create(
+        id_material_id=session.target_id, file=file, id_user_upload=session.user_id
+    )
+
+
+# destino → (verificación de pertenencia, creación del adjunto)
+TARGETS = {
+    UploadSession.Target.PETITION: (_petition_owned, _create_petition_attachment),
+    UploadSession.Target.PORTFOLIO: (_portfolio_owned, _create_portfolio_attachment),
+    UploadSession.Target.MATERIAL: (_material_owned, _create_material_attachment),
+}
+
+
+# ====================================================
+# Servicio de subidas
+# ====================================================
+class UploadService:
+    """Sesiones de subida en partes y su conversión en adjuntos"""
+
+    @staticmethod
+    def session_dir(session):
+        return os.path.join(CHUNKED_UPLOAD_DIR, str(session.pk))
+
+    def _chunk_path(self, session, index):
+        return os.path.join(self.session_dir(session), f'{index}.part')
+
+    def create_session(self, user, target, target_id, filename, total_size,
+                       chunk_size=None, checksum=None, content_type=None):
+        """Valida el destino y los tamaños y abre una sesión nueva."""
+        if target not in TARGETS:
+            raise UploadError('Destino inválido.')
+        owned, _ = TARGETS[target]
+        if not owned(user, target_id):
+            raise UploadError('El destino no existe o no pertenece al usuario.')
+        if total_size <= 0 or total_size > MAX_UPLOAD_SIZE:
+            raise UploadError(f'El tamaño debe estar entre 1 y {MAX_UPLOAD_SIZE} bytes.')
+
+        chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+        if not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+            raise UploadError(f'chunk_size debe estar entre {MIN_CHUNK_SIZE} y {MAX_CHUNK_SIZE} bytes.')
+
+        filename = os.path.basename(filename)
+        session = UploadSession.objects.create(
+            user=user,
+            target=target,
+            target_id=target_id,
+            filename=filename,
+            content_type=content_type or mimetypes.guess_type(filename)[0],
+            total_size=total_size,
+            chunk_size=chunk_size,
+            checksum=checksum.lower() if checksum else None,
+            expires_at=timezone.now() + SESSION_TTL,
+        )
+        os.makedirs(self.session_dir(session), exist_ok=True)
+        return session
+
+    def received_chunks(self, session):
+        """Índices de las partes ya recibidas y verificadas."""
+        try:
+            names = os.listdir(self.session_dir(session))
+        except FileNotFoundError:
+            return []
+        return sorted(int(name[:-5]) for name in names if name.endswith('.part'))
+
+    def write_chunk(self, session, index, stream, checksum):
+        """
+        Escribe la parte index leyendo stream en bloques de BLOCK_SIZE.
+        Se guarda solo si el tamaño y el SHA-256 coinciden con lo esperado.
+        """
+        if session.status != UploadSession.Status.PENDING:
+            raise UploadError('La sesión ya no acepta partes.')
+        if not 0 <= index < session.total_chunks:
+            raise UploadError(f'Índice de parte fuera de rango (0-{session.total_chunks - 1}).')
+        if not checksum:
+            raise UploadError('Falta el checksum SHA-256 de la parte.')
+
+        expected_size = session.expected_chunk_size(index)
+        digest = hashlib.sha256()
+        written = 0
+        final_path = self._chunk_path(session, index)
+        temp_path = f'{final_path}.tmp'
+        os.makedirs(self.session_dir(session), exist_ok=True)
+
+        with open(temp_path, 'wb') as out:
+            while written <= expected_size:
+                block = stream.read(min(BLOCK_SIZE, expected_size + 1 - written))
+                if not block:
+                    break
+                out.write(block)
+                digest.update(block)
+                written += len(block)
+
+        if written != expected_size:
+            os.remove(temp_path)
+            raise UploadError(f'La parte {index} debe tener {expected_size} bytes (se recibieron {written}).')
+        if digest.hexdigest() != checksum.lower():
+            os.remove(temp_path)
+            raise UploadError(f'El checksum de la parte {index} no coincide.')
+
+        os.replace(temp_path, final_path)
+        return written
+
+    def complete(self, session):
+        """
+        Marca la sesión para ensamblar si están todas las partes y agenda la
+        tarea al confirmar. Retorna las partes faltantes (vacío si se agendó).
+        """
+        if session.status != UploadSession.Status.PENDING:
+            raise UploadError('La sesión ya fue completada.')
+        missing = sorted(set(range(session.total_chunks)) - set(self.received_chunks(session)))
+        if missing:
+            return missing
+
+        updated = UploadSession.objects.filter(
+            pk=session.pk, status=UploadSession.Status.PENDING
+        ).update(status=UploadSession.Status.PROCESSING, date_update=timezone.now())
+        if updated:
+            from .tasks import finalize_upload
+            transaction.on_commit(lambda: finalize_upload.delay(str(session.pk)))
+        session.status = UploadSession.Status.PROCESSING
+        return []
+
+    def finalize(self, session_id):
+        """
+        Ensambla las partes, verifica tamaño y checksum y crea el adjunto.
+        Retorna el id del adjunto o None si la sesión falló.
+        """
+        session = UploadSession.objects.select_related('user').filter(
+            pk=session_id, status=UploadSession.Status.PROCESSING
+        ).first()
+        if session is None:
+            return None
+
+        assembled = os.path.join(self.session_dir(session), 'assembled')
+        try:
+            digest = hashlib.sha256()
+            with open(assembled, 'wb') as out:
+                for index in range(session.total_chunks):
+                    with open(self._chunk_path(session, index), 'rb') as part:
+                        for block in iter(lambda: part.read(BLOCK_SIZE), b''):
+                            out.write(block)
+                            digest.update(block)
+
+            if os.path.getsize(assembled) != session.total_size:
+                return self._fail(session, 'El archivo ensamblado no tiene el tamaño declarado.')
+            if session.checksum and digest.hexdigest() != session.checksum:
+                return self._fail(session, 'El checksum del archivo no coincide.')
+
+            _, create_attachment = TARGETS[session.target]
+            with open(assembled, 'rb') as handle, transaction.atomic():
+                attachment = create_attachment(session, File(handle, name=session.filename))
+                session.attachment_id = attachment.pk
+                session.status = UploadSession.Status.COMPLETED
+                session.save(update_fields=['attachment_id', 'status', 'date_update'])
+        except FileNotFoundError:
+            return self._fail(session, 'Faltan partes de la subida.')
+        except Exception as e:
+            # Errores de disco, del storage o del destino (ej. eliminado):
+            # la sesión no puede quedar en 'processing' para siempre
+            print(f"Error finalizando la subida {session.pk}: {e}")
+            return self._fail(session, 'No se pudo procesar el archivo.')
+
+        shutil.rmtree(self.session_dir(session), ignore_errors=True)
+        return session.attachment_id
+
+    def _fail(self, session, error):
+        session.status = UploadSession.Status.FAILED
+        session.error = error
+        session.save(update_fields=['status', 'error', 'date_update'])
+        shutil.rmtree(self.session_dir(session), ignore_errors=True)
+        return None
+
+    def abort(self, session):
+        """Cancela la sesión y borra sus partes."""
+        shutil.rmtree(self.session_dir(session), ignore_errors=True)
+        session.delete()
+
+    def cleanup_expired(self):
+        """Elimina las sesiones vencidas y sus partes. Retorna la cantidad."""
+        expired = list(UploadSession.objects.filter(expires_at__lt=timezone.now()))
+        for session in expired:
+            self.abort(session)
+        return len(expired)
+
+
+uploads = UploadService()
@@ -0,0 +1,25 @@
+from django.urls import path
+
+from .views import (UploadSessionAPIView,
+                    UploadSessionDetailAPIView,
+                    UploadChunkAPIView,
+                    UploadCompleteAPIView)
+
+
+urlpatterns = [
+    # Abrir una sesión de subida reanudable
+    # POST /uploads/
+    path('uploads/', UploadSessionAPIView.as_view(), name='upload-session'),
+
+    # Estado / cancelación de la sesión
+    # GET | DELETE /uploads/<id>/
+    path('uploads/<uuid:session_id>/', UploadSessionDetailAPIView.as_view(), name='upload-session-detail'),
+
+    # Subir (o reemplazar) una parte
+    # PUT /uploads/<id>/chunks/<index>/
+    path('uploads/<uuid:session_id>/chunks/<int:index>/', UploadChunkAPIView.as_view(), name='upload-chunk'),
+
+    # Ensamblar y crear el adjunto
+    # POST /uploads/<id>/complete/
+    path('uploads/<uuid:session_id>/complete/', UploadCompleteAPIView.as_view(), name='upload-complete'),
+]
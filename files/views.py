@@ -0,0 +1,141 @@
+import os
+from io import BytesIO
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import Http404, HttpResponseForbidden
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_safe
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .delivery import media_delivery
+from .models import UploadSession
+from .serializers import UploadSessionCreateSerializer, UploadSessionSerializer
+from .uploads import UploadError, uploads
+
+
+# ====================================================
+# APIView: UploadSessionAPIView
+# ====================================================
+class UploadSessionAPIView(APIView):
+    """
+    Abre una sesión de subida reanudable.
+    POST /files/uploads/
+    { "target": "petition|portfolio|material", "target_id": 1, "filename": "foto.jpg",
+      "total_size": 12345678, "chunk_size"?: 5242880, "checksum"?: "<sha256>" }
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = UploadSessionCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            session = uploads.create_session(request.user, **serializer.validated_data)
+        except UploadError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(UploadSessionSerializer(session).data, status=status.HTTP_201_CREATED)
+
+
+# ====================================================
+# APIView: UploadSessionDetailAPIView
+# ====================================================
+class UploadSessionDetailAPIView(APIView):
+    """
+    GET    /files/uploads/<id>/ → estado y partes recibidas (para reanudar)
+    DELETE /files/uploads/<id>/ → cancela la subida
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, session_id):
+        session = get_object_or_404(UploadSession, pk=session_id, user=request.user)
+        return Response(UploadSessionSerializer(session).data, status=status.HTTP_200_OK)
+
+    def delete(self, request, session_id):
+        session = get_object_or_404(UploadSession, pk=session_id, user=request.user)
+        if session.status == UploadSession.Status.PROCESSING:
+            return Response({'detail': 'La subida se está ensamblando.'}, status=status.HTTP_409_CONFLICT)
+        uploads.abort(session)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+# ====================================================
+# APIView: UploadChunkAPIView
+# ====================================================
+class UploadChunkAPIView(APIView):
+    """
+    Recibe una parte como cuerpo crudo (application/octet-stream).
+    PUT /files/uploads/<id>/chunks/<index>/
+    Header X-Chunk-Checksum: SHA-256 (hex) de la parte.
+    El cuerpo se lee en bloques desde request.stream y se escribe directo a
+    disco: nunca se accede a request.data ni a request.body.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def put(self, request, session_id, index):
+        session = get_object_or_404(UploadSession, pk=session_id, user=request.user)
+        try:
+            size = uploads.write_chunk(
+                session, index, request.stream or BytesIO(), request.headers.get('X-Chunk-Checksum')
+            )
+        except UploadError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'index': index, 'size': size}, status=status.HTTP_200_OK)
+
+
+# ====================================================
+# APIView: UploadCompleteAPIView
+# ====================================================
+class UploadCompleteAPIView(APIView):
+    """
+    Cierra la subida: si están todas las partes se ensambla en segundo plano
+    (202, consultar el estado con GET); si faltan, 409 con la lista.
+    POST /files/uploads/<id>/complete/
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, session_id):
+        session = get_object_or_404(UploadSession, pk=session_id, user=request.user)
+        try:
+            missing = uploads.complete(session)
+        except UploadError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if missing:
+            return Response(
+                {'detail': 'Faltan partes.', 'missing_chunks': missing},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response(UploadSessionSerializer(session).data, status=status.HTTP_202_ACCEPTED)
+
+
+# ====================================================
+# Vista: serve_media
+# ====================================================
+@require_safe
+def serve_media(request, path):
+    """
+    Descarga de archivos de MEDIA.
+    GET /media/<path>?exp=<vencimiento>&sig=<firma>
+    Los archivos protegidos exigen una firma vigente (la agrega el storage al
+    armar la URL); no se consulta la base ni se requiere token, así sirve
+    para <img src>. Los bytes los transfiere el proxy o, en desarrollo, Django.
+    """
+    name = media_delivery.clean_name(path)
+    if name is None:
+        raise Http404
+
+    expires = None
+    if media_delivery.is_protected(name):
+        expires = media_delivery.verify(name, request.GET.get('exp'), request.GET.get('sig'))
+        if expires is None:
+            return HttpResponseForbidden('URL vencida o inválida.')
+
+    try:
+        full_path = default_storage.path(name)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    return media_delivery.response(request, name, full_path, expires)
@@ -0,0 +1,127 @@
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from .models import CustomerRating, GradeCustomer, GradeProvider, ProviderRating
+
+"""
+Agregados de calificaciones por usuario.
+
+ProviderRating y CustomerRating guardan la suma, la cantidad, el promedio y el
+histograma (1 a 5) de las calificaciones visibles que recibió cada usuario, de
+modo que leer el promedio es una consulta por clave primaria y los listados
+pueden ordenar o filtrar por user__provider_rating__average.
+
+Las señales de grades.signals aplican la diferencia entre la contribución
+anterior y la nueva de cada calificación al crearla, modificarla, ocultarla
+(is_visible) o eliminarla. rebuild() recalcula todo desde las calificaciones.
+"""
+
+# Modelo de calificación → (modelo de agregado, campo del usuario calificado)
+AGGREGATES = {
+    GradeProvider: (ProviderRating, 'provider_id'),
+    GradeCustomer: (CustomerRating, 'customer_id'),
+}
+
+
+# ====================================================
+# Contribución de una calificación
+# ====================================================
+def contribution(grade):
+    """
+    Retorna (user_id, rating) con lo que la calificación aporta al agregado,
+    o None si no aporta (oculta o sin rating).
+    """
+    if grade is None or not grade.is_visible or grade.rating is None:
+        return None
+    _, user_field = AGGREGATES[type(grade)]
+    return getattr(grade, user_field), grade.rating
+
+
+def previous_contribution(grade):
+    """
+    Igual que contribution() pero con los valores que la calificación tenía
+    en la base antes del guardado en curso (FieldTrackerMixin).
+    """
+    if grade.pk is None or grade._state.adding:
+        return None
+    _, user_field = AGGREGATES[type(grade)]
+    rating = grade.previous_value('rating')
+    if not grade.previous_value('is_visible') or rating is None:
+        return None
+    return grade.previous_value(user_field.removesuffix('_id')), rating
+
+
+# ====================================================
+# Actualización incremental
+# ====================================================
+def apply_change(grade_model, before, after):
+    """
+    Aplica al agregado el cambio de contribución de una calificación.
+    before/after son los valores de contribution() antes y después del cambio.
+    """
+    if before == after:
+        return
+    aggregate_model, _ = AGGREGATES[grade_model]
+    with transaction.atomic():
+        if before:
+            _add(aggregate_model, *before, sign=-1)
+        if after:
+            _add(aggregate_model, *after, sign=1)
+
+
+def _add(aggregate_model, user_id, rating, sign):
+    aggregate_model.objects.get_or_create(user_id=user_id)
+    aggregate = aggregate_model.objects.select_for_update().get(user_id=user_id)
+    aggregate.total_sum = max(aggregate.total_sum + sign * rating, 0)
+    aggregate.total_count = max(aggregate.total_count + sign, 0)
+    if 1 <= rating <= 5:
+        bucket = f'rating_{rating}'
+        setattr(aggregate, bucket, max(getattr(aggregate, bucket) + sign, 0))
+    aggregate.refresh_average()
+    aggregate.save()
+
+
+# ====================================================
+# Lectura
+# ====================================================
+def provider_rating(user_id):
+    """Retorna el ProviderRating del usuario (vacío si no tiene calificaciones)."""
+    return ProviderRating.objects.filter(user_id=user_id).first() or ProviderRating(user_id=user_id)
+
+
+def customer_rating(user_id):
+    """Retorna el CustomerRating del usuario (vacío si no tiene calificaciones)."""
+    return CustomerRating.objects.filter(user_id=user_id).first() or CustomerRating(user_id=user_id)
+
+
+# ====================================================
+# Reconstrucción completa
+# ====================================================
+def rebuild():
+    """Recalcula todos los agregados. Retorna (proveedores, clientes)."""
+    totals = []
+    with transaction.atomic():
+        for grade_model, (aggregate_model, user_field) in AGGREGATES.items():
+            rows = (
+                grade_model.objects
+                .filter(is_visible=True, rating__isnull=False)
+                .values(user_field)
+                .annotate(
+                    total_sum=Sum('rating'),
+                    total_count=Count('rating'),
+                    **{
+                        f'rating_{value}': Count('rating', filter=Q(rating=value))
+                        for value in range(1, 6)
+                    }
+                )
+            )
+            aggregates = []
+            for row in rows:
+                aggregate = aggregate_model(user_id=row.pop(user_field), **row)
+                aggregate.refresh_average()
+                aggregates.append(aggregate)
+
+            aggregate_model.objects.all().delete()
+            aggregate_model.objects.bulk_create(aggregates, batch_size=1000)
+            totals.append(len(aggregates))
+    return tuple(totals)
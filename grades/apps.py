@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class GradesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'grades'
+
+    def ready(self):
+        """
+        Importacion de las señales al iniciar la aplicacion.
+        """
+        import grades.signals
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from grades import aggregates
+
+
+class Command(BaseCommand):
+    """
+    Recalcula desde cero los agregados de calificaciones por usuario.
+    Uso: python manage.py rebuild_rating_aggregates
+    """
+    help = 'Recalcula la suma, cantidad, promedio e histograma de calificaciones de proveedores y clientes.'
+
+    def handle(self, *args, **options):
+        providers, customers = aggregates.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Agregados reconstruidos: {providers} proveedores, {customers} clientes.'
+        ))
@@ -1,5 +1,6 @@
 from django.db import models
 from authentication.models import Provider, Customer, User
+from integracion_comunitaria.tracking import FieldTrackerMixin
 
 # ====================================================
 # Modelo que representa los posibles "grados" o calificaciones
@@ -21,7 +22,7 @@ class Grade(models.Model):
 # ====================================================
 # Calificaciones que los Providers dan a los Customers
 # ====================================================
-class GradeCustomer(models.Model):
+class GradeCustomer(FieldTrackerMixin, models.Model):
     id_grade_customer = models.AutoField(primary_key=True)
     customer = models.ForeignKey(
         User, on_delete=models.CASCADE, db_column='id_customer',
@@ -45,6 +46,9 @@ class GradeCustomer(models.Model):
     date_create = models.DateTimeField(auto_now_add=True)
     date_update = models.DateTimeField(auto_now=True)
 
+    # Campos que determinan el agregado del cliente (grades.aggregates)
+    tracked_fields = ('customer', 'rating', 'is_visible')
+
     class Meta:
         db_table = 'n_grade_customer'
         verbose_name = 'Grade Customer'
@@ -58,7 +62,7 @@ class GradeCustomer(models.Model):
 # ====================================================
 # Calificaciones que los Customers dan a los Providers
 # ====================================================
-class GradeProvider(models.Model):
+class GradeProvider(FieldTrackerMixin, models.Model):
     id_grade_provider = models.AutoField(primary_key=True)
     provider = models.ForeignKey(User, on_delete=models.CASCADE, db_column='id_provider', related_name='grade_provider')
     customer = models.ForeignKey(User, on_delete=models.CASCADE, db_column='id_customer', related_name='grade_customer')  # cliente que califica
@@ -72,6 +76,9 @@ class GradeProvider(models.Model):
     date_create = models.DateTimeField(auto_now_add=True)
     date_update = models.DateTimeField(auto_now=True)
 
+    # Campos que determinan el agregado del proveedor (grades.aggregates)
+    tracked_fields = ('provider', 'rating', 'is_visible')
+
     class Meta:
         db_table = 'n_grade_provider'
         verbose_name = 'Grade Provider'
@@ -81,3 +88,56 @@ class GradeProvider(models.Model):
     def __str__(self):
         return f"Grade {self.grade.value} for {self.provider} by {self.customer}"
 
+
+# ====================================================
+# Agregados de calificaciones por usuario
+# ====================================================
+class RatingAggregate(models.Model):
+    """
+    Suma, cantidad, promedio e histograma (1 a 5) de las calificaciones
+    visibles recibidas por un usuario. Se mantiene desde grades.aggregates.
+    """
+    total_sum = models.PositiveIntegerField(default=0)
+    total_count = models.PositiveIntegerField(default=0)
+    average = models.FloatField(null=True, blank=True, db_index=True)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def histogram(self):
+        return {str(value): getattr(self, f'rating_{value}') for value in range(1, 6)}
+
+    def refresh_average(self):
+        self.average = round(self.total_sum / self.total_count, 2) if self.total_count else None
+
+
+# ====================================================
+# Agregado de las calificaciones recibidas por un Provider
+# ====================================================
+class ProviderRating(RatingAggregate):
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True,
+        db_column='id_user', related_name='provider_rating'
+    )
+
+    class Meta:
+        db_table = 'n_provider_rating'
+
+
+# ====================================================
+# Agregado de las calificaciones recibidas por un Customer
+# ====================================================
+class CustomerRating(RatingAggregate):
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True,
+        db_column='id_user', related_name='customer_rating'
+    )
+
+    class Meta:
+        db_table = 'n_customer_rating'
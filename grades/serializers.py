@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from .models import Grade, GradeCustomer, GradeProvider
 from authentication.models import User
-from django.conf import settings
+from files.derivatives import derivatives
 
 # ====================================================
 # Serializer simple para el modelo Grade
@@ -36,8 +36,8 @@ class UserBasicSerializer(serializers.ModelSerializer):
             if image_str.startswith("http"):
                 return image_str
 
-            # 🔹 Si es un archivo local
-            return f"{settings.MEDIA_URL}{image_str}"
+            # 🔹 Si es un archivo local: miniatura (o el original si todavía no está lista)
+            return derivatives.url(image_str, 'thumb')
 
         return None
 
@@ -0,0 +1,32 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import aggregates
+from .models import GradeCustomer, GradeProvider
+
+
+# ====================================================
+# SIGNAL: update_rating_on_save
+# ====================================================
+@receiver(post_save, sender=GradeProvider)
+@receiver(post_save, sender=GradeCustomer)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    """
+    Actualiza el agregado del usuario calificado al crear, modificar u
+    ocultar (is_visible) una calificación. La contribución previa sale de
+    los valores registrados al cargar la instancia, sin releer la fila.
+    """
+    before = None if created else aggregates.previous_contribution(instance)
+    aggregates.apply_change(sender, before, aggregates.contribution(instance))
+
+
+# ====================================================
+# SIGNAL: update_rating_on_delete
+# ====================================================
+@receiver(post_delete, sender=GradeProvider)
+@receiver(post_delete, sender=GradeCustomer)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """
+    Descuenta la calificación eliminada del agregado del usuario calificado.
+    """
+    aggregates.apply_change(sender, aggregates.contribution(instance), None)
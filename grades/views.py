@@ -3,8 +3,9 @@ from rest_framework.response import Response
 from rest_framework import status, permissions
 from authentication.models import User, Customer, Provider
 from .models import GradeProvider, GradeCustomer
+from . import aggregates
 from .serializers import GradeProviderSerializer, GradeProviderWriteSerializer, GradeCustomerSerializer, GradeCustomerWriteSerializer
-from django.db import connection
+from integracion_comunitaria.pagination import DateCreateCursorPagination, paginated_response
 
 
 
@@ -30,10 +31,9 @@ class GradeProviderAPIView(APIView):
 
         if customer_id:
             queryset = queryset.filter(customer_id=customer_id)
-        
-        queryset = queryset.order_by('-date_create')
-        serializer = GradeProviderSerializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+
+        return paginated_response(request, queryset, GradeProviderSerializer,
+                                  DateCreateCursorPagination, view=self)
 
     def post(self, request):
         """
@@ -105,21 +105,17 @@ class GradeProviderDetailAPIView(APIView):
 # ====================================================
 class ProviderAverageRatingView(APIView):
     def get(self, request, provider_id):
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                SELECT AVG(rating) as avg_rating
-                FROM n_grade_provider
-                WHERE id_provider = %s
-            """, [provider_id])
-            row = cursor.fetchone()  # Solo un resultado
-
-        if row[0] is None:
-            return Response({"id_provider": provider_id, "avg_rating": None})
-        
-        return Response({"id_provider": provider_id, "avg_rating": float(row[0])})
-
-
-
+        """
+        Promedio de calificaciones visibles de un proveedor, leído de su
+        agregado (grades.aggregates) en lugar de recalcular AVG(rating).
+        """
+        rating = aggregates.provider_rating(provider_id)
+        return Response({
+            "id_provider": provider_id,
+            "avg_rating": rating.average,
+            "total_reviews": rating.total_count,
+            "histogram": rating.histogram,
+        })
 
 
 # ====================================================
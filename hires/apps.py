@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class HiresConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'hires'
+
+    def ready(self):
+        """
+        Importacion de las señales al iniciar la aplicacion.
+        """
+        import hires.signals
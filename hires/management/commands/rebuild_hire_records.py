@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from hires import records
+
+
+class Command(BaseCommand):
+    """
+    Reconstruye desde cero las contrataciones materializadas (Hire).
+    Uso: python manage.py rebuild_hire_records
+    """
+    help = 'Recalcula las contrataciones (postulaciones ganadoras) con sus resúmenes y totales.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        total = records.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Contrataciones reconstruidas: {total}.'))
@@ -1,3 +1,49 @@
 from django.db import models
 
-# Create your models here.
+
+# ====================================================
+# Modelo: Hire
+# ====================================================
+class Hire(models.Model):
+    """
+    Contratación materializada: una fila por postulación en estado Ganadora,
+    con los resúmenes de petición, cliente y proveedor, el presupuesto, los
+    materiales y los totales ya calculados (ver hires.records).
+    /api/contrataciones/ lee solo esta tabla.
+    Las imágenes de perfil se guardan como nombre de archivo: la URL
+    (firmada y con vencimiento) se arma al serializar.
+    """
+    postulation = models.OneToOneField(
+        'postulations.Postulation',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        db_column='id_postulation',
+        related_name='hire'
+    )
+    id_petition = models.IntegerField(db_index=True)
+    id_customer = models.IntegerField(null=True)
+    id_provider = models.IntegerField()
+    customer_user_id = models.IntegerField(null=True, db_index=True)
+    provider_user_id = models.IntegerField(null=True, db_index=True)
+
+    proposal = models.CharField(max_length=255, null=True, blank=True)
+    petition = models.JSONField(null=True)
+    customer = models.JSONField(null=True)
+    provider = models.JSONField(null=True)
+    budget = models.JSONField(default=list)
+    materials = models.JSONField(default=list)
+
+    final_price = models.DecimalField(max_digits=15, decimal_places=2, null=True)
+    materials_total = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    approved_at = models.DateTimeField(null=True)
+    date_refresh = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'n_hire'
+        indexes = [
+            models.Index(fields=['id_customer', '-approved_at'], name='idx_hire_customer'),
+            models.Index(fields=['id_provider', '-approved_at'], name='idx_hire_provider'),
+        ]
+
+    def __str__(self):
+        return f"Hire {self.postulation_id} (petition {self.id_petition})"
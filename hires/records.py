@@ -0,0 +1,152 @@
+import threading
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from postulations.models import Postulation, PostulationState
+from authentication.models import Customer, Provider
+from .models import Hire
+from .serializers import HireValuesSerializer
+
+"""
+Modelo de lectura materializado de las contrataciones (Hire).
+
+Cada postulación en estado Ganadora tiene una fila en Hire con todo lo que
+devuelve /api/contrataciones/: resúmenes de petición, cliente y proveedor,
+presupuesto, materiales, precio final y total de materiales. La fila se arma
+con HireValuesSerializer (misma salida que antes) y se reemplaza cuando cambia
+alguno de sus datos de origen.
+
+Las señales de hires.signals llaman a schedule(); las actualizaciones se
+agrupan y se ejecutan una sola vez por postulación al confirmar la transacción.
+"""
+
+
+# ====================================================
+# Actualización diferida (una vez por postulación y transacción)
+# ====================================================
+_pending = threading.local()
+
+
+def _pending_ids():
+    ids = getattr(_pending, 'ids', None)
+    if ids is None:
+        ids = _pending.ids = set()
+    return ids
+
+
+def _flush():
+    ids = _pending_ids()
+    _pending.ids = set()
+    if ids:
+        refresh(ids)
+
+
+def schedule(*postulation_ids):
+    """Recalcula las contrataciones de las postulaciones al confirmar la transacción."""
+    postulation_ids = [pk for pk in postulation_ids if pk is not None]
+    if not postulation_ids:
+        return
+    _pending_ids().update(postulation_ids)
+    transaction.on_commit(_flush)
+
+
+def schedule_hires(**filters):
+    """Recalcula las contrataciones existentes que cumplen filters (ej. id_petition=3)."""
+    schedule(*Hire.objects.filter(**filters).values_list('postulation_id', flat=True))
+
+
+# ====================================================
+# Construcción
+# ====================================================
+class HireRecordValuesSerializer(HireValuesSerializer):
+    """
+    HireValuesSerializer para materializar: deja el nombre guardado de la
+    imagen de perfil en lugar de la URL, que vence (files.delivery).
+    """
+
+    def _get_profile_image_url(self, name):
+        return name or None
+
+
+def refresh(postulation_ids):
+    """
+    Crea, actualiza o elimina las filas de Hire de las postulaciones según su
+    estado actual. Retorna la cantidad de contrataciones vigentes.
+    """
+    postulation_ids = set(postulation_ids)
+    winners = Postulation.objects.filter(
+        pk__in=postulation_ids,
+        id_state=PostulationState.resolve(PostulationState.WINNER),
+    )
+
+    sources = {
+        row['id_postulation']: row
+        for row in winners.values(
+            'id_postulation', 'date_update', 'id_petition', 'id_provider', 'id_petition__id_customer'
+        )
+    }
+    records = HireRecordValuesSerializer().serialize(winners.filter(pk__in=list(sources)))
+
+    customer_users = dict(
+        Customer.objects.filter(id_customer__in={s['id_petition__id_customer'] for s in sources.values()})
+        .values_list('id_customer', 'user_id')
+    )
+    provider_users = dict(
+        Provider.objects.filter(id_provider__in={s['id_provider'] for s in sources.values()})
+        .values_list('id_provider', 'user_id')
+    )
+
+    now = timezone.now()
+    hires = []
+    for data in records:
+        source = sources[data['id_postulation']]
+        materials_total = sum(
+            (Decimal(str(m['total'])) for m in data['materials'] if m['total'] is not None),
+            Decimal('0')
+        )
+        hires.append(Hire(
+            postulation_id=data['id_postulation'],
+            id_petition=source['id_petition'],
+            id_customer=source['id_petition__id_customer'],
+            id_provider=source['id_provider'],
+            customer_user_id=customer_users.get(source['id_petition__id_customer']),
+            provider_user_id=provider_users.get(source['id_provider']),
+            proposal=data['proposal'],
+            petition=data['petition'],
+            customer=data['customer'],
+            provider=data['provider'],
+            budget=data['budget'],
+            materials=data['materials'],
+            final_price=Decimal(str(data['final_price'])) if data['final_price'] is not None else None,
+            materials_total=materials_total,
+            approved_at=source['date_update'],
+            date_refresh=now,
+        ))
+
+    fields = [
+        'id_petition', 'id_customer', 'id_provider', 'customer_user_id', 'provider_user_id',
+        'proposal', 'petition', 'customer', 'provider', 'budget', 'materials',
+        'final_price', 'materials_total', 'approved_at', 'date_refresh',
+    ]
+    with transaction.atomic():
+        Hire.objects.filter(pk__in=postulation_ids - set(sources)).delete()
+        existing = set(Hire.objects.filter(pk__in=list(sources)).values_list('postulation_id', flat=True))
+        Hire.objects.bulk_create([h for h in hires if h.postulation_id not in existing])
+        Hire.objects.bulk_update([h for h in hires if h.postulation_id in existing], fields, batch_size=500)
+    return len(hires)
+
+
+def rebuild(batch_size=500):
+    """Reconstruye todas las contrataciones. Retorna la cantidad."""
+    winner_state = PostulationState.resolve(PostulationState.WINNER)
+    winner_ids = list(
+        Postulation.objects.filter(id_state=winner_state).values_list('id_postulation', flat=True)
+    )
+    with transaction.atomic():
+        Hire.objects.exclude(postulation__id_state=winner_state).delete()
+        total = 0
+        for i in range(0, len(winner_ids), batch_size):
+            total += refresh(winner_ids[i:i + batch_size])
+    return total
@@ -2,10 +2,13 @@ from decimal import Decimal
 from rest_framework import serializers
 
 from postulations.models import Postulation, PostulationBudget, PostulationMaterial
-from postulations.serializers import PostulationBudgetSerializer
+from postulations.serializers import PostulationBudgetSerializer, PostulationBudgetValuesSerializer
 from petitions.models import Petition
 from authentication.models import Customer, Provider
-from portfolio.serializers import PostulationMaterialSerializer
+from portfolio.serializers import PostulationMaterialSerializer, PostulationMaterialValuesSerializer
+from integracion_comunitaria.values_serializers import ValuesSerializer
+from .models import Hire
+from files.derivatives import derivatives
 
 
 # ====================================================
@@ -213,9 +216,217 @@ class HireSerializer(serializers.ModelSerializer):
         if not user.profile_image:
             return None
 
-        # Si es ImageField
+        # Si es ImageField: miniatura (o el original si todavía no está lista)
         if hasattr(user.profile_image, "url"):
-            return user.profile_image.url
+            return derivatives.url(user.profile_image.name, "thumb")
 
         # Si es un texto
-        return str(user.profile_image)
\ No newline at end of file
+        return str(user.profile_image)
+
+
+# ====================================================
+# Mapas de contexto para HireSerializer
+# ====================================================
+
+def get_hire_context_maps(postulations):
+    """
+    Precarga en bloque las peticiones, clientes y proveedores de una lista de
+    postulaciones y retorna los mapas que HireSerializer espera en su contexto
+    ('petition_map', 'customer_map', 'provider_map').
+    """
+    # CORRECCIÓN: Se usa 'id_petition_id' para obtener el ID numérico
+    # en lugar del objeto completo de Petition.
+    petition_ids = {obj.id_petition_id for obj in postulations}
+    provider_ids = {obj.id_provider for obj in postulations if obj.id_provider is not None}
+
+    petitions = (
+        Petition.objects.filter(id_petition__in=petition_ids)
+        .select_related("id_state", "id_type_petition")
+        .prefetch_related("categories")
+    )
+    petition_map = {petition.id_petition: petition for petition in petitions}
+
+    customer_ids = {
+        petition.id_customer for petition in petitions if petition.id_customer
+    }
+
+    customers = Customer.objects.filter(
+        id_customer__in=customer_ids
+    ).select_related("user")
+    customer_map = {customer.id_customer: customer for customer in customers}
+
+    providers = Provider.objects.filter(
+        id_provider__in=provider_ids
+    ).select_related("user", "profession")
+    provider_map = {provider.id_provider: provider for provider in providers}
+
+    return {
+        "petition_map": petition_map,
+        "customer_map": customer_map,
+        "provider_map": provider_map,
+    }
+
+
+# ====================================================
+# Serializer rápido (filas .values()) para Hire
+# ====================================================
+
+class HireValuesSerializer(ValuesSerializer):
+    """
+    Versión de solo lectura de HireSerializer sobre filas .values().
+    Produce la misma salida; peticiones, clientes, proveedores, presupuestos
+    y materiales se cargan una sola vez por lote en prepare().
+    """
+
+    serializer_class = HireSerializer
+    extra_lookups = ("id_petition", "id_provider")
+
+    def prepare(self, rows):
+        petition_ids = {row["id_petition"] for row in rows}
+        provider_ids = {row["id_provider"] for row in rows if row["id_provider"] is not None}
+        postulation_ids = [row["id_postulation"] for row in rows]
+
+        self._petitions = {
+            petition["id_petition"]: petition
+            for petition in Petition.objects.filter(id_petition__in=petition_ids)
+            .values("id_petition", "description", "id_customer")
+        }
+        customer_ids = {p["id_customer"] for p in self._petitions.values() if p["id_customer"]}
+        self._customers = {
+            customer["id_customer"]: customer
+            for customer in Customer.objects.filter(id_customer__in=customer_ids)
+            .values("id_customer", "user", "user__name", "user__lastname", "user__profile_image")
+        }
+        self._providers = {
+            provider["id_provider"]: provider
+            for provider in Provider.objects.filter(id_provider__in=provider_ids)
+            .values("id_provider", "user", "user__name", "user__lastname",
+                    "user__profile_image", "profession__name")
+        }
+
+        self._budgets = {pk: [] for pk in postulation_ids}
+        self._amounts = {pk: [] for pk in postulation_ids}
+        budget_rows = list(PostulationBudgetValuesSerializer.values(
+            PostulationBudget.objects.filter(id_postulation__in=postulation_ids).order_by("id_budget"),
+            "id_postulation",
+        ))
+        budget_data = PostulationBudgetValuesSerializer().serialize_rows(budget_rows)
+        for row, data in zip(budget_rows, budget_data):
+            self._budgets[row["id_postulation"]].append(data)
+            self._amounts[row["id_postulation"]].append(row["amount"])
+
+        self._materials = {pk: [] for pk in postulation_ids}
+        material_rows = list(PostulationMaterialValuesSerializer.values(
+            PostulationMaterial.objects.filter(id_postulation__in=postulation_ids)
+            .order_by("id_postulation_material"),
+            "id_postulation",
+        ))
+        material_data = PostulationMaterialValuesSerializer().serialize_rows(material_rows)
+        for row, data in zip(material_rows, material_data):
+            self._materials[row["id_postulation"]].append(data)
+
+    def get_petition(self, row):
+        petition = self._petitions.get(row["id_petition"])
+        if petition:
+            return {
+                "id": petition["id_petition"],
+                "title": petition["description"],
+            }
+        return None
+
+    def get_customer(self, row):
+        petition = self._petitions.get(row["id_petition"])
+        if petition and petition["id_customer"]:
+            customer = self._customers.get(petition["id_customer"])
+            if customer and customer["user"]:
+                return {
+                    "id": customer["id_customer"],
+                    "name": customer["user__name"],
+                    "lastname": customer["user__lastname"],
+                    "profile_image": self._get_profile_image_url(customer["user__profile_image"]),
+                }
+        return None
+
+    def get_provider(self, row):
+        provider = self._providers.get(row["id_provider"])
+        if provider and provider["user"]:
+            return {
+                "id": provider["id_provider"],
+                "name": provider["user__name"],
+                "lastname": provider["user__lastname"],
+                "profession": provider["profession__name"],
+                "profile_image": self._get_profile_image_url(provider["user__profile_image"]),
+            }
+        return None
+
+    def get_final_price(self, row):
+        amounts = self._amounts[row["id_postulation"]]
+        if amounts:
+            total = sum(
+                Decimal(str(amount))
+                for amount in amounts
+                if amount is not None
+            )
+            return float(total) if total > 0 else None
+        return None
+
+    def get_budget(self, row):
+        return self._budgets[row["id_postulation"]]
+
+    def get_materials(self, row):
+        return self._materials[row["id_postulation"]]
+
+    def _get_profile_image_url(self, name):
+        """Equivalente a HireSerializer._get_profile_image_url a partir del nombre guardado."""
+        if not name:
+            return None
+        return derivatives.url(name, "thumb")
+
+
+# ====================================================
+# Serializer del modelo materializado (Hire)
+# ====================================================
+
+class HireRecordSerializer(serializers.ModelSerializer):
+    """
+    Serializa una fila de Hire con la misma salida que HireSerializer, más
+    materials_total. Solo arma las URLs de las imágenes de perfil (firmadas);
+    el resto viene precalculado en la fila.
+    """
+
+    id_postulation = serializers.IntegerField(source="postulation_id", read_only=True)
+    customer = serializers.SerializerMethodField()
+    provider = serializers.SerializerMethodField()
+    final_price = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Hire
+        fields = [
+            "id_postulation",
+            "proposal",
+            "petition",
+            "customer",
+            "provider",
+            "approved_at",
+            "final_price",
+            "budget",
+            "materials",
+            "materials_total",
+        ]
+
+    def _with_image_url(self, summary):
+        if not summary:
+            return summary
+        summary = dict(summary)
+        name = summary.get("profile_image")
+        summary["profile_image"] = derivatives.url(name, "thumb") if name else None
+        return summary
+
+    def get_customer(self, obj):
+        return self._with_image_url(obj.customer)
+
+    def get_provider(self, obj):
+        return self._with_image_url(obj.provider)
+
+    def get_final_price(self, obj):
+        return float(obj.final_price) if obj.final_price is not None else None
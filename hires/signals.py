@@ -0,0 +1,73 @@
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from authentication.models import Provider, User
+from petitions.models import Petition
+from portfolio.models import Material
+from postulations.models import Postulation, PostulationBudget, PostulationMaterial, PostulationState
+from . import records
+from .models import Hire
+
+
+# ====================================================
+# SIGNAL: refresh_hire_on_postulation
+# ====================================================
+@receiver(post_save, sender=Postulation)
+def refresh_hire_on_postulation(sender, instance, created, **kwargs):
+    """
+    Crea o actualiza la contratación cuando la postulación es (o deja de ser)
+    ganadora. El estado previo sale de la foto del FieldTrackerMixin; una
+    postulación nueva no tiene estado previo (y consultarlo haría un SELECT).
+    """
+    winner_state = PostulationState.resolve(PostulationState.WINNER)
+    if instance.id_state_id == winner_state or (
+        not created and instance.previous_value('id_state') == winner_state
+    ):
+        records.schedule(instance.pk)
+
+
+# ====================================================
+# SIGNAL: refresh_hire_on_quote
+# ====================================================
+@receiver([post_save, post_delete], sender=PostulationBudget)
+@receiver([post_save, post_delete], sender=PostulationMaterial)
+def refresh_hire_on_quote(sender, instance, **kwargs):
+    """
+    Recalcula presupuesto, materiales y totales de la contratación.
+    Para postulaciones no ganadoras refresh() no crea ninguna fila.
+    """
+    records.schedule(instance.id_postulation_id)
+
+
+# ====================================================
+# SIGNAL: refresh_hires_on_source
+# ====================================================
+@receiver(post_save, sender=Petition)
+def refresh_hires_on_petition(sender, instance, **kwargs):
+    records.schedule_hires(id_petition=instance.pk)
+
+
+@receiver(post_save, sender=Provider)
+def refresh_hires_on_provider(sender, instance, **kwargs):
+    records.schedule_hires(id_provider=instance.pk)
+
+
+@receiver(post_save, sender=Material)
+def refresh_hires_on_material(sender, instance, **kwargs):
+    records.schedule(*PostulationMaterial.objects.filter(
+        id_material=instance.pk, id_postulation__hire__isnull=False
+    ).values_list('id_postulation', flat=True))
+
+
+@receiver(post_save, sender=User)
+def refresh_hires_on_user(sender, instance, update_fields=None, **kwargs):
+    """
+    Actualiza nombre e imagen de perfil en las contrataciones del usuario.
+    Los guardados parciales de otros campos (ej. last_login) se ignoran.
+    """
+    if update_fields is not None and not {'name', 'lastname', 'profile_image'} & set(update_fields):
+        return
+    records.schedule(*Hire.objects.filter(
+        Q(customer_user_id=instance.pk) | Q(provider_user_id=instance.pk)
+    ).values_list('postulation_id', flat=True))
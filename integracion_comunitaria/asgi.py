@@ -18,6 +18,7 @@ from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
 from django.core.asgi import get_asgi_application
 import notifications.routing
+import chat.routing
 
 # Establece el módulo de configuración predeterminado de Django para ASGI
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'integracion_comunitaria.settings')
@@ -35,9 +36,18 @@ application = ProtocolTypeRouter({
     "websocket": AuthMiddlewareStack(
 
         # URLRouter se encarga de enrutar las conexiones WebSocket
-        # a los consumidores definidos en notifications.routing
+        # a los consumidores definidos en notifications.routing y chat.routing
         URLRouter(
             notifications.routing.websocket_urlpatterns
+            + chat.routing.websocket_urlpatterns
         )
     ),
 })
+
+
+# Precarga del índice de autocompletado de ciudades (ver wsgi.py)
+try:
+    from locations.search import city_index
+    city_index.warm()
+except Exception as e:
+    print(f"No se pudo precargar el índice de ciudades: {e}")
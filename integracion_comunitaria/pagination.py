@@ -0,0 +1,169 @@
+from base64 import b64decode, b64encode
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .values_serializers import fast_serialization_enabled
+
+"""
+Paginación por cursor (keyset) para los listados de la API.
+
+El cursor codifica la posición del último elemento de la página sobre la clave
+de ordenamiento natural de cada tabla (date_create, created_at o la clave
+primaria), por lo que pedir una página profunda cuesta lo mismo que pedir la
+primera: no hay OFFSET. La clave primaria se agrega como desempate para que
+el orden sea estable aunque varias filas compartan la misma fecha.
+
+Parámetros de consulta:
+    - cursor: valor opaco devuelto en 'next' / 'previous'
+    - page_size: tamaño de página (máximo max_page_size)
+
+Para historiales que se leen desde el final (mensajes de chat) está
+KeysetHistoryPagination, con anclas before / after sobre (fecha, pk).
+"""
+
+
+# ====================================================
+# Paginaciones base
+# ====================================================
+class BaseCursorPagination(CursorPagination):
+    """Configuración común para todos los listados paginados por cursor."""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class DateCreateCursorPagination(BaseCursorPagination):
+    """Más recientes primero, para tablas con date_create."""
+    ordering = ('-date_create', '-pk')
+
+
+class CreatedAtCursorPagination(BaseCursorPagination):
+    """Más recientes primero, para tablas con created_at."""
+    ordering = ('-created_at', '-pk')
+
+
+class PrimaryKeyCursorPagination(BaseCursorPagination):
+    """Orden de inserción, para tablas sin columna de fecha."""
+    ordering = ('pk',)
+
+
+# ====================================================
+# Historial bidireccional (fecha, pk)
+# ====================================================
+class KeysetHistoryPagination(BasePagination):
+    """
+    Historial que se recorre hacia atrás desde el elemento más reciente.
+
+    La posición es el par (date_field, pk) del elemento ancla, codificado en un
+    cursor opaco. Sin anclas devuelve la página más reciente; con ?before=
+    las anteriores al ancla y con ?after= las posteriores. Cada página se
+    devuelve en orden cronológico, con 'previous' (más antiguos) y 'next'
+    (más recientes) cuando existen.
+    """
+    date_field = 'created_at'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    before_query_param = 'before'
+    after_query_param = 'after'
+    invalid_cursor_message = 'Cursor inválido'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        date_field, pk_name = self.date_field, queryset.model._meta.pk.name
+
+        before = self.decode_cursor(request.query_params.get(self.before_query_param))
+        after = self.decode_cursor(request.query_params.get(self.after_query_param))
+
+        if after is not None:
+            date, pk = after
+            queryset = queryset.filter(
+                Q(**{f'{date_field}__gt': date}) | Q(**{date_field: date, f'{pk_name}__gt': pk})
+            ).order_by(date_field, pk_name)
+            page = list(queryset[:self.page_size + 1])
+            self.has_newer = len(page) > self.page_size
+            self.has_older = True
+            self.page = page[:self.page_size]
+        else:
+            if before is not None:
+                date, pk = before
+                queryset = queryset.filter(
+                    Q(**{f'{date_field}__lt': date}) | Q(**{date_field: date, f'{pk_name}__lt': pk})
+                )
+            queryset = queryset.order_by(f'-{date_field}', f'-{pk_name}')
+            page = list(queryset[:self.page_size + 1])
+            self.has_older = len(page) > self.page_size
+            self.has_newer = before is not None
+            self.page = page[:self.page_size][::-1]
+
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'previous': self.get_link(self.before_query_param, self.page[0]) if self.has_older and self.page else None,
+            'next': self.get_link(self.after_query_param, self.page[-1]) if self.has_newer and self.page else None,
+            'results': data,
+        })
+
+    def get_link(self, param, instance):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.before_query_param)
+        url = remove_query_param(url, self.after_query_param)
+        return replace_query_param(url, param, self.encode_cursor(instance))
+
+    # ====================================================
+    # Codificación del cursor
+    # ====================================================
+    def encode_cursor(self, instance):
+        value = f'{getattr(instance, self.date_field).isoformat()}|{instance.pk}'
+        return b64encode(value.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, encoded):
+        if not encoded:
+            return None
+        try:
+            date, pk = b64decode(encoded.encode('ascii')).decode('utf-8').rsplit('|', 1)
+            return datetime.fromisoformat(date), int(pk)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+# ====================================================
+# Helper para APIView / ViewSet sin paginación integrada
+# ====================================================
+def paginated_response(request, queryset, serializer_class, pagination_class, view=None,
+                       values_serializer_class=None, **serializer_kwargs):
+    """
+    Pagina el queryset con la clase indicada y retorna la Response con
+    'next', 'previous' y 'results'.
+
+    Si se pasa values_serializer_class (y FAST_SERIALIZATION está activo) la
+    página se lee con .values() y se serializa con el camino rápido.
+    """
+    paginator = pagination_class()
+
+    if values_serializer_class is not None and fast_serialization_enabled():
+        # El cursor se calcula con el primer campo de ordenamiento: debe estar en cada fila
+        position_field = paginator.ordering[0].lstrip('-')
+        rows = paginator.paginate_queryset(
+            values_serializer_class.values(queryset, position_field), request, view=view
+        )
+        data = values_serializer_class(serializer_kwargs.get('context')).serialize_rows(rows)
+        return paginator.get_paginated_response(data)
+
+    page = paginator.paginate_queryset(queryset, request, view=view)
+    serializer = serializer_class(page, many=True, **serializer_kwargs)
+    return paginator.get_paginated_response(serializer.data)
@@ -0,0 +1,280 @@
+import threading
+import time
+import unicodedata
+import uuid
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from rest_framework import status
+from rest_framework.response import Response
+
+"""
+Registro en memoria, versionado, de tablas de referencia.
+
+Cada entrada del registro se construye una sola vez por proceso (una consulta)
+y queda en memoria hasta que cambia su versión. La versión vive en la caché
+compartida (registry:version:<clave>): al guardar o eliminar una fila de los
+modelos de la entrada se genera una versión nueva, y cada worker la compara
+con la suya como mucho una vez por check_interval segundos, así que todos los
+procesos descartan la copia vieja sin reiniciarse.
+
+Las tablas de catálogo (estados, tipos, categorías, profesiones, grados) se
+registran como ReferenceTable y se resuelven por id o por nombre. La versión
+sirve además de ETag para los endpoints que las exponen (conditional_response).
+
+Uso:
+    from integracion_comunitaria.registry import registry
+    registry.table('postulation_state').id_for('Pendiente')
+"""
+
+
+def normalize_name(value):
+    """Normaliza un nombre para búsquedas: sin acentos, sin mayúsculas ni espacios extremos."""
+    value = unicodedata.normalize('NFKD', str(value))
+    return ''.join(ch for ch in value if not unicodedata.combining(ch)).casefold().strip()
+
+
+# ====================================================
+# Tabla de referencia
+# ====================================================
+class ReferenceTable:
+    """Filas de un modelo de catálogo indexadas por id y por nombre"""
+
+    def __init__(self, rows, name_field):
+        self.rows = rows
+        self._by_id = {row.pk: row for row in rows}
+        self._by_name = {normalize_name(getattr(row, name_field)): row for row in rows}
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def get(self, pk, default=None):
+        """Retorna la fila con esa clave primaria."""
+        try:
+            return self._by_id.get(int(pk), default)
+        except (TypeError, ValueError):
+            return default
+
+    def by_name(self, name, default=None):
+        """Retorna la fila con ese nombre (sin distinguir mayúsculas ni acentos)."""
+        return self._by_name.get(normalize_name(name), default)
+
+    def id_for(self, name, default=None):
+        """Retorna la clave primaria de la fila con ese nombre, o default."""
+        row = self.by_name(name)
+        return row.pk if row is not None else default
+
+
+# ====================================================
+# Registro
+# ====================================================
+class ReferenceRegistry:
+    """Entradas construidas una vez por proceso e invalidadas por versión"""
+
+    version_key_template = 'registry:version:{key}'
+    version_timeout = None
+    check_interval = 1.0
+
+    def __init__(self):
+        self._builders = {}
+        self._models = {}
+        self._entries = {}
+        self._lock = threading.RLock()
+        self._last_check = 0.0
+
+    # ====================================================
+    # Registro de entradas
+    # ====================================================
+    def register(self, key, builder, models):
+        """
+        Registra una entrada. builder() construye el valor; models es la lista
+        de 'app_label.Modelo' cuyos cambios invalidan la entrada.
+        """
+        self._builders[key] = builder
+        self._models[key] = tuple(models)
+        self._connect_signals(key)
+
+    def register_table(self, key, model_label, name_field='name'):
+        """Registra una tabla de catálogo completa como ReferenceTable."""
+        def build():
+            model = apps.get_model(model_label)
+            return ReferenceTable(list(model.objects.all()), name_field)
+        self.register(key, build, [model_label])
+
+    def _connect_signals(self, key):
+        """
+        Conecta post_save / post_delete de los modelos de la entrada.
+        Los modelos se indican como 'app_label.Modelo', así que la conexión
+        se resuelve cuando el modelo queda cargado.
+        """
+        receiver = self._receiver_for(key)
+        for model_label in self._models[key]:
+            post_save.connect(receiver, sender=model_label, weak=False,
+                              dispatch_uid=f'registry:{key}:{model_label}:save')
+            post_delete.connect(receiver, sender=model_label, weak=False,
+                                dispatch_uid=f'registry:{key}:{model_label}:delete')
+
+    def _receiver_for(self, key):
+        def receiver(sender, **kwargs):
+            transaction.on_commit(lambda: self.invalidate(key))
+        return receiver
+
+    # ====================================================
+    # Lectura
+    # ====================================================
+    def _entry(self, key):
+        """
+        Retorna la entrada vigente ({'version', 'value', ...}), construyéndola
+        si hace falta. Los lectores usan este único objeto: otro hilo puede
+        descartar la entrada del registro (invalidate) en cualquier momento.
+        """
+        self._check_versions()
+        entry = self._entries.get(key)
+        if entry is None:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None:
+                    entry = self._entries[key] = {
+                        'version': self._shared_version(key),
+                        'value': self._builders[key](),
+                        'serialized': {},
+                    }
+        return entry
+
+    def get(self, key):
+        """Retorna el valor vigente de la entrada, construyéndolo si hace falta."""
+        return self._entry(key)['value']
+
+    def get_versioned(self, key):
+        """Retorna (valor, versión) leídos de la misma entrada."""
+        entry = self._entry(key)
+        return entry['value'], entry['version']
+
+    def table(self, key):
+        """Alias de get() para las entradas registradas con register_table."""
+        return self.get(key)
+
+    def version(self, key):
+        """Versión vigente de la entrada (sirve como ETag)."""
+        return self._entry(key)['version']
+
+    def built_version(self, key):
+        """
+        Versión de la copia local si está vigente, o None si hay que
+        reconstruirla. A diferencia de version(), nunca construye la entrada.
+        """
+        self._check_versions()
+        entry = self._entries.get(key)
+        return entry['version'] if entry is not None else None
+
+    def etag(self, key, version=None):
+        """
+        ETag de la entrada. Para responder con datos ya leídos se pasa la
+        versión de esa misma lectura (get_versioned / serialized_versioned),
+        así el ETag nunca describe una versión distinta de los datos.
+        """
+        if version is None:
+            version = self.version(key)
+        return f'"{key}-{version}"'
+
+    def serialized(self, key, serializer_class, many=True):
+        """
+        Retorna serializer_class(valor).data, calculado una sola vez por versión.
+        """
+        return self.serialized_versioned(key, serializer_class, many)[0]
+
+    def serialized_versioned(self, key, serializer_class, many=True):
+        """Retorna (datos serializados, versión) leídos de la misma entrada."""
+        entry = self._entry(key)
+        cache_key = (serializer_class, many)
+        data = entry['serialized'].get(cache_key)
+        if data is None:
+            data = entry['serialized'][cache_key] = serializer_class(entry['value'], many=many).data
+        return data, entry['version']
+
+    # ====================================================
+    # Versionado
+    # ====================================================
+    def invalidate(self, key):
+        """Publica una versión nueva y descarta la copia local."""
+        try:
+            cache.set(self._version_key(key), uuid.uuid4().hex, self.version_timeout)
+        except Exception as e:
+            print(f"Error publicando versión del registro {key}: {e}")
+        self._entries.pop(key, None)
+
+    def _version_key(self, key):
+        return self.version_key_template.format(key=key)
+
+    def _shared_version(self, key):
+        try:
+            version = cache.get(self._version_key(key))
+            if version is None:
+                cache.add(self._version_key(key), uuid.uuid4().hex, self.version_timeout)
+                version = cache.get(self._version_key(key))
+        except Exception:
+            version = None
+        return version or 'local'
+
+    def _check_versions(self):
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval or not self._entries:
+            return
+        self._last_check = now
+
+        keys = {self._version_key(key): key for key in list(self._entries)}
+        try:
+            shared = cache.get_many(list(keys))
+        except Exception:
+            return
+        for version_key, key in keys.items():
+            entry = self._entries.get(key)
+            if entry is not None and shared.get(version_key) != entry['version']:
+                self._entries.pop(key, None)
+
+
+# ====================================================
+# Respuesta condicional (ETag / 304)
+# ====================================================
+def registry_response(request, key, serializer_class):
+    """
+    conditional_response de una entrada serializada del registro: los datos
+    y el ETag salen de la misma versión.
+    """
+    data, version = registry.serialized_versioned(key, serializer_class)
+    return conditional_response(request, registry.etag(key, version), lambda: data)
+
+
+def conditional_response(request, etag, build_data):
+    """
+    Responde 304 si el cliente ya tiene la versión (If-None-Match) y, si no,
+    los datos de build_data() con el ETag correspondiente.
+    """
+    if_none_match = request.headers.get('If-None-Match', '')
+    if etag in [tag.strip() for tag in if_none_match.split(',')]:
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(build_data())
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+# ====================================================
+# Instancia global y tablas de catálogo
+# ====================================================
+registry = ReferenceRegistry()
+
+registry.register_table('postulation_state', 'postulations.PostulationState')
+registry.register_table('petition_state', 'petitions.PetitionState')
+registry.register_table('type_petition', 'petitions.TypePetition', name_field='type_petition')
+registry.register_table('category', 'profiles.Category')
+registry.register_table('profession', 'profiles.Profession')
+registry.register_table('type_provider', 'profiles.TypeProvider')
+registry.register_table('type_offer', 'offers.TypeOffer')
+registry.register_table('grade', 'grades.Grade')
@@ -81,6 +81,7 @@ INSTALLED_APPS = [
     'grades',
     'notifications',
     'chat',
+    'files',
 
 ]
 
@@ -99,6 +100,17 @@ CHANNEL_LAYERS = {
     },
 }
 
+# -----------------------------------------------------------
+# CACHÉ COMPARTIDA (Redis)
+# -----------------------------------------------------------
+# Usada para contadores y datos precalculados compartidos entre workers
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://127.0.0.1:6379/1",
+    }
+}
+
 # -----------------------------------------------------------
 # MIDDLEWARE
 # -----------------------------------------------------------
@@ -130,6 +142,15 @@ REST_FRAMEWORK = {
 
 }
 
+# Listados de solo lectura serializados sobre filas .values() (misma salida JSON)
+FAST_SERIALIZATION = config('FAST_SERIALIZATION', default=True, cast=bool)
+
+# Búsqueda de conversaciones anteriores a ConversationPair por participantes
+# (chat.services). Activa por defecto para no duplicar conversaciones; se
+# desactiva (CHAT_LEGACY_PAIR_FALLBACK=False) después de correr
+# python manage.py backfill_conversation_pairs
+CHAT_LEGACY_PAIR_FALLBACK = config('CHAT_LEGACY_PAIR_FALLBACK', default=True, cast=bool)
+
 # -----------------------------------------------------------
 # CONFIGURACIÓN DE URLS Y TEMPLATES
 # -----------------------------------------------------------
@@ -283,6 +304,33 @@ CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 
+# Tamaño de los lotes en los que se reparten las notificaciones masivas
+NOTIFICATION_BATCH_SIZE = 500
+
+# Tareas periódicas (celery beat)
+CELERY_BEAT_SCHEDULE = {
+    # Corrige los contadores de notificaciones no leídas guardados en caché
+    'reconcile-unread-notification-counters': {
+        'task': 'notifications.tasks.reconcile_unread_counters',
+        'schedule': 60 * 60,
+    },
+    # Borra las sesiones de subida en partes vencidas y sus archivos temporales
+    'cleanup-upload-sessions': {
+        'task': 'files.tasks.cleanup_upload_sessions',
+        'schedule': 60 * 60,
+    },
+    # Borra los archivos deduplicados (blobs) que ningún adjunto usa
+    'collect-blobs': {
+        'task': 'files.tasks.collect_blobs',
+        'schedule': 60 * 60 * 24,
+    },
+}
+
+# Subidas reanudables en partes (files.uploads): directorio de partes
+# compartido entre los workers web y Celery, y tamaño máximo por archivo
+CHUNKED_UPLOAD_DIR = os.path.join(BASE_DIR, 'tmp', 'uploads')
+CHUNKED_UPLOAD_MAX_SIZE = 200 * 1024 * 1024
+
 
 # -----------------------------------------------------------
 # CONFIGURACIÓN DE EMAIL (SMTP)
@@ -299,6 +347,21 @@ MEDIA_URL = '/media/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Storage por defecto: URLs firmadas y con vencimiento para los archivos
+# protegidos (files.delivery)
+STORAGES = {
+    'default': {'BACKEND': 'files.storage.SignedMediaStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+# Vigencia mínima (segundos) de las URLs firmadas de MEDIA
+MEDIA_URL_TTL = 15 * 60
+
+# Quién transfiere los bytes de MEDIA: 'python' (desarrollo, con Range),
+# 'nginx' (X-Accel-Redirect a MEDIA_ACCEL_PREFIX) o 'apache' (X-Sendfile)
+MEDIA_DELIVERY = config('MEDIA_DELIVERY', default='python')
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+
 
 """
 LOGGING = {
@@ -0,0 +1,100 @@
+"""
+Seguimiento de cambios en campos de modelos.
+
+FieldTrackerMixin guarda, al cargar la instancia desde la base (from_db), los
+valores de los campos listados en tracked_fields. Las señales pueden preguntar
+has_changed(campo) o previous_value(campo) sin volver a consultar la fila.
+Después de cada save() la foto se actualiza con los valores guardados.
+
+Durante el save() que inserta la fila (incluidas las señales post_save) la
+instancia sigue contando como nueva: has_changed() es True y previous_value()
+None, sin consultar la fila recién insertada.
+
+Los campos ForeignKey se comparan por su columna (ej. 'id_state' → id_state_id).
+Si la instancia tiene pk pero no se cargó desde la base (construida a mano),
+los valores previos se leen una sola vez con una consulta.
+"""
+
+
+# ====================================================
+# Mixin de seguimiento de campos
+# ====================================================
+class FieldTrackerMixin:
+    """Mixin para modelos que necesitan comparar valores previos y actuales"""
+
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot()
+        return instance
+
+    def save(self, *args, **kwargs):
+        self._inserting = self._state.adding or self.pk is None
+        try:
+            super().save(*args, **kwargs)
+        finally:
+            self._inserting = False
+        self._snapshot(kwargs.get('update_fields'))
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._snapshot(fields)
+
+    # ====================================================
+    # Consulta de cambios
+    # ====================================================
+    def previous_value(self, field):
+        """
+        Retorna el valor que tenía el campo en la base, o None si la
+        instancia todavía no fue guardada.
+        """
+        if self._is_new():
+            return None
+        return self._loaded_value(self._attname(field))
+
+    def has_changed(self, field):
+        """
+        Indica si el campo cambió respecto de la base. En instancias nuevas
+        todo campo cuenta como cambiado.
+        """
+        if self._is_new():
+            return True
+        attname = self._attname(field)
+        return self._loaded_value(attname) != getattr(self, attname)
+
+    def changed_fields(self):
+        """Retorna los campos de tracked_fields que cambiaron."""
+        return [field for field in self.tracked_fields if self.has_changed(field)]
+
+    # ====================================================
+    # Foto de los valores cargados
+    # ====================================================
+    def _is_new(self):
+        return self._state.adding or self.pk is None or getattr(self, '_inserting', False)
+
+    def _attname(self, field):
+        return self._meta.get_field(field).attname
+
+    def _snapshot(self, fields=None):
+        loaded = self.__dict__.setdefault('_tracked_values', {})
+        for field in self.tracked_fields:
+            if fields is not None and field not in fields:
+                continue
+            attname = self._attname(field)
+            if attname in self.__dict__:
+                loaded[attname] = self.__dict__[attname]
+
+    def _loaded_value(self, attname):
+        loaded = self.__dict__.setdefault('_tracked_values', {})
+        if attname not in loaded:
+            # Campo diferido o instancia no cargada desde la base:
+            # se leen de una vez todos los campos seguidos que falten
+            missing = {attname} | {
+                self._attname(field) for field in self.tracked_fields
+                if self._attname(field) not in loaded
+            }
+            row = type(self)._base_manager.filter(pk=self.pk).values(*missing).first()
+            loaded.update(row or {})
+        return loaded.get(attname)
@@ -20,9 +20,10 @@ Ejemplos:
 """
 from django.contrib import admin
 from django.urls import path, include
-from django.conf.urls.static import static
 from django.conf import settings
 
+from files.views import serve_media
+
 
 # -----------------------------------------------------------
 # URLPATTERNS PRINCIPALES
@@ -56,6 +57,11 @@ urlpatterns = [
     path('notifications/', include('notifications.urls')),
 
     path('api/chat/', include('chat.urls')),
+
+    path('files/', include('files.urls')),
     path('__debug__/', include('debug_toolbar.urls')),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+
+    # Archivos de MEDIA: URLs firmadas para los protegidos (files.delivery)
+    path(settings.MEDIA_URL.lstrip('/') + '<path:path>', serve_media, name='media'),
+]
  
\ No newline at end of file
@@ -0,0 +1,265 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import ForeignKey, ManyToOneRel
+from rest_framework import relations, serializers
+
+"""
+Serialización de solo lectura sobre filas .values().
+
+Un ValuesSerializer reproduce la salida de un ModelSerializer de DRF (mismas
+claves, mismo orden, mismos formatos) pero sin instanciar modelos ni recorrer
+la maquinaria de campos de DRF fila por fila. Al primer uso compila el
+serializer de DRF en una lista de "mappers" (lookup de .values() + función de
+conversión) que luego se aplican a cada fila.
+
+Soporta:
+    - Campos simples y fuentes con puntos ('id_state.name' → 'id_state__name')
+    - get_<campo>_display para campos con choices
+    - Serializers anidados (FK) y listas anidadas (relaciones inversas),
+      estas últimas con una sola consulta extra por relación
+    - SerializerMethodField, implementando get_<campo>(row) en la subclase
+
+Se activa con settings.FAST_SERIALIZATION (por defecto True).
+"""
+
+_SKIP = object()
+
+# Campos cuyo to_representation devuelve el mismo valor que entrega .values()
+_IDENTITY_FIELDS = (
+    serializers.IntegerField,
+    serializers.CharField,
+    serializers.BooleanField,
+    serializers.ChoiceField,
+    relations.PrimaryKeyRelatedField,
+)
+
+
+def fast_serialization_enabled():
+    return getattr(settings, 'FAST_SERIALIZATION', True)
+
+
+def _converter(field):
+    """Función de conversión equivalente a field.to_representation (None si es identidad)."""
+    if isinstance(field, _IDENTITY_FIELDS):
+        return None
+    if isinstance(field, serializers.JSONField) and not field.binary:
+        return None
+    return field.to_representation
+
+
+# ====================================================
+# CLASE BASE: ValuesSerializer
+# ====================================================
+class ValuesSerializer:
+    """
+    Versión compilada y de solo lectura de un serializer de DRF.
+
+    Subclases:
+        serializer_class: serializer de DRF cuya salida se reproduce.
+        extra_lookups: lookups adicionales que necesitan los get_<campo>(row).
+
+    Uso:
+        ValuesSerializer(context).serialize(queryset)      -> list[dict]
+        ValuesSerializer(context).serialize_rows(rows)     -> list[dict]
+    """
+    serializer_class = None
+    extra_lookups = ()
+
+    _compiled = None
+
+    def __init__(self, context=None):
+        self.context = context or {}
+
+    # ====================================================
+    # API pública
+    # ====================================================
+    @classmethod
+    def lookups(cls):
+        """Lookups de .values() necesarios para serializar una fila."""
+        return cls._compile()[1]
+
+    @classmethod
+    def values(cls, queryset, *extra):
+        """Convierte el queryset en uno de .values() con todos los lookups necesarios."""
+        lookups = list(cls.lookups())
+        lookups += [lookup for lookup in extra if lookup not in lookups]
+        return queryset.prefetch_related(None).values(*lookups)
+
+    def serialize(self, queryset):
+        return self.serialize_rows(list(self.values(queryset)))
+
+    def serialize_rows(self, rows):
+        steps, _, children = self._compile()
+        related = self._fetch_children(children, rows)
+        self.prepare(rows)
+        return [self._render(steps, row, related) for row in rows]
+
+    def prepare(self, rows):
+        """Hook para precargar datos que usan los get_<campo>(row) (una vez por lote)."""
+
+    # ====================================================
+    # Compilación
+    # ====================================================
+    @classmethod
+    def _compile(cls):
+        # Se guarda por clase (no heredado) para que cada subclase compile su plan
+        compiled = cls.__dict__.get('_compiled')
+        if compiled is None:
+            serializer = cls.serializer_class()
+            model = serializer.Meta.model
+            lookups = [model._meta.pk.name]
+            children = []
+            steps = cls._compile_serializer(serializer, model, '', lookups, children, methods=True)
+            for lookup in cls.extra_lookups:
+                if lookup not in lookups:
+                    lookups.append(lookup)
+            compiled = (steps, tuple(lookups), children)
+            cls._compiled = compiled
+        return compiled
+
+    @classmethod
+    def _compile_serializer(cls, serializer, model, prefix, lookups, children, methods=False):
+        steps = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+
+            if methods and hasattr(cls, f'get_{name}'):
+                steps.append((name, 'method', f'get_{name}'))
+
+            elif isinstance(field, serializers.SerializerMethodField):
+                raise ImproperlyConfigured(
+                    f'{cls.__name__} debe implementar get_{name}(row).'
+                )
+
+            elif isinstance(field, serializers.ListSerializer):
+                if prefix:
+                    raise ImproperlyConfigured(
+                        f'{cls.__name__}: listas anidadas solo se soportan en el primer nivel ({name}).'
+                    )
+                children.append(cls._compile_children(name, field, model))
+                steps.append((name, 'many', (len(children) - 1, model._meta.pk.name)))
+
+            elif isinstance(field, serializers.BaseSerializer):
+                related_field = model._meta.get_field(field.source)
+                fk_lookup = prefix + field.source
+                cls._add_lookup(lookups, fk_lookup)
+                nested = cls._compile_serializer(
+                    field, related_field.related_model, fk_lookup + '__', lookups, children
+                )
+                steps.append((name, 'nested', (fk_lookup, nested)))
+
+            else:
+                steps.append(cls._compile_field(name, field, model, prefix, lookups))
+        return steps
+
+    @classmethod
+    def _compile_field(cls, name, field, model, prefix, lookups):
+        path = prefix
+        guards = []
+        convert = _converter(field)
+        attrs = field.source_attrs
+
+        for attr in attrs[:-1]:
+            related_field = model._meta.get_field(attr)
+            if related_field.null:
+                guards.append(path + attr)
+                cls._add_lookup(lookups, path + attr)
+            model = related_field.related_model
+            path += attr + '__'
+
+        attr = attrs[-1]
+        if attr.startswith('get_') and attr.endswith('_display'):
+            model_field = model._meta.get_field(attr[4:-8])
+            choices = {key: str(label) for key, label in model_field.flatchoices}
+            display = choices.get
+            convert = (lambda value: display(value, value)) if convert is None \
+                else (lambda value, to_repr=convert: to_repr(display(value, value)))
+            attr = model_field.name
+        else:
+            try:
+                model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                raise ImproperlyConfigured(
+                    f'{cls.__name__}: {name} no es un campo del modelo; implementar get_{name}(row).'
+                )
+
+        lookup = path + attr
+        cls._add_lookup(lookups, lookup)
+        on_missing = None if field.allow_null else _SKIP
+        return (name, 'value', (lookup, convert, tuple(guards), on_missing))
+
+    @classmethod
+    def _compile_children(cls, name, field, model):
+        # Las relaciones inversas se buscan por su accessor (ej. 'petitioncategory_set')
+        relation = next(
+            (rel for rel in model._meta.related_objects if rel.get_accessor_name() == field.source),
+            None
+        )
+        if not isinstance(relation, ManyToOneRel) or not isinstance(relation.field, ForeignKey):
+            raise ImproperlyConfigured(f'{cls.__name__}: {name} debe ser una relación inversa de FK.')
+
+        child_model = relation.related_model
+        fk_name = relation.field.name
+        child_lookups = [fk_name]
+        child_children = []
+        child_steps = cls._compile_serializer(
+            field.child, child_model, '', child_lookups, child_children
+        )
+        ordering = child_model._meta.ordering or [child_model._meta.pk.name]
+        return (child_model, fk_name, child_steps, tuple(child_lookups), tuple(ordering))
+
+    @staticmethod
+    def _add_lookup(lookups, lookup):
+        if lookup not in lookups:
+            lookups.append(lookup)
+
+    # ====================================================
+    # Ejecución
+    # ====================================================
+    def _fetch_children(self, children, rows):
+        """Una consulta por lista anidada, agrupada por id del padre."""
+        if not children or not rows:
+            return [{} for _ in children]
+
+        pk_name = self.serializer_class.Meta.model._meta.pk.name
+        parent_ids = [row[pk_name] for row in rows]
+        related = []
+        for child_model, fk_name, child_steps, child_lookups, ordering in children:
+            grouped = defaultdict(list)
+            child_rows = (
+                child_model._default_manager
+                .filter(**{f'{fk_name}__in': parent_ids})
+                .order_by(*ordering)
+                .values(*child_lookups)
+            )
+            for child_row in child_rows:
+                grouped[child_row[fk_name]].append(
+                    self._render(child_steps, child_row, None)
+                )
+            related.append(grouped)
+        return related
+
+    def _render(self, steps, row, related):
+        out = {}
+        for name, kind, spec in steps:
+            if kind == 'value':
+                lookup, convert, guards, on_missing = spec
+                if guards and any(row[guard] is None for guard in guards):
+                    if on_missing is _SKIP:
+                        continue
+                    out[name] = None
+                    continue
+                value = row[lookup]
+                out[name] = value if value is None or convert is None else convert(value)
+            elif kind == 'nested':
+                fk_lookup, nested = spec
+                out[name] = None if row[fk_lookup] is None else self._render(nested, row, None)
+            elif kind == 'many':
+                index, pk_name = spec
+                out[name] = related[index].get(row[pk_name], [])
+            else:
+                out[name] = getattr(self, spec)(row)
+        return out
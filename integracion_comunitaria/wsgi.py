@@ -37,3 +37,15 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'integracion_comunitaria.setting
 #
 # Es el punto de entrada oficial para servir la aplicación en producción.
 application = get_wsgi_application()
+
+
+# -----------------------------------------------------------
+# PRECARGA DE ÍNDICES EN MEMORIA
+# -----------------------------------------------------------
+# El índice de autocompletado de ciudades se arma al iniciar el proceso para
+# que la primera búsqueda no pague la construcción.
+try:
+    from locations.search import city_index
+    city_index.warm()
+except Exception as e:
+    print(f"No se pudo precargar el índice de ciudades: {e}")
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class LocationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'locations'
+
+    def ready(self):
+        """
+        Registra el árbol de ubicaciones en el registro en memoria
+        (conecta su invalidación al cambiar las tablas de ubicaciones).
+        """
+        import locations.tree
@@ -0,0 +1,202 @@
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from integracion_comunitaria.registry import registry
+from .tree import location_tree
+
+"""
+Matching geográfico por radio.
+
+Las coordenadas de las ciudades (tomadas del árbol de ubicaciones en memoria)
+y las áreas de servicio de los proveedores (ProviderServiceArea) se guardan en
+arreglos de NumPy, versionados con el registro: se reconstruyen solo cuando
+cambian City o ProviderServiceArea.
+
+Cada consulta aplica primero un filtro por caja (bounding box) en grados y
+después la distancia haversine vectorizada sobre los candidatos, sin
+consultar la base de datos. Si NumPy no está instalado se usa la misma lógica
+fila por fila.
+"""
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+SERVICE_AREAS_KEY = 'service_areas'
+
+
+# ====================================================
+# Distancia
+# ====================================================
+def haversine_km(lat, lon, lats, lons):
+    """
+    Distancia en km desde (lat, lon) a cada punto de (lats, lons).
+    Con NumPy recibe y devuelve arreglos; sin NumPy, listas.
+    """
+    if np is not None:
+        lat1, lon1 = np.radians(lat), np.radians(lon)
+        lat2, lon2 = np.radians(lats), np.radians(lons)
+        a = (np.sin((lat2 - lat1) / 2) ** 2
+             + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    distances = []
+    for other_lat, other_lon in zip(lats, lons):
+        lat2, lon2 = math.radians(other_lat), math.radians(other_lon)
+        a = (math.sin((lat2 - lat1) / 2) ** 2
+             + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+        distances.append(2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a)))
+    return distances
+
+
+def _bounding_box(lat, radius_km):
+    """Semiancho de la caja en grados (latitud, longitud) para un radio dado."""
+    dlat = radius_km / KM_PER_DEGREE
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    return dlat, min(radius_km / (KM_PER_DEGREE * cos_lat), 180.0)
+
+
+# ====================================================
+# Arreglos de puntos
+# ====================================================
+class PointSet:
+    """Ids con sus coordenadas (y opcionalmente un radio) en arreglos paralelos"""
+
+    def __init__(self, ids, lats, lons, radii=None):
+        if np is not None:
+            self.ids = np.asarray(ids, dtype=np.int64)
+            self.lats = np.asarray(lats, dtype=np.float64)
+            self.lons = np.asarray(lons, dtype=np.float64)
+            self.radii = np.asarray(radii if radii is not None else [], dtype=np.float64)
+        else:
+            self.ids, self.lats, self.lons = list(ids), list(lats), list(lons)
+            self.radii = list(radii or [])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def within(self, lat, lon, radius_km):
+        """Ids de los puntos a no más de radius_km de (lat, lon)."""
+        if not len(self):
+            return []
+        dlat, dlon = _bounding_box(lat, radius_km)
+        if np is not None:
+            box = (np.abs(self.lats - lat) <= dlat) & (np.abs(self.lons - lon) <= dlon)
+            candidates = np.flatnonzero(box)
+            distances = haversine_km(lat, lon, self.lats[candidates], self.lons[candidates])
+            return self.ids[candidates[distances <= radius_km]].tolist()
+
+        candidates = [
+            i for i in range(len(self.ids))
+            if abs(self.lats[i] - lat) <= dlat and abs(self.lons[i] - lon) <= dlon
+        ]
+        distances = haversine_km(lat, lon, [self.lats[i] for i in candidates], [self.lons[i] for i in candidates])
+        return [self.ids[i] for i, distance in zip(candidates, distances) if distance <= radius_km]
+
+    def covering(self, lat, lon):
+        """Ids de los puntos cuyo propio radio alcanza a (lat, lon)."""
+        if not len(self):
+            return []
+        if np is not None:
+            dlat = self.radii / KM_PER_DEGREE
+            # Semiancho en longitud de cada caja, al coseno del borde más lejano al ecuador
+            edge = np.radians(np.minimum(np.abs(self.lats) + dlat, 89.9))
+            dlon = np.minimum(self.radii / (KM_PER_DEGREE * np.cos(edge)), 180.0)
+            lon_delta = np.abs((self.lons - lon + 180.0) % 360.0 - 180.0)
+            box = (np.abs(self.lats - lat) <= dlat) & (lon_delta <= dlon)
+            candidates = np.flatnonzero(box)
+            distances = haversine_km(lat, lon, self.lats[candidates], self.lons[candidates])
+            return self.ids[candidates[distances <= self.radii[candidates]]].tolist()
+
+        candidates = []
+        for i in range(len(self.ids)):
+            dlat = self.radii[i] / KM_PER_DEGREE
+            edge = math.radians(min(abs(self.lats[i]) + dlat, 89.9))
+            dlon = min(self.radii[i] / (KM_PER_DEGREE * math.cos(edge)), 180.0)
+            lon_delta = abs((self.lons[i] - lon + 180.0) % 360.0 - 180.0)
+            if abs(self.lats[i] - lat) <= dlat and lon_delta <= dlon:
+                candidates.append(i)
+        distances = haversine_km(lat, lon, [self.lats[i] for i in candidates], [self.lons[i] for i in candidates])
+        return [
+            self.ids[i] for i, distance in zip(candidates, distances)
+            if distance <= self.radii[i]
+        ]
+
+
+# ====================================================
+# Datos cacheados
+# ====================================================
+def city_points():
+    """
+    Coordenadas de las ciudades que las tienen, armadas una vez por versión
+    del árbol de ubicaciones.
+    """
+    tree = location_tree()
+    points = getattr(tree, '_city_points', None)
+    if points is None:
+        rows = [c for c in tree.cities if c['latitude'] is not None and c['longitude'] is not None]
+        points = tree._city_points = PointSet(
+            [c['id_city'] for c in rows],
+            [c['latitude'] for c in rows],
+            [c['longitude'] for c in rows],
+        )
+    return points
+
+
+def city_coordinates(city_id):
+    """Retorna (lat, lon) de la ciudad o None si no tiene coordenadas."""
+    tree = location_tree()
+    coordinates = getattr(tree, '_city_coordinates', None)
+    if coordinates is None:
+        coordinates = tree._city_coordinates = {
+            c['id_city']: (c['latitude'], c['longitude'])
+            for c in tree.cities
+            if c['latitude'] is not None and c['longitude'] is not None
+        }
+    return coordinates.get(city_id)
+
+
+def _build_service_areas():
+    from .models import ProviderServiceArea
+    rows = list(ProviderServiceArea.objects.values_list('provider_id', 'latitude', 'longitude', 'radius_km'))
+    return PointSet(
+        [row[0] for row in rows],
+        [row[1] for row in rows],
+        [row[2] for row in rows],
+        [row[3] for row in rows],
+    )
+
+
+registry.register(SERVICE_AREAS_KEY, _build_service_areas, ['locations.ProviderServiceArea'])
+
+
+# ====================================================
+# Consultas
+# ====================================================
+def cities_within(lat, lon, radius_km):
+    """Ids de las ciudades a no más de radius_km de (lat, lon)."""
+    return city_points().within(lat, lon, radius_km)
+
+
+def cities_in_service_area(provider_id):
+    """
+    Ids de las ciudades cubiertas por el radio del proveedor (vacío si no tiene).
+    Lee el área de la base para no depender de la propagación del registro
+    cuando se llama justo después de guardarla.
+    """
+    from .models import ProviderServiceArea
+    area = ProviderServiceArea.objects.filter(provider_id=provider_id).values_list(
+        'latitude', 'longitude', 'radius_km'
+    ).first()
+    if area is None:
+        return []
+    return cities_within(*area)
+
+
+def providers_covering(lat, lon):
+    """Ids de los proveedores cuyo radio de servicio alcanza al punto (lat, lon)."""
+    return registry.get(SERVICE_AREAS_KEY).covering(lat, lon)
@@ -84,6 +84,9 @@ class City(models.Model):
     id_city = models.AutoField(primary_key=True)
     name = models.CharField(max_length=255)
     postal_code = models.CharField(max_length=20)
+    # Coordenadas (grados decimales) para el matching por radio (locations.geo)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
     department = models.ForeignKey(
         Department,
         on_delete=models.SET_NULL,
@@ -171,4 +174,36 @@ class ProviderCity(models.Model):
         unique_together = ('provider', 'city')  # ya está en el PRIMARY KEY
 
     def __str__(self):
-        return f"{self.provider} - {self.city}"
\ No newline at end of file
+        return f"{self.provider} - {self.city}"
+
+
+# ====================================
+# MODELO: ÁREA DE SERVICIO POR RADIO
+# ====================================
+class ProviderServiceArea(models.Model):
+    """
+    Área de servicio de un proveedor definida como un radio en km alrededor
+    de un punto. Complementa a ProviderCity: el proveedor atiende sus ciudades
+    explícitas más todas las que caen dentro del radio (locations.geo).
+    """
+    provider = models.OneToOneField(
+        'authentication.Provider',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        db_column='id_provider',
+        related_name='service_area'
+    )
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    radius_km = models.FloatField()
+
+    id_user_create = models.IntegerField(null=True, blank=True)
+    id_user_update = models.IntegerField(null=True, blank=True)
+    date_create = models.DateTimeField(auto_now_add=True)
+    date_update = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'n_provider_service_area'
+
+    def __str__(self):
+        return f"{self.provider_id}: {self.radius_km} km"
@@ -0,0 +1,236 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+from django.db.models import Count
+
+from integracion_comunitaria.registry import normalize_name, registry
+from .tree import TREE_KEY
+
+"""
+Índice en memoria para autocompletar ciudades por nombre o código postal.
+
+Las claves son el nombre normalizado (sin acentos ni mayúsculas), cada palabra
+del nombre y el código postal, guardadas en una lista ordenada: un prefijo es
+un rango que se encuentra con bisect. Para prefijos cortos (hasta
+PRECOMPUTED_PREFIX caracteres) el top de resultados se guarda ya ordenado.
+
+Orden de los resultados:
+    1. Tipo de coincidencia: nombre completo, palabra del nombre, código postal
+    2. Uso: cantidad de direcciones y proveedores en la ciudad
+    3. Nombre
+
+El índice se arma desde el árbol de ubicaciones (locations.tree) más una
+consulta de uso, al arrancar el proceso (warm). Cada versión del índice es un
+_Snapshot que no se modifica: las actualizaciones arman uno nuevo y lo
+reemplazan con una sola asignación, así las búsquedas en curso siguen leyendo
+el anterior sin lock.
+
+Cuando cambia la versión del árbol (solo se reindexan las ciudades que
+cambiaron) o pasan usage_refresh segundos (se recalcula el uso), la búsqueda
+lanza la actualización en un hilo y sigue respondiendo con el índice vigente.
+Las búsquedas no consultan la base de datos.
+"""
+
+MATCH_NAME, MATCH_WORD, MATCH_POSTAL_CODE = 0, 1, 2
+PRECOMPUTED_PREFIX = 3
+MAX_RESULTS = 20
+
+
+class _Snapshot:
+    """Una versión completa del índice; no se modifica después de armarse (salvo el top memoizado)"""
+
+    def __init__(self, version, cities, keys, usage, built_at):
+        self.version = version
+        self.cities = cities
+        self.keys = keys
+        self.usage = usage
+        self.built_at = built_at
+        self.top = {}
+
+
+# ====================================================
+# Índice de ciudades
+# ====================================================
+class CityIndex:
+    """Índice de prefijos sobre nombres y códigos postales de ciudades"""
+
+    usage_refresh = 60 * 60
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+        self._state = None
+
+    # ====================================================
+    # Construcción y actualización
+    # ====================================================
+    def warm(self):
+        """Construye el índice si todavía no existe (arranque del proceso)."""
+        if self._state is None:
+            with self._lock:
+                if self._state is None:
+                    self._state = self._build(self._state)
+
+    def _current(self):
+        """
+        Índice vigente. Si quedó viejo agenda la actualización en segundo
+        plano y devuelve el actual; solo el primer uso (sin warm) construye
+        dentro del request.
+        """
+        state = self._state
+        if state is None:
+            self.warm()
+            return self._state
+        stale_usage = time.monotonic() - state.built_at > self.usage_refresh
+        if stale_usage or registry.built_version(TREE_KEY) != state.version:
+            self._refresh_in_background()
+        return state
+
+    def _refresh_in_background(self):
+        if not self._refreshing.acquire(blocking=False):
+            return  # ya hay una actualización en curso
+        threading.Thread(target=self._refresh, name='city-index-refresh', daemon=True).start()
+
+    def _refresh(self):
+        from django.db import close_old_connections
+        try:
+            with self._lock:
+                self._state = self._build(self._state)
+        except Exception as e:
+            print(f"Error actualizando el índice de ciudades: {e}")
+        finally:
+            close_old_connections()
+            self._refreshing.release()
+
+    def _build(self, previous):
+        """Arma el índice nuevo: completo, o solo las ciudades cambiadas si el uso sigue vigente."""
+        tree, version = registry.get_versioned(TREE_KEY)
+        now = time.monotonic()
+        if previous is None or now - previous.built_at > self.usage_refresh:
+            return self._rebuild(version, tree, now)
+        if version == previous.version:
+            return previous
+        return self._apply_changes(previous, version, tree)
+
+    def _rebuild(self, version, tree, now):
+        cities = {}
+        keys = []
+        for city in self._city_rows(tree):
+            cities[city['id_city']] = city
+            keys.extend(self._keys_for(city))
+        keys.sort()
+        return _Snapshot(version, cities, keys, self._load_usage(), now)
+
+    def _apply_changes(self, previous, version, tree):
+        """Reindexa solo las ciudades nuevas, modificadas o eliminadas, sobre copias."""
+        current = {city['id_city']: city for city in self._city_rows(tree)}
+        changed = [
+            city_id for city_id in set(current) | set(previous.cities)
+            if current.get(city_id) != previous.cities.get(city_id)
+        ]
+        if not changed:
+            return _Snapshot(version, previous.cities, previous.keys, previous.usage, previous.built_at)
+
+        cities = dict(previous.cities)
+        keys = list(previous.keys)
+        for city_id in changed:
+            old = cities.pop(city_id, None)
+            if old is not None:
+                for key in self._keys_for(old):
+                    position = bisect_left(keys, key)
+                    if position < len(keys) and keys[position] == key:
+                        del keys[position]
+            new = current.get(city_id)
+            if new is not None:
+                cities[city_id] = new
+                for key in self._keys_for(new):
+                    insort(keys, key)
+        return _Snapshot(version, cities, keys, previous.usage, previous.built_at)
+
+    def _city_rows(self, tree):
+        departments = {row['id_department']: row for row in tree.departments}
+        provinces = {row['id_province']: row for row in tree.provinces}
+        for city in tree.cities:
+            department = departments.get(city['department']) or {}
+            province = provinces.get(department.get('province')) or {}
+            yield {
+                'id_city': city['id_city'],
+                'name': city['name'],
+                'postal_code': city['postal_code'],
+                'department': city['department'],
+                'department_name': department.get('name'),
+                'province': department.get('province'),
+                'province_name': province.get('name'),
+            }
+
+    def _keys_for(self, city):
+        """Claves (texto normalizado, tipo de coincidencia, id) de una ciudad."""
+        city_id = city['id_city']
+        name = normalize_name(city['name'])
+        keys = {(name, MATCH_NAME, city_id)}
+        for word in name.split()[1:]:
+            keys.add((word, MATCH_WORD, city_id))
+        postal_code = normalize_name(city['postal_code'] or '')
+        if postal_code:
+            keys.add((postal_code, MATCH_POSTAL_CODE, city_id))
+        return sorted(keys)
+
+    def _load_usage(self):
+        from .models import Address, ProviderCity
+        usage = defaultdict(int)
+        for model in (Address, ProviderCity):
+            rows = (
+                model.objects.filter(city__isnull=False)
+                .values('city_id').annotate(total=Count('pk')).order_by()
+            )
+            for row in rows:
+                usage[row['city_id']] += row['total']
+        return dict(usage)
+
+    # ====================================================
+    # Búsqueda
+    # ====================================================
+    def search(self, query, limit=10):
+        """
+        Retorna hasta limit ciudades cuyo nombre, alguna palabra del nombre o
+        código postal empiezan con query, ordenadas por relevancia.
+        """
+        state = self._current()
+        prefix = normalize_name(query)
+        if not prefix:
+            return []
+        limit = max(1, min(limit, MAX_RESULTS))
+
+        if len(prefix) <= PRECOMPUTED_PREFIX:
+            ranked = state.top.get(prefix)
+            if ranked is None:
+                ranked = state.top[prefix] = self._rank(state, prefix, MAX_RESULTS)
+        else:
+            ranked = self._rank(state, prefix, limit)
+        return [state.cities[city_id] for city_id in ranked[:limit]]
+
+    @staticmethod
+    def _rank(state, prefix, limit):
+        keys = state.keys
+        start = bisect_left(keys, (prefix,))
+        best = {}
+        for position in range(start, len(keys)):
+            text, match, city_id = keys[position]
+            if not text.startswith(prefix):
+                break
+            if match < best.get(city_id, MATCH_POSTAL_CODE + 1):
+                best[city_id] = match
+        scored = (
+            (match, -state.usage.get(city_id, 0), state.cities[city_id]['name'], city_id)
+            for city_id, match in best.items()
+        )
+        return [item[-1] for item in heapq.nsmallest(limit, scored)]
+
+
+# ====================================================
+# Instancia global del índice
+# ====================================================
+city_index = CityIndex()
@@ -1,7 +1,7 @@
 from rest_framework import serializers
 
 from authentication.models import Provider
-from .models import Country, Province, Department, City, Address, ProviderCity
+from .models import Country, Province, Department, City, Address, ProviderCity, ProviderServiceArea
 
 # ====================================
 # SERIALIZER: COUNTRY
@@ -52,6 +52,19 @@ class CitySerializer(serializers.ModelSerializer):
         model = City
         fields = '__all__'
 
+# ====================================
+# SERIALIZER: CITY (NODO DEL ÁRBOL)
+# ====================================
+class CityNodeSerializer(serializers.ModelSerializer):
+    """
+    Serializer de ciudades para el árbol de ubicaciones (locations.tree).
+    Igual que CitySerializer pero sin los proveedores asignados, que no
+    forman parte de los datos de referencia.
+    """
+    class Meta:
+        model = City
+        fields = ['id_city', 'name', 'postal_code', 'latitude', 'longitude', 'department', 'date_create', 'date_update']
+
 # ====================================
 # SERIALIZER: ADDRESS
 # ====================================
@@ -111,3 +124,24 @@ class ProviderCitySerializer(serializers.ModelSerializer):
     class Meta:
         model = ProviderCity
         fields = '__all__'
+
+
+# ====================================
+# SERIALIZER: PROVIDER SERVICE AREA
+# ====================================
+class ProviderServiceAreaSerializer(serializers.ModelSerializer):
+    """
+    Serializer para el área de servicio por radio de un proveedor.
+    - latitude / longitude: centro en grados decimales
+    - radius_km: radio en km (máximo MAX_RADIUS_KM)
+    """
+    MAX_RADIUS_KM = 500
+
+    latitude = serializers.FloatField(min_value=-90, max_value=90)
+    longitude = serializers.FloatField(min_value=-180, max_value=180)
+    radius_km = serializers.FloatField(min_value=0, max_value=MAX_RADIUS_KM)
+
+    class Meta:
+        model = ProviderServiceArea
+        fields = ['provider', 'latitude', 'longitude', 'radius_km', 'date_create', 'date_update']
+        read_only_fields = ['provider', 'date_create', 'date_update']
@@ -0,0 +1,96 @@
+from django.db import transaction
+
+from .models import ProviderCity
+from .signals import service_area_changed
+
+"""
+Servicio de ciudades atendidas por los proveedores (ProviderCity).
+
+Cada operación es un cálculo de conjuntos dentro de una transacción: una
+lectura de los vínculos actuales, un bulk_create para las altas y un único
+DELETE ... IN para las bajas. Al confirmar se envía service_area_changed una
+sola vez, para que el índice de matching y las cachés se reconstruyan una vez
+por proveedor y no por fila.
+
+ProviderCity no tiene señales por fila conectadas a propósito: así Django
+borra con un único DELETE filtrado por (id_provider, id_city) en lugar de
+cargar las filas y borrarlas por su "pk" (id_provider), que en esta tabla
+es compuesta.
+"""
+
+
+# ====================================================
+# Servicio de ciudades del proveedor
+# ====================================================
+class ProviderCityService:
+    """Altas, bajas y sincronización de las ciudades de un proveedor"""
+
+    @staticmethod
+    def city_ids(provider_id):
+        """Conjunto de ids de ciudades asignadas al proveedor."""
+        return set(
+            ProviderCity.objects.filter(provider_id=provider_id).values_list('city_id', flat=True)
+        )
+
+    def sync(self, provider_id, city_ids, user_id=None):
+        """
+        Deja al proveedor exactamente con city_ids.
+        Retorna (ciudades actuales, agregadas, quitadas).
+        """
+        wanted = set(city_ids)
+        with transaction.atomic():
+            current = self.city_ids(provider_id)
+            added = wanted - current
+            removed = current - wanted
+            self._delete(provider_id, removed)
+            self._insert(provider_id, added, user_id)
+            self._notify(provider_id, added, removed)
+        return wanted, added, removed
+
+    def add(self, provider_id, city_ids, user_id=None):
+        """Agrega ciudades al proveedor (las existentes se ignoran). Retorna las agregadas."""
+        with transaction.atomic():
+            added = set(city_ids) - self.city_ids(provider_id)
+            self._insert(provider_id, added, user_id)
+            self._notify(provider_id, added, set())
+        return added
+
+    def remove(self, provider_id, city_ids):
+        """Quita ciudades del proveedor. Retorna la cantidad de vínculos borrados."""
+        with transaction.atomic():
+            deleted = self._delete(provider_id, set(city_ids))
+            if deleted:
+                self._notify(provider_id, set(), set(city_ids))
+        return deleted
+
+    # ====================================================
+    # Escritura
+    # ====================================================
+    @staticmethod
+    def _insert(provider_id, city_ids, user_id):
+        if city_ids:
+            ProviderCity.objects.bulk_create([
+                ProviderCity(provider_id=provider_id, city_id=city_id, id_user_create=user_id)
+                for city_id in sorted(city_ids)
+            ], ignore_conflicts=True)
+
+    @staticmethod
+    def _delete(provider_id, city_ids):
+        if not city_ids:
+            return 0
+        deleted, _ = ProviderCity.objects.filter(provider_id=provider_id, city_id__in=city_ids).delete()
+        return deleted
+
+    @staticmethod
+    def _notify(provider_id, added, removed):
+        if not added and not removed:
+            return
+        transaction.on_commit(lambda: service_area_changed.send(
+            sender=ProviderCity,
+            provider_id=provider_id,
+            added=sorted(added),
+            removed=sorted(removed),
+        ))
+
+
+provider_cities = ProviderCityService()
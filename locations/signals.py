@@ -0,0 +1,14 @@
+from django.dispatch import Signal
+
+"""
+Señales propias de ubicaciones.
+
+service_area_changed se envía una sola vez por operación (al confirmar la
+transacción) cuando cambian las ciudades que atiende un proveedor, en lugar de
+un post_save/post_delete por cada fila de ProviderCity. Argumentos:
+    - provider_id: proveedor afectado
+    - added: ids de ciudades agregadas
+    - removed: ids de ciudades quitadas
+"""
+
+service_area_changed = Signal()
@@ -0,0 +1,10 @@
+-- Coordenadas de las ciudades para el matching por radio (locations.geo).
+-- n_city no es administrada por Django: migrate no agrega estas columnas, y
+-- sin ellas toda consulta sobre City falla ("Unknown column 'n_city.latitude'").
+--
+-- Las ciudades sin coordenadas quedan en NULL y solo se ignoran en el
+-- matching por radio; se cargan después con un UPDATE por id_city.
+
+ALTER TABLE n_city
+    ADD COLUMN latitude DOUBLE NULL,
+    ADD COLUMN longitude DOUBLE NULL;
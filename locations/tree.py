@@ -0,0 +1,130 @@
+from collections import defaultdict
+
+from integracion_comunitaria.registry import registry
+
+"""
+Árbol precompilado país → provincia → departamento → ciudad.
+
+Se construye con una consulta por tabla, se serializa una sola vez y queda en
+memoria dentro del registro (integracion_comunitaria.registry) bajo la clave
+'location_tree'. Cualquier alta, baja o modificación de Country, Province,
+Department o City publica una versión nueva y cada worker lo reconstruye.
+La versión del registro sirve de ETag para los endpoints de ubicaciones.
+"""
+
+TREE_KEY = 'location_tree'
+
+
+# ====================================================
+# Árbol de ubicaciones
+# ====================================================
+class LocationTree:
+    """Listas serializadas de cada nivel, indexadas por su padre"""
+
+    def __init__(self, countries, provinces, departments, cities):
+        self.countries = countries
+        self.provinces = provinces
+        self.departments = departments
+        self.cities = cities
+
+        self.provinces_by_country = self._group(provinces, 'country')
+        self.departments_by_province = self._group(departments, 'province')
+        self.cities_by_department = self._group(cities, 'department')
+
+        self._ids = {
+            'country': {row['id_country'] for row in countries},
+            'province': {row['id_province'] for row in provinces},
+            'department': {row['id_department'] for row in departments},
+        }
+        self._subtrees = {}
+
+    @staticmethod
+    def _group(rows, parent_field):
+        grouped = defaultdict(list)
+        for row in rows:
+            grouped[row[parent_field]].append(row)
+        return dict(grouped)
+
+    @classmethod
+    def build(cls):
+        """Carga las cuatro tablas (una consulta cada una) y serializa el árbol."""
+        from .models import City, Country, Department, Province
+        from .serializers import (CityNodeSerializer,
+                                  CountrySerializer,
+                                  DepartmentSerializer,
+                                  ProvinceSerializer)
+
+        return cls(
+            countries=CountrySerializer(Country.objects.order_by('pk'), many=True).data,
+            provinces=ProvinceSerializer(Province.objects.order_by('pk'), many=True).data,
+            departments=DepartmentSerializer(Department.objects.order_by('pk'), many=True).data,
+            cities=CityNodeSerializer(City.objects.order_by('pk'), many=True).data,
+        )
+
+    # ====================================================
+    # Subárboles
+    # ====================================================
+    def city_nodes(self, department_id):
+        return list(self.cities_by_department.get(department_id, []))
+
+    def department_nodes(self, province_id):
+        return [
+            {**department, 'cities': self.city_nodes(department['id_department'])}
+            for department in self.departments_by_province.get(province_id, [])
+        ]
+
+    def province_nodes(self, country_id):
+        return [
+            {**province, 'departments': self.department_nodes(province['id_province'])}
+            for province in self.provinces_by_country.get(country_id, [])
+        ]
+
+    def country_nodes(self):
+        return [
+            {**country, 'provinces': self.province_nodes(country['id_country'])}
+            for country in self.countries
+        ]
+
+    def subtree(self, country=None, province=None, department=None):
+        """
+        Retorna el subárbol pedido, o None si el nodo no existe:
+        - department: las ciudades del departamento
+        - province: departamentos con sus ciudades
+        - country: provincias con departamentos y ciudades
+        - sin parámetros: el árbol completo
+        Cada subárbol se arma una sola vez por versión del árbol.
+        """
+        if department is not None:
+            level, node_id, build = 'department', department, self.city_nodes
+        elif province is not None:
+            level, node_id, build = 'province', province, self.department_nodes
+        elif country is not None:
+            level, node_id, build = 'country', country, self.province_nodes
+        else:
+            level, node_id, build = None, None, None
+
+        key = (level, node_id)
+        if key not in self._subtrees:
+            if level is None:
+                self._subtrees[key] = self.country_nodes()
+            elif node_id in self._ids[level]:
+                self._subtrees[key] = build(node_id)
+            else:
+                return None
+        return self._subtrees[key]
+
+
+# ====================================================
+# Registro del árbol
+# ====================================================
+registry.register(TREE_KEY, LocationTree.build, [
+    'locations.Country',
+    'locations.Province',
+    'locations.Department',
+    'locations.City',
+])
+
+
+def location_tree():
+    """Retorna el árbol vigente (construido una vez por versión)."""
+    return registry.get(TREE_KEY)
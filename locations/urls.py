@@ -6,7 +6,8 @@ from .views import (CountryViewSet,
                     CityViewSet,
                     AddressViewSet,
                     ProviderCityViewSet,
-                    ProviderCitiesAPIView, ProviderCityDeleteAPIView)
+                    ProviderCitiesAPIView, ProviderCityDeleteAPIView,
+                    LocationTreeAPIView, ProviderServiceAreaAPIView)
 
 
 # ====================================
@@ -25,7 +26,15 @@ router.register(r'provider-cities', ProviderCityViewSet)
 urlpatterns = [
     # Incluye todas las rutas del router
     path('', include(router.urls)),
+
+    # Árbol país → provincia → departamento → ciudad (o un subárbol), con ETag
+    # GET /tree/?country=<id> | ?province=<id> | ?department=<id>
+    path('tree/', LocationTreeAPIView.as_view(), name='location-tree'),
     
+    # Área de servicio por radio del proveedor autenticado
+    # GET | PUT | DELETE /service-area/
+    path('service-area/', ProviderServiceAreaAPIView.as_view(), name='service-area'),
+
     # Obtener todas las ciudades donde un proveedor está asignado
     # GET /cities-area/<provider_id>/
     path('cities-area/<int:provider_id>/', ProviderCitiesAPIView.as_view(), name='cities-area'),
@@ -1,15 +1,48 @@
+from collections import defaultdict
+
+from django.db import transaction
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import MethodNotAllowed
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Country, Province, Department, City, Address, ProviderCity
+from integracion_comunitaria.registry import conditional_response, registry
+from . import geo
+from .search import city_index
+from .services import provider_cities
+from .tree import TREE_KEY
+from .models import Country, Province, Department, City, Address, ProviderCity, ProviderServiceArea
 from .serializers import (CountrySerializer,
                           ProvinceSerializer,
                           DepartmentSerializer,
                           CitySerializer,
                           AddressSerializer,
-                          ProviderCitySerializer)
+                          ProviderCitySerializer,
+                          ProviderServiceAreaSerializer)
+
+
+def tree_response(request, build_data, tree=None, version=None):
+    """
+    Respuesta armada desde el árbol de ubicaciones en memoria, con la
+    versión del árbol como ETag (304 si el cliente ya la tiene).
+    build_data(tree) recibe el árbol de la misma versión que el ETag; se
+    pueden pasar tree y version si la vista ya los leyó con get_versioned.
+    """
+    if tree is None:
+        tree, version = registry.get_versioned(TREE_KEY)
+    return conditional_response(request, registry.etag(TREE_KEY, version), lambda: build_data(tree))
+
+
+def parse_node_id(value):
+    """Convierte el id recibido en la URL o query string; None si no es válido."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
 # ====================================
 # VIEWSET: COUNTRY
 # ====================================
@@ -18,10 +51,14 @@ class CountryViewSet(viewsets.ModelViewSet):
     """
     ViewSet para el modelo Country.
     Permite todas las operaciones CRUD (GET, POST, PUT, DELETE).
+    El listado se sirve desde el árbol de ubicaciones en memoria.
     """
     queryset = Country.objects.all()
     serializer_class = CountrySerializer
 
+    def list(self, request, *args, **kwargs):
+        return tree_response(request, lambda tree: tree.countries)
+
 # ====================================
 # VIEWSET: PROVINCE
 # ====================================
@@ -29,10 +66,14 @@ class ProvinceViewSet(viewsets.ModelViewSet):
     """
     ViewSet para el modelo Province.
     Permite todas las operaciones CRUD.
+    El listado se sirve desde el árbol de ubicaciones en memoria.
     """
     queryset = Province.objects.all()
     serializer_class = ProvinceSerializer
 
+    def list(self, request, *args, **kwargs):
+        return tree_response(request, lambda tree: tree.provinces)
+
 # ====================================
 # VIEWSET: DEPARTMENT
 # ====================================
@@ -50,12 +91,16 @@ class DepartmentViewSet(viewsets.ModelViewSet):
     def by_province(self, request, province_id=None):
 
         """
-        Retorna todos los departamentos de una provincia específica.
+        Retorna todos los departamentos de una provincia específica (desde el árbol en memoria).
         URL: /departments/by-province/<province_id>/
         """
-        departments = Department.objects.filter(province_id=province_id)
-        serializer = self.get_serializer(departments, many=True)
-        return Response(serializer.data)
+        province_id = parse_node_id(province_id)
+        if province_id is None:
+            return Response({'detail': 'province_id inválido.'}, status=status.HTTP_400_BAD_REQUEST)
+        return tree_response(
+            request,
+            lambda tree: tree.departments_by_province.get(province_id, [])
+        )
 
 # ====================================
 # VIEWSET: CITY
@@ -72,12 +117,53 @@ class CityViewSet(viewsets.ModelViewSet):
     def by_department(self, request, department_id=None):
 
         """
-        Retorna todas las ciudades de un departamento específico.
+        Retorna todas las ciudades de un departamento específico (desde el árbol en memoria).
         URL: /cities/by-department/<department_id>/
         """
-        cities = City.objects.filter(department_id=department_id)
-        serializer = self.get_serializer(cities, many=True)
-        return Response(serializer.data)
+        department_id = parse_node_id(department_id)
+        if department_id is None:
+            return Response({'detail': 'department_id inválido.'}, status=status.HTTP_400_BAD_REQUEST)
+        return tree_response(request, lambda tree: tree.city_nodes(department_id))
+
+    @action(detail=False, methods=['get'], url_path='search')
+    def search(self, request):
+        """
+        Autocompletado de ciudades por nombre o código postal, desde el
+        índice en memoria (locations.search), sin consultar la base.
+        URL: /cities/search/?q=<texto>&limit=<n>
+        """
+        query = request.query_params.get('q', '')
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            return Response({'detail': 'limit debe ser un entero.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(city_index.search(query, limit))
+
+# ====================================
+# API VIEW: ÁRBOL DE UBICACIONES
+# ====================================
+class LocationTreeAPIView(APIView):
+    """
+    Retorna un subárbol completo de ubicaciones en una sola respuesta cacheable:
+    GET /tree/                    → países con provincias, departamentos y ciudades
+    GET /tree/?country=<id>       → provincias del país con departamentos y ciudades
+    GET /tree/?province=<id>      → departamentos de la provincia con sus ciudades
+    GET /tree/?department=<id>    → ciudades del departamento
+    Responde 304 si el If-None-Match coincide con la versión del árbol.
+    """
+    def get(self, request):
+        params = {}
+        for level in ('department', 'province', 'country'):
+            if level in request.query_params:
+                params[level] = parse_node_id(request.query_params[level])
+                if params[level] is None:
+                    return Response({'detail': f'{level} inválido.'}, status=status.HTTP_400_BAD_REQUEST)
+                break
+
+        tree, version = registry.get_versioned(TREE_KEY)
+        if tree.subtree(**params) is None:
+            return Response({'detail': 'Ubicación no encontrada.'}, status=status.HTTP_404_NOT_FOUND)
+        return tree_response(request, lambda tree: tree.subtree(**params), tree, version)
 
 # ====================================
 # VIEWSET: ADDRESS
@@ -99,8 +185,7 @@ class ProviderCitiesAPIView(APIView):
     GET /cities-area/<provider_id>/
     """
     def get(self, request, provider_id):
-        provider_cities = ProviderCity.objects.filter(provider_id=provider_id).select_related('city')
-        cities = [pc.city for pc in provider_cities]
+        cities = City.objects.filter(city_providers__provider_id=provider_id)
         serializer = CitySerializer(cities, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -115,8 +200,7 @@ class ProviderCityDeleteAPIView(APIView):
     DELETE /providers/<provider_id>/cities/<city_id>/
     """
     def delete(self, request, provider_id, city_id):
-        print(f"Eliminar relación provider_id={provider_id}, city_id={city_id}")
-        deleted_count, _ = ProviderCity.objects.filter(provider_id=provider_id, city_id=city_id).delete()
+        deleted_count = provider_cities.remove(provider_id, [city_id])
         if deleted_count == 0:
             return Response({'detail': 'Relación no encontrada.'}, status=status.HTTP_404_NOT_FOUND)
         return Response({'detail': 'Relación eliminada correctamente.'}, status=status.HTTP_204_NO_CONTENT)
@@ -130,6 +214,8 @@ class ProviderCityViewSet(viewsets.ModelViewSet):
     """
     ViewSet para el modelo ProviderCity (relación Many-to-Many entre proveedores y ciudades).
     Incluye métodos para crear múltiples relaciones y sincronizar ciudades.
+    Las escrituras pasan por provider_cities (locations.services): una
+    transacción y un único evento service_area_changed por proveedor.
     """
     queryset = ProviderCity.objects.all()
     serializer_class = ProviderCitySerializer
@@ -141,47 +227,131 @@ class ProviderCityViewSet(viewsets.ModelViewSet):
         """
         is_many = isinstance(request.data, list)  # chequea si es lista o dict
         serializer = self.get_serializer(data=request.data, many=is_many)
-        if serializer.is_valid():
-            serializer.save(id_user_create=request.user.id_user)
-            headers = self.get_success_headers(serializer.data)
-            return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        items = serializer.validated_data if is_many else [serializer.validated_data]
+        cities_by_provider = defaultdict(set)
+        for item in items:
+            cities_by_provider[item['provider'].pk].add(item['city'].pk)
+
+        with transaction.atomic():
+            for provider_id, city_ids in cities_by_provider.items():
+                provider_cities.add(provider_id, city_ids, user_id=request.user.id_user)
+
+        # Se responde con las relaciones guardadas, en el orden recibido
+        rows = ProviderCity.objects.filter(
+            provider_id__in=list(cities_by_provider),
+            city_id__in={city_id for city_ids in cities_by_provider.values() for city_id in city_ids},
+        )
+        links = {(row.provider_id, row.city_id): row for row in rows}
+        saved = [links[(item['provider'].pk, item['city'].pk)] for item in items]
+        data = self.get_serializer(saved if is_many else saved[0], many=is_many).data
+        headers = self.get_success_headers(data)
+        return Response(data, status=status.HTTP_201_CREATED, headers=headers)
+
+    # La pk de ProviderCity es el proveedor (la tabla no tiene id propio), así
+    # que las escrituras por detalle no identifican una relación y además no
+    # pasarían por provider_cities: se usan /sync/ y la baja por ciudad.
+    def update(self, request, *args, **kwargs):
+        raise MethodNotAllowed(request.method, detail='Use PATCH /provider-cities/sync/ para cambiar las ciudades.')
+
+    def partial_update(self, request, *args, **kwargs):
+        raise MethodNotAllowed(request.method, detail='Use PATCH /provider-cities/sync/ para cambiar las ciudades.')
+
+    def destroy(self, request, *args, **kwargs):
+        raise MethodNotAllowed(
+            request.method, detail='Use DELETE /providers/<provider_id>/cities/<city_id>/ para quitar una ciudad.'
+        )
 
     @action(detail=False, methods=['patch'], url_path='sync')
     def sync_cities(self, request, *args, **kwargs):
         """
                 Sincroniza las ciudades de un provider:
                 - Recibe { "provider": id, "cities": [1,2,3] }
-                - Borra las que ya no están
-                - Crea las nuevas
+                - Borra las que ya no están y crea las nuevas (una transacción)
+                - Retorna { "provider", "cities", "added", "removed" }
         """
-        provider_id = request.data.get("provider")
+        provider_id = parse_node_id(request.data.get("provider"))
         cities = request.data.get("cities", [])
 
         if not provider_id:
             return Response({"error":"provider es requerido"}, status=status.HTTP_400_BAD_REQUEST)
-            
-        # Traer las ciudades actuales
-
-        current = ProviderCity.objects.filter(provider_id=provider_id).values_list("city_id", flat=True)
-
-        # Determinar las que hay que borrar y las que hay que crear
-        to_delete = set(current) - set(cities)
-        to_add = set(cities) - set(current)
-
-        # Borrar las que ya no están
-        if to_delete:
-            ProviderCity.objects.filter(provider_id=provider_id, city_id__in=to_delete).delete()
-
-        # Crear las nuevas
-        new_objs = [ProviderCity(
-            provider_id=provider_id,
-            city_id=cid,
-            id_user_create=request.user.id_user
-        ) for cid in to_add]
-        ProviderCity.objects.bulk_create(new_objs, ignore_conflicts=True)
-
-        # Devolver estado actual
-        qs = ProviderCity.objects.filter(provider_id=provider_id)
-        serializer = self.get_serializer(qs, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+
+        city_ids = {parse_node_id(city_id) for city_id in cities}
+        if None in city_ids:
+            return Response({"error": "cities debe ser una lista de ids"}, status=status.HTTP_400_BAD_REQUEST)
+
+        current, added, removed = provider_cities.sync(provider_id, city_ids, user_id=request.user.id_user)
+
+        return Response({
+            "provider": provider_id,
+            "cities": sorted(current),
+            "added": sorted(added),
+            "removed": sorted(removed),
+        }, status=status.HTTP_200_OK)
+
+
+# ====================================
+# API VIEW: PROVIDER SERVICE AREA
+# ====================================
+class ProviderServiceAreaAPIView(APIView):
+    """
+    Área de servicio por radio del proveedor autenticado.
+    GET    /service-area/  → área actual (404 si no tiene) y ciudades cubiertas
+    PUT    /service-area/  → { "radius_km": 25, "latitude"?: .., "longitude"?: .. }
+    DELETE /service-area/  → vuelve a usar solo las ciudades explícitas
+    Si no se envía el centro se usan las coordenadas de la ciudad de su dirección.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def _provider(self, request):
+        return getattr(request.user, 'provider', None)
+
+    def _response(self, area, status_code=status.HTTP_200_OK):
+        data = ProviderServiceAreaSerializer(area).data
+        data['city_ids'] = geo.cities_within(area.latitude, area.longitude, area.radius_km)
+        return Response(data, status=status_code)
+
+    def get(self, request):
+        provider = self._provider(request)
+        if provider is None:
+            return Response({'detail': 'Solo los proveedores tienen área de servicio.'}, status=status.HTTP_403_FORBIDDEN)
+        area = ProviderServiceArea.objects.filter(provider=provider).first()
+        if area is None:
+            return Response({'detail': 'El proveedor no tiene área de servicio.'}, status=status.HTTP_404_NOT_FOUND)
+        return self._response(area)
+
+    def put(self, request):
+        provider = self._provider(request)
+        if provider is None:
+            return Response({'detail': 'Solo los proveedores tienen área de servicio.'}, status=status.HTTP_403_FORBIDDEN)
+
+        data = request.data.copy()
+        if data.get('latitude') in (None, '') or data.get('longitude') in (None, ''):
+            city_id = Address.objects.filter(pk=provider.address_id).values_list('city_id', flat=True).first()
+            coordinates = geo.city_coordinates(city_id) if city_id else None
+            if coordinates is None:
+                return Response(
+                    {'detail': 'Indique latitude y longitude: la ciudad de su dirección no tiene coordenadas.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            data['latitude'], data['longitude'] = coordinates
+
+        area = ProviderServiceArea.objects.filter(provider=provider).first()
+        serializer = ProviderServiceAreaSerializer(area, data=data)
+        serializer.is_valid(raise_exception=True)
+        if area is None:
+            area = serializer.save(provider=provider, id_user_create=request.user.id_user)
+            return self._response(area, status.HTTP_201_CREATED)
+        area = serializer.save(id_user_update=request.user.id_user)
+        return self._response(area)
+
+    def delete(self, request):
+        provider = self._provider(request)
+        if provider is None:
+            return Response({'detail': 'Solo los proveedores tienen área de servicio.'}, status=status.HTTP_403_FORBIDDEN)
+        deleted_count, _ = ProviderServiceArea.objects.filter(provider=provider).delete()
+        if deleted_count == 0:
+            return Response({'detail': 'El proveedor no tiene área de servicio.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
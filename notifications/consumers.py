@@ -159,9 +159,9 @@ class NotificationConsumer(AsyncWebsocketConsumer):
             
     @database_sync_to_async
     def get_unread_count(self, user_id):
-        """Obtiene el número de notificaciones no leídas"""
-        from .models import Notification
-        return Notification.objects.filter(user_id=user_id, is_read=False).count()
+        """Obtiene el número de notificaciones no leídas (desde el contador en caché)"""
+        from .counters import unread_counter
+        return unread_counter.get(user_id)
 
     @database_sync_to_async
     def mark_notification_as_read(self, notification_id):
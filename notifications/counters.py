@@ -0,0 +1,86 @@
+from django.core.cache import cache
+
+"""
+Contadores de notificaciones no leídas por usuario.
+
+El valor vive en la caché compartida (Redis) y se mantiene de forma incremental
+al crear, leer, marcar todas como leídas o eliminar notificaciones. Si la clave
+no existe (primera lectura, expiración o caída de la caché) se recalcula desde
+la base de datos. Una tarea periódica (reconcile_unread_counters) corrige
+cualquier desvío.
+"""
+
+
+# ====================================================
+# Contador de notificaciones no leídas
+# ====================================================
+class UnreadNotificationCounter:
+    """Contador por usuario de notificaciones no leídas, respaldado por la caché"""
+
+    key_template = 'notifications:unread:{user_id}'
+    timeout = 60 * 60 * 24
+
+    def _key(self, user_id):
+        return self.key_template.format(user_id=user_id)
+
+    def _count_from_db(self, user_id):
+        from .models import Notification
+        return Notification.objects.filter(user_id=user_id, is_read=False).count()
+
+    # ====================================================
+    # Lectura
+    # ====================================================
+    def get(self, user_id):
+        """
+        Retorna la cantidad de no leídas del usuario.
+        Solo consulta la base de datos si el contador no está en caché.
+        """
+        count = cache.get(self._key(user_id))
+        if count is None:
+            count = self._count_from_db(user_id)
+            cache.add(self._key(user_id), count, self.timeout)
+        return count
+
+    # ====================================================
+    # Escritura incremental
+    # ====================================================
+    def incr(self, user_id, delta=1):
+        """Suma delta al contador. Si no está en caché se recalculará al leerlo."""
+        try:
+            cache.incr(self._key(user_id), delta)
+        except ValueError:
+            pass
+
+    def decr(self, user_id, delta=1):
+        """Resta delta al contador; un valor negativo indica desvío y se descarta."""
+        try:
+            if cache.decr(self._key(user_id), delta) < 0:
+                cache.delete(self._key(user_id))
+        except ValueError:
+            pass
+
+    def set(self, user_id, count):
+        """Fija el valor exacto del contador."""
+        cache.set(self._key(user_id), count, self.timeout)
+
+    def set_many(self, counts):
+        """Fija varios contadores a la vez a partir de un dict {user_id: count}."""
+        if counts:
+            cache.set_many(
+                {self._key(user_id): count for user_id, count in counts.items()},
+                self.timeout
+            )
+
+    def reset(self, user_id):
+        """Deja el contador en cero (ej. al marcar todas como leídas)."""
+        self.set(user_id, 0)
+
+    def invalidate(self, user_id):
+        """Descarta el contador para que se recalcule en la próxima lectura."""
+        cache.delete(self._key(user_id))
+
+
+# ====================================================
+# Instancia global del contador
+# ====================================================
+unread_counter = UnreadNotificationCounter()
@@ -65,6 +65,9 @@ class Notification(models.Model):
             self.read_at = timezone.now()
             self.save(update_fields=['is_read', 'read_at'])
 
+            from .counters import unread_counter
+            unread_counter.decr(self.user_id)
+
     def __str__(self):
         return f"{self.title} → {self.user.username}"
 
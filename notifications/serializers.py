@@ -1,4 +1,7 @@
+from django.utils import timezone
 from rest_framework import serializers
+
+from integracion_comunitaria.values_serializers import ValuesSerializer
 from .models import Notification, NotificationSettings, NotificationType
 
 
@@ -21,22 +24,38 @@ class NotificationSerializer(serializers.ModelSerializer):
 
     def get_time_ago(self, obj):
         """Calcula el tiempo transcurrido desde la creación"""
-        from django.utils import timezone
-        from datetime import timedelta
-        
-        now = timezone.now()
-        diff = now - obj.created_at
-        
-        if diff.days > 0:
-            return f"{diff.days} día{'s' if diff.days > 1 else ''} atrás"
-        elif diff.seconds > 3600:
-            hours = diff.seconds // 3600
-            return f"{hours} hora{'s' if hours > 1 else ''} atrás"
-        elif diff.seconds > 60:
-            minutes = diff.seconds // 60
-            return f"{minutes} minuto{'s' if minutes > 1 else ''} atrás"
-        else:
-            return "Hace un momento"
+        return format_time_ago(obj.created_at)
+
+
+# ====================================================
+# Serialización rápida (filas .values()) de Notificaciones
+# ====================================================
+class NotificationValuesSerializer(ValuesSerializer):
+    """Misma salida que NotificationSerializer, sobre filas .values()"""
+    serializer_class = NotificationSerializer
+
+    def prepare(self, rows):
+        # Un solo "ahora" para todo el lote
+        self._now = timezone.now()
+
+    def get_time_ago(self, row):
+        return format_time_ago(row['created_at'], self._now)
+
+
+def format_time_ago(created_at, now=None):
+    """Texto del tiempo transcurrido desde created_at (ej. '3 horas atrás')"""
+    diff = (now or timezone.now()) - created_at
+    
+    if diff.days > 0:
+        return f"{diff.days} día{'s' if diff.days > 1 else ''} atrás"
+    elif diff.seconds > 3600:
+        hours = diff.seconds // 3600
+        return f"{hours} hora{'s' if hours > 1 else ''} atrás"
+    elif diff.seconds > 60:
+        minutes = diff.seconds // 60
+        return f"{minutes} minuto{'s' if minutes > 1 else ''} atrás"
+    else:
+        return "Hace un momento"
 
 
 
@@ -1,8 +1,12 @@
+import asyncio
 import json
+import time
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 from django.contrib.auth import get_user_model
+from django.db.models import Count
 
+from .counters import unread_counter
 from .models import Notification, NotificationSettings
 from .serializers import NotificationSerializer
 
@@ -75,20 +79,121 @@ class NotificationService:
     # Envío de notificaciones masivas
     # ====================================================
     def send_bulk_notification(self, user_ids, title, message, notification_type='general', 
-                              related_postulation_id=None, related_petition_id=None, metadata=None):
+                              related_postulation_id=None, related_petition_id=None, metadata=None,
+                              return_timings=False):
         """
-        Envía la misma notificación a múltiples usuarios.
+        Envía la misma notificación a múltiples usuarios en bloque.
 
-        Retorna la lista de notificaciones creadas.
+        - Usuarios y NotificationSettings se obtienen con dos consultas IN;
+          las configuraciones faltantes se crean con bulk_create.
+        - La configuración se evalúa en memoria con _is_notification_enabled.
+        - Las notificaciones se insertan con un único bulk_create.
+        - Los contadores de no leídas salen de un solo aggregate agrupado
+          y se guardan en unread_counter.
+        - Los eventos WebSocket se envían juntos en un mismo event loop.
+
+        Retorna la lista de notificaciones creadas. Con return_timings=True
+        retorna (notificaciones, tiempos), donde tiempos es un dict con los
+        segundos consumidos por cada etapa.
         """
+        timings = {}
+        started = stage_started = time.perf_counter()
+
+        def mark(stage):
+            nonlocal stage_started
+            now = time.perf_counter()
+            timings[stage] = now - stage_started
+            stage_started = now
+
         notifications = []
-        for user_id in user_ids:
-            notification = self.send_notification(
-                user_id, title, message, notification_type,
-                related_postulation_id, related_petition_id, metadata
+        user_ids = list(dict.fromkeys(user_ids))
+
+        # 1. Usuarios existentes (una consulta IN)
+        User = get_user_model()
+        existing_ids = set(
+            User.objects.filter(id_user__in=user_ids).values_list('id_user', flat=True)
+        )
+        user_ids = [uid for uid in user_ids if uid in existing_ids]
+        mark('users')
+
+        # 2. Configuraciones (una consulta IN + bulk_create de las faltantes)
+        settings_by_user = {
+            s.user_id: s for s in NotificationSettings.objects.filter(user_id__in=user_ids)
+        }
+        missing = [uid for uid in user_ids if uid not in settings_by_user]
+        if missing:
+            NotificationSettings.objects.bulk_create(
+                [NotificationSettings(user_id=uid) for uid in missing],
+                ignore_conflicts=True,
             )
-            if notification:
-                notifications.append(notification)
+            settings_by_user.update({
+                s.user_id: s for s in NotificationSettings.objects.filter(user_id__in=missing)
+            })
+        mark('settings')
+
+        # 3. Filtrado en memoria según preferencias
+        enabled_ids = [
+            uid for uid in user_ids
+            if uid in settings_by_user
+            and self._is_notification_enabled(settings_by_user[uid], notification_type)
+        ]
+        mark('filter')
+
+        # 4. Inserción en bloque
+        if enabled_ids:
+            notifications = Notification.objects.bulk_create([
+                Notification(
+                    user_id=uid,
+                    title=title,
+                    message=message,
+                    notification_type=notification_type,
+                    related_postulation_id=related_postulation_id,
+                    related_petition_id=related_petition_id,
+                    metadata=metadata or {},
+                )
+                for uid in enabled_ids
+            ])
+            # MySQL no devuelve las PK tras bulk_create: se recuperan las filas
+            # recién insertadas para poder enviarlas al cliente con su id.
+            if notifications[0].pk is None:
+                latest = {}
+                for notification in Notification.objects.filter(
+                    user_id__in=enabled_ids,
+                    notification_type=notification_type,
+                    related_postulation_id=related_postulation_id,
+                    related_petition_id=related_petition_id,
+                ).order_by('user_id', '-created_at', '-id'):
+                    latest.setdefault(notification.user_id, notification)
+                notifications = [latest[uid] for uid in enabled_ids if uid in latest]
+        mark('insert')
+
+        # 5. Contadores de no leídas (un aggregate agrupado).
+        # bulk_create no dispara señales, así que se refrescan aquí los contadores.
+        unread_counts = {}
+        if notifications:
+            recipient_ids = {n.user_id for n in notifications}
+            unread_counts = {uid: 0 for uid in recipient_ids}
+            unread_counts.update(
+                Notification.objects.filter(user_id__in=recipient_ids, is_read=False)
+                .values('user_id')
+                .annotate(total=Count('id'))
+                .values_list('user_id', 'total')
+            )
+            unread_counter.set_many(unread_counts)
+        push_notifications = [
+            n for n in notifications if settings_by_user[n.user_id].push_notifications
+        ]
+        mark('unread_counts')
+
+        # 6. Envío WebSocket del lote completo
+        self._send_websocket_notifications(push_notifications, unread_counts)
+        mark('websocket')
+
+        timings['total'] = time.perf_counter() - started
+        timings['recipients'] = len(notifications)
+
+        if return_timings:
+            return notifications, timings
         return notifications
     
     # ====================================================
@@ -125,7 +230,7 @@ class NotificationService:
         notification_data = serializer.data
         
         # Obtener conteo de no leídas
-        unread_count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        unread_count = unread_counter.get(user_id)
         
         # Enviar al grupo del usuario
         async_to_sync(self.channel_layer.group_send)(
@@ -137,6 +242,36 @@ class NotificationService:
             }
         )
     
+    # ====================================================
+    # Envío de notificaciones en bloque por WebSocket
+    # ====================================================
+    def _send_websocket_notifications(self, notifications, unread_counts):
+        """
+        Envía un lote de notificaciones a sus grupos de usuario.
+
+        Todos los group_send se lanzan concurrentemente dentro de una única
+        llamada async_to_sync, en lugar de un viaje bloqueante por usuario.
+        """
+        if not self.channel_layer or not notifications:
+            return
+
+        payloads = NotificationSerializer(notifications, many=True).data
+
+        async def send_all():
+            await asyncio.gather(*[
+                self.channel_layer.group_send(
+                    f'notifications_{notification.user_id}',
+                    {
+                        'type': 'notification_created',
+                        'notification': payload,
+                        'unread_count': unread_counts.get(notification.user_id, 0)
+                    }
+                )
+                for notification, payload in zip(notifications, payloads)
+            ])
+
+        async_to_sync(send_all)()
+    
     # ====================================================
     # Marcar notificación como leída
     # ====================================================
@@ -154,7 +289,7 @@ class NotificationService:
             # Notificar por WebSocket
             if self.channel_layer:
                 serializer = NotificationSerializer(notification)
-                unread_count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+                unread_count = unread_counter.get(user_id)
                 
                 async_to_sync(self.channel_layer.group_send)(
                     f'notifications_{user_id}',
@@ -184,7 +319,7 @@ class NotificationService:
             
             # Notificar por WebSocket
             if self.channel_layer:
-                unread_count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+                unread_count = unread_counter.get(user_id)
                 
                 async_to_sync(self.channel_layer.group_send)(
                     f'notifications_{user_id}',
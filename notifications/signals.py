@@ -0,0 +1,31 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .counters import unread_counter
+from .models import Notification
+
+
+# ====================================================
+# SIGNAL: count_unread_on_create
+# ====================================================
+@receiver(post_save, sender=Notification)
+def count_unread_on_create(sender, instance, created, **kwargs):
+    """
+    Incrementa el contador de no leídas cuando se crea una notificación.
+    Las inserciones con bulk_create no disparan la señal: el servicio
+    actualiza esos contadores directamente.
+    """
+    if created and not instance.is_read:
+        unread_counter.incr(instance.user_id)
+
+
+# ====================================================
+# SIGNAL: count_unread_on_delete
+# ====================================================
+@receiver(post_delete, sender=Notification)
+def count_unread_on_delete(sender, instance, **kwargs):
+    """
+    Decrementa el contador de no leídas al eliminar una notificación no leída.
+    """
+    if not instance.is_read:
+        unread_counter.decr(instance.user_id)
@@ -0,0 +1,54 @@
+from celery import shared_task
+from django.db.models import Count
+
+from .counters import unread_counter
+from .models import Notification
+from .services import notification_service
+
+
+# ====================================================
+# TAREA: send_notification_batch
+# ====================================================
+@shared_task
+def send_notification_batch(user_ids, title, message, notification_type='general',
+                            related_postulation_id=None, related_petition_id=None, metadata=None):
+    """
+    Entrega la misma notificación a un lote de usuarios en segundo plano,
+    usando el camino en bloque de NotificationService.send_bulk_notification.
+
+    Retorna los tiempos por etapa del lote (incluye 'recipients').
+    """
+    _, timings = notification_service.send_bulk_notification(
+        user_ids, title, message, notification_type,
+        related_postulation_id, related_petition_id, metadata,
+        return_timings=True,
+    )
+    return timings
+
+
+# ====================================================
+# TAREA PERIÓDICA: reconcile_unread_counters
+# ====================================================
+@shared_task
+def reconcile_unread_counters(batch_size=1000):
+    """
+    Recalcula desde la base de datos los contadores de no leídas en caché.
+
+    Recorre los usuarios con notificaciones en lotes y, por cada lote,
+    obtiene los conteos con un aggregate agrupado y los guarda con set_many.
+    Retorna la cantidad de contadores actualizados.
+    """
+    user_ids = list(
+        Notification.objects.order_by().values_list('user_id', flat=True).distinct()
+    )
+    for i in range(0, len(user_ids), batch_size):
+        batch = user_ids[i:i + batch_size]
+        counts = {uid: 0 for uid in batch}
+        counts.update(
+            Notification.objects.filter(user_id__in=batch, is_read=False)
+            .values('user_id')
+            .annotate(total=Count('id'))
+            .values_list('user_id', 'total')
+        )
+        unread_counter.set_many(counts)
+    return len(user_ids)
@@ -6,9 +6,12 @@ from django.db.models import Q, Count
 from django.utils import timezone
 from datetime import timedelta
 
+from integracion_comunitaria.pagination import CreatedAtCursorPagination
+from integracion_comunitaria.values_serializers import fast_serialization_enabled
+from .counters import unread_counter
 from .models import Notification, NotificationSettings
 from .serializers import (
-    NotificationSerializer, NotificationCreateSerializer, 
+    NotificationSerializer, NotificationValuesSerializer, NotificationCreateSerializer, 
     NotificationUpdateSerializer, NotificationSettingsSerializer,
     NotificationStatsSerializer, NotificationTypeSerializer
 )
@@ -21,6 +24,7 @@ from .serializers import (
 class NotificationListCreateView(generics.ListCreateAPIView):
     """Lista y crea notificaciones"""
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
     
     def get_queryset(self):
         # Filtra solo las notificaciones del usuario autenticado
@@ -34,6 +38,15 @@ class NotificationListCreateView(generics.ListCreateAPIView):
         # Usa el serializer estándar para listar
         return NotificationSerializer
     
+    def list(self, request, *args, **kwargs):
+        # Camino rápido: filas .values() con la misma salida que NotificationSerializer
+        if not fast_serialization_enabled():
+            return super().list(request, *args, **kwargs)
+
+        queryset = NotificationValuesSerializer.values(self.get_queryset(), 'created_at')
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(NotificationValuesSerializer().serialize_rows(page))
+
     def perform_create(self, serializer):
         # Al crear, asigna automáticamente la notificación al usuario
         serializer.save(user=self.request.user)
@@ -52,6 +65,11 @@ class NotificationRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIVie
         # Asegura que solo acceda a sus propias notificaciones
         return Notification.objects.filter(user=self.request.user)
 
+    def perform_update(self, serializer):
+        # is_read puede cambiar en cualquier sentido: se recalcula el contador
+        serializer.save()
+        unread_counter.invalidate(self.request.user.id_user)
+
 
 # -----------------------------------------------------------
 # ESTADÍSTICAS DE NOTIFICACIONES
@@ -68,7 +86,7 @@ def notification_stats(request):
     total_notifications = Notification.objects.filter(user=user).count()
     
     # Cantidad de no leídas
-    unread_notifications = Notification.objects.filter(user=user, is_read=False).count()
+    unread_notifications = unread_counter.get(user.id_user)
     
     # Agrupación por tipo con COUNT
     notifications_by_type = {
@@ -106,6 +124,7 @@ def mark_all_as_read(request):
         is_read=True, 
         read_at=timezone.now()
     )
+    unread_counter.reset(user.id_user)
     
     return Response({
         'message': f'{updated_count} notificaciones marcadas como leídas',
@@ -157,7 +176,7 @@ class NotificationSettingsView(generics.RetrieveUpdateAPIView):
 @permission_classes([IsAuthenticated])
 def get_unread_count(request):
     """Obtiene el número de notificaciones no leídas"""
-    count = Notification.objects.filter(user=request.user, is_read=False).count()
+    count = unread_counter.get(request.user.id_user)
     return Response({'unread_count': count})
 
 @api_view(['GET'])
@@ -171,5 +190,8 @@ def get_recent_notifications(request):
         limit = 10
     
     notifications = Notification.objects.filter(user=request.user)[:limit]
+    if fast_serialization_enabled():
+        return Response(NotificationValuesSerializer().serialize(notifications))
+
     serializer = NotificationSerializer(notifications, many=True)
     return Response(serializer.data)
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class OffersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'offers'
+
+    def ready(self):
+        """
+        Importacion de las señales al iniciar la aplicacion.
+        """
+        import offers.signals
@@ -0,0 +1,200 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from authentication.models import Customer, ProviderCategory
+from interest.models import Interest
+from locations import geo
+from locations.models import ProviderServiceArea
+from petitions.models import ProviderMatchIndex
+from .models import Offer
+
+"""
+Feed de ofertas del cliente, precalculado y en caché.
+
+Se guardan tres entradas independientes:
+    - por ciudad: las ofertas activas (no vencidas) de los proveedores que
+      trabajan en la ciudad, cada una con su ventana de fechas y las categorías
+      de su proveedor. Sale del índice de matching (ProviderMatchIndex), que ya
+      tiene las combinaciones ciudad × categoría de cada proveedor.
+    - radio: una sola lista con las ofertas de los proveedores que tienen
+      radio de servicio, con su centro y radio; la distancia a la ciudad del
+      cliente se calcula al leer (el radio no se expande por ciudad).
+    - por cliente: su ciudad y sus categorías de interés.
+
+El feed de un cliente cruza las entradas en memoria y filtra por fecha al leer, así
+que una oferta que abre o vence por calendario no necesita recalcular nada.
+
+Invalidación (offers.signals), siempre al confirmar la transacción:
+    - cambia una oferta → las ciudades de su proveedor y la lista de radio
+    - se reindexa un proveedor (categorías, ciudades) → sus ciudades
+      anteriores y nuevas y la lista de radio
+    - cambia un radio de servicio → la lista de radio
+    - cambian los intereses, el cliente o su dirección → la entrada del cliente
+"""
+
+
+# ====================================================
+# Feed de ofertas
+# ====================================================
+class OfferFeed:
+    """Ofertas visibles para cada cliente según su ciudad e intereses"""
+
+    city_key_template = 'offer_feed:city:{city_id}'
+    radius_key = 'offer_feed:radius'
+    customer_key_template = 'offer_feed:customer:{customer_id}'
+    city_timeout = 60 * 60
+    customer_timeout = 60 * 60 * 24
+
+    # ====================================================
+    # Lectura
+    # ====================================================
+    def offer_ids(self, customer):
+        """
+        Ids de las ofertas activas y vigentes de proveedores que trabajan en la
+        ciudad del cliente y tienen alguna de sus categorías de interés.
+        """
+        city_id, category_ids = self._customer_keys(customer.id_customer)
+        if not city_id or not category_ids:
+            return []
+
+        now = timezone.now()
+        wanted = set(category_ids)
+        offer_ids = {
+            offer_id
+            for offer_id, date_open, date_close, offer_categories in self._city_offers(city_id)
+            if date_open <= now <= date_close and wanted.intersection(offer_categories)
+        }
+
+        coordinates = geo.city_coordinates(city_id)
+        radius_offers = [
+            offer for offer in self._radius_offers()
+            if offer[1] <= now <= offer[2] and wanted.intersection(offer[3])
+        ] if coordinates is not None else []
+        if radius_offers:
+            distances = geo.haversine_km(
+                *coordinates,
+                [offer[4] for offer in radius_offers],
+                [offer[5] for offer in radius_offers],
+            )
+            offer_ids.update(
+                offer[0] for offer, distance in zip(radius_offers, distances) if distance <= offer[6]
+            )
+        return sorted(offer_ids)
+
+    def _customer_keys(self, customer_id):
+        key = self.customer_key_template.format(customer_id=customer_id)
+        keys = cache.get(key)
+        if keys is None:
+            city_id = (
+                Customer.objects.filter(id_customer=customer_id)
+                .values_list('address__city_id', flat=True)
+                .first()
+            )
+            category_ids = sorted(set(
+                Interest.objects.filter(id_customer=customer_id, is_deleted=False)
+                .values_list('id_category', flat=True)
+            ))
+            keys = (city_id, category_ids)
+            cache.set(key, keys, self.customer_timeout)
+        return keys
+
+    def _city_offers(self, city_id):
+        key = self.city_key_template.format(city_id=city_id)
+        offers = cache.get(key)
+        if offers is None:
+            offers = self._build_city(city_id)
+            cache.set(key, offers, self.city_timeout)
+        return offers
+
+    def _radius_offers(self):
+        offers = cache.get(self.radius_key)
+        if offers is None:
+            offers = self._build_radius()
+            cache.set(self.radius_key, offers, self.city_timeout)
+        return offers
+
+    @staticmethod
+    def _build_radius():
+        """Ofertas activas y no vencidas de los proveedores con radio, con sus categorías y su área."""
+        areas = {
+            provider_id: (latitude, longitude, radius_km)
+            for provider_id, latitude, longitude, radius_km in ProviderServiceArea.objects.values_list(
+                'provider_id', 'latitude', 'longitude', 'radius_km'
+            )
+        }
+        if not areas:
+            return []
+        provider_categories = {}
+        rows = ProviderCategory.objects.filter(provider_id__in=list(areas)).values_list('provider_id', 'category_id')
+        for provider_id, category_id in rows:
+            provider_categories.setdefault(provider_id, set()).add(category_id)
+
+        offers = Offer.objects.filter(
+            status='active',
+            date_close__gte=timezone.now(),
+            id_provider__in=list(provider_categories),
+        ).order_by('offer_id').values_list('offer_id', 'id_provider', 'date_open', 'date_close')
+        return [
+            (offer_id, date_open, date_close, sorted(provider_categories[provider_id]), *areas[provider_id])
+            for offer_id, provider_id, date_open, date_close in offers
+        ]
+
+    @staticmethod
+    def _build_city(city_id):
+        """Ofertas activas y no vencidas de los proveedores de la ciudad, con sus categorías."""
+        provider_categories = {}
+        rows = ProviderMatchIndex.objects.filter(
+            id_city=city_id, id_category__isnull=False
+        ).values_list('id_provider', 'id_category')
+        for provider_id, category_id in rows:
+            provider_categories.setdefault(provider_id, set()).add(category_id)
+        if not provider_categories:
+            return []
+
+        offers = Offer.objects.filter(
+            status='active',
+            date_close__gte=timezone.now(),
+            id_provider__in=list(provider_categories),
+        ).order_by('offer_id').values_list('offer_id', 'id_provider', 'date_open', 'date_close')
+        return [
+            (offer_id, date_open, date_close, sorted(provider_categories[provider_id]))
+            for offer_id, provider_id, date_open, date_close in offers
+        ]
+
+    # ====================================================
+    # Invalidación
+    # ====================================================
+    def _invalidate(self, keys):
+        if keys:
+            transaction.on_commit(lambda: cache.delete_many(keys))
+
+    def invalidate_cities(self, *city_ids):
+        """Descarta las ofertas cacheadas de las ciudades al confirmar la transacción."""
+        self._invalidate([
+            self.city_key_template.format(city_id=city_id) for city_id in set(city_ids) if city_id
+        ])
+
+    def invalidate_radius(self):
+        """Descarta la lista de ofertas de proveedores con radio de servicio."""
+        self._invalidate([self.radius_key])
+
+    def invalidate_provider(self, provider_id):
+        """Descarta las ciudades donde trabaja el proveedor (ej. cambió una de sus ofertas)."""
+        self.invalidate_cities(*ProviderMatchIndex.objects.filter(
+            id_provider=provider_id
+        ).values_list('id_city', flat=True).distinct())
+        self.invalidate_radius()
+
+    def invalidate_customers(self, *customer_ids):
+        """Descarta la ciudad e intereses cacheados de los clientes."""
+        self._invalidate([
+            self.customer_key_template.format(customer_id=customer_id)
+            for customer_id in set(customer_ids) if customer_id
+        ])
+
+
+# ====================================================
+# Instancia global del feed de ofertas
+# ====================================================
+offer_feed = OfferFeed()
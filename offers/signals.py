@@ -0,0 +1,56 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from authentication.models import Customer
+from interest.models import Interest
+from locations.models import Address, ProviderServiceArea
+from petitions.matching import provider_reindexed
+from .feed import offer_feed
+from .models import Offer
+
+
+# ====================================================
+# SIGNALS: invalidación del feed de ofertas
+# ====================================================
+@receiver([post_save, post_delete], sender=Offer)
+def refresh_feed_on_offer_change(sender, instance, **kwargs):
+    """
+    Descarta el feed de las ciudades del proveedor cuando una oferta se crea,
+    cambia de estado o fechas, o se elimina (soft delete).
+    """
+    offer_feed.invalidate_provider(instance.id_provider)
+
+
+@receiver(provider_reindexed)
+def refresh_feed_on_provider_reindexed(sender, provider_id, city_ids, **kwargs):
+    """Descarta el feed de las ciudades anteriores y nuevas del proveedor (y sus categorías en la lista de radio)."""
+    offer_feed.invalidate_cities(*city_ids)
+    offer_feed.invalidate_radius()
+
+
+@receiver([post_save, post_delete], sender=ProviderServiceArea)
+def refresh_feed_on_service_area_change(sender, instance, **kwargs):
+    """Descarta la lista de radio cuando un proveedor cambia o elimina su área."""
+    offer_feed.invalidate_radius()
+
+
+@receiver([post_save, post_delete], sender=Interest)
+def refresh_feed_on_interest_change(sender, instance, **kwargs):
+    """Recalcula las categorías del cliente (Interest.delete es un save con is_deleted)."""
+    offer_feed.invalidate_customers(instance.id_customer_id)
+
+
+@receiver(post_save, sender=Customer)
+def refresh_feed_on_customer_save(sender, instance, **kwargs):
+    """Recalcula la ciudad del cliente (puede haber cambiado de dirección)."""
+    offer_feed.invalidate_customers(instance.id_customer)
+
+
+@receiver(post_save, sender=Address)
+def refresh_feed_on_address_save(sender, instance, created, **kwargs):
+    """Recalcula la ciudad de los clientes cuya dirección cambió."""
+    if created:
+        return
+    offer_feed.invalidate_customers(
+        *Customer.objects.filter(address=instance).values_list('id_customer', flat=True)
+    )
@@ -0,0 +1,98 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+
+from hires.serializers import HireSerializer, HireValuesSerializer, get_hire_context_maps
+from notifications.models import Notification
+from notifications.serializers import NotificationSerializer, NotificationValuesSerializer
+from petitions.serializers import PetitionListSerializer, PetitionListValuesSerializer
+from petitions.services import get_petition_list_queryset
+from postulations.models import Postulation, PostulationBudget, PostulationMaterial
+from postulations.serializers import PostulationSerializer, PostulationValuesSerializer
+
+
+def _postulations():
+    return (
+        Postulation.objects.select_related('id_state', 'id_petition', 'id_petition__id_state')
+        .prefetch_related(
+            Prefetch('budgets', queryset=PostulationBudget.objects.all()),
+            Prefetch('materials', queryset=PostulationMaterial.objects.select_related('id_material')),
+        )
+        .order_by('-date_create', '-pk')
+    )
+
+
+def _drf_hires(queryset):
+    postulations = list(queryset)
+    return HireSerializer(postulations, many=True, context=get_hire_context_maps(postulations)).data
+
+
+# (nombre, queryset, camino DRF, camino rápido)
+TARGETS = [
+    (
+        'PostulationSerializer',
+        _postulations,
+        lambda qs: PostulationSerializer(qs, many=True).data,
+        lambda qs: PostulationValuesSerializer().serialize(qs),
+    ),
+    (
+        'PetitionListSerializer',
+        lambda: get_petition_list_queryset().order_by('-date_create', '-pk'),
+        lambda qs: PetitionListSerializer(qs, many=True).data,
+        lambda qs: PetitionListValuesSerializer().serialize(qs),
+    ),
+    (
+        'HireSerializer',
+        _postulations,
+        _drf_hires,
+        lambda qs: HireValuesSerializer().serialize(qs),
+    ),
+    (
+        'NotificationSerializer',
+        lambda: Notification.objects.order_by('-created_at', '-pk'),
+        lambda qs: NotificationSerializer(qs, many=True).data,
+        lambda qs: NotificationValuesSerializer().serialize(qs),
+    ),
+]
+
+
+class Command(BaseCommand):
+    """
+    Compara el serializer de DRF con el camino rápido sobre filas .values().
+    Mide consulta + serialización de punta a punta y verifica que el JSON sea idéntico.
+    Uso: python manage.py benchmark_serializers [--sizes 100 1000 10000] [--repeat 3]
+    """
+    help = 'Compara los serializers de DRF con los ValuesSerializer a 100, 1k y 10k filas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[100, 1000, 10000])
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Repeticiones por medición (se toma la mejor).')
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        repeat = options['repeat']
+
+        self.stdout.write(f"{'serializer':<24}{'filas':>8}{'drf ms':>10}{'rápido ms':>11}{'x':>7}  json")
+        for name, queryset, drf, fast in TARGETS:
+            for size in options['sizes']:
+                drf_time, drf_data = self._measure(drf, queryset, size, repeat)
+                fast_time, fast_data = self._measure(fast, queryset, size, repeat)
+
+                identical = renderer.render(drf_data) == renderer.render(fast_data)
+                speedup = drf_time / fast_time if fast_time else 0
+                self.stdout.write(
+                    f'{name:<24}{len(drf_data):>8}{drf_time * 1000:>10.1f}{fast_time * 1000:>11.1f}'
+                    f'{speedup:>7.1f}  ' + ('idéntico' if identical else self.style.ERROR('DISTINTO'))
+                )
+
+    def _measure(self, serialize, queryset, size, repeat):
+        best, data = None, None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            data = serialize(queryset()[:size])
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, data
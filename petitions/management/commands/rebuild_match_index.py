@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from petitions import matching
+
+
+class Command(BaseCommand):
+    """
+    Reconstruye desde cero el índice de matching peticiones ↔ proveedores.
+    Uso: python manage.py rebuild_match_index
+    """
+    help = 'Reconstruye el índice materializado de matching entre peticiones y proveedores.'
+
+    def handle(self, *args, **options):
+        petitions, providers = matching.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Índice reconstruido: {petitions} peticiones, {providers} proveedores.'
+        ))
@@ -0,0 +1,235 @@
+import threading
+from itertools import product
+
+from django.db import transaction
+from django.db.models import Q
+from django.dispatch import Signal
+
+from authentication.models import Customer, Provider, ProviderCategory
+from locations import geo
+from locations.models import ProviderCity
+from .models import Petition, PetitionCategory, PetitionMatchIndex, ProviderMatchIndex
+
+"""
+Índice materializado de matching entre peticiones y proveedores.
+
+Cada petición y cada proveedor se guardan como filas
+(ciudad, categoría, profesión, tipo de proveedor) en PetitionMatchIndex y
+ProviderMatchIndex. Así, encontrar las peticiones de un proveedor o los
+proveedores de una petición es una búsqueda sobre un índice compuesto,
+sin los JOIN con DISTINCT entre categorías, ciudades y direcciones.
+
+El índice guarda solo las ciudades explícitas del proveedor (ProviderCity).
+El radio de servicio (locations.geo) no se expande en filas: se resuelve al
+buscar, en memoria, con geo.cities_in_service_area (peticiones de un
+proveedor) y geo.providers_covering (proveedores de una petición).
+
+Las señales de petitions.signals llaman a schedule_petition / schedule_provider
+cuando cambian los datos de origen; las reindexaciones se agrupan y se
+ejecutan una sola vez por entidad al confirmar la transacción.
+"""
+
+
+# Se envía después de reindexar un proveedor con provider_id y city_ids
+# (ciudades anteriores y nuevas), para las cachés que dependen del índice.
+provider_reindexed = Signal()
+
+
+# ====================================================
+# Reindexación diferida (una vez por entidad y transacción)
+# ====================================================
+_pending = threading.local()
+
+
+def _pending_keys():
+    keys = getattr(_pending, 'keys', None)
+    if keys is None:
+        keys = _pending.keys = set()
+    return keys
+
+
+def _flush():
+    keys = _pending_keys()
+    _pending.keys = set()
+    for kind, pk in keys:
+        if kind == 'petition':
+            reindex_petition(pk)
+        else:
+            reindex_provider(pk)
+
+
+def schedule_petition(petition_id):
+    """Reindexa la petición al confirmar la transacción en curso."""
+    _pending_keys().add(('petition', petition_id))
+    transaction.on_commit(_flush)
+
+
+def schedule_provider(provider_id):
+    """Reindexa el proveedor al confirmar la transacción en curso."""
+    _pending_keys().add(('provider', provider_id))
+    transaction.on_commit(_flush)
+
+
+def schedule_customer(customer_id):
+    """Reindexa todas las peticiones de un cliente (ej. cambió su ciudad)."""
+    for petition_id in Petition.objects.filter(id_customer=customer_id).values_list('id_petition', flat=True):
+        schedule_petition(petition_id)
+
+
+# ====================================================
+# Reindexación
+# ====================================================
+def reindex_petition(petition_id):
+    """
+    Reemplaza las filas del índice de una petición.
+    Las peticiones eliminadas (soft delete) quedan fuera del índice.
+    """
+    PetitionMatchIndex.objects.filter(id_petition=petition_id).delete()
+
+    petition = Petition.objects.filter(pk=petition_id).values(
+        'id_customer', 'id_profession_id', 'id_type_provider_id'
+    ).first()
+    if petition is None:
+        return
+
+    city_id = (
+        Customer.objects.filter(id_customer=petition['id_customer'])
+        .values_list('address__city_id', flat=True)
+        .first()
+    )
+    category_ids = list(
+        PetitionCategory.objects.filter(id_petition=petition_id)
+        .values_list('id_category_id', flat=True)
+        .distinct()
+    ) or [None]
+
+    PetitionMatchIndex.objects.bulk_create([
+        PetitionMatchIndex(
+            id_petition=petition_id,
+            id_city=city_id,
+            id_category=category_id,
+            id_profession=petition['id_profession_id'],
+            id_type_provider=petition['id_type_provider_id'],
+        )
+        for category_id in category_ids
+    ])
+
+
+def reindex_provider(provider_id):
+    """
+    Reemplaza las filas del índice de un proveedor: una por cada
+    combinación de sus ciudades y categorías.
+    """
+    previous_city_ids = set(
+        ProviderMatchIndex.objects.filter(id_provider=provider_id).values_list('id_city', flat=True)
+    )
+    ProviderMatchIndex.objects.filter(id_provider=provider_id).delete()
+
+    provider = Provider.objects.filter(pk=provider_id).values(
+        'profession_id', 'type_provider_id'
+    ).first()
+    if provider is None:
+        provider_reindexed.send(sender=ProviderMatchIndex, provider_id=provider_id, city_ids=previous_city_ids)
+        return
+
+    city_ids, category_ids = _provider_keys(provider_id)
+
+    ProviderMatchIndex.objects.bulk_create([
+        ProviderMatchIndex(
+            id_provider=provider_id,
+            id_city=city_id,
+            id_category=category_id,
+            id_profession=provider['profession_id'],
+            id_type_provider=provider['type_provider_id'],
+        )
+        for city_id, category_id in product(city_ids or [None], category_ids or [None])
+    ], batch_size=1000)
+    provider_reindexed.send(
+        sender=ProviderMatchIndex, provider_id=provider_id, city_ids=previous_city_ids | set(city_ids)
+    )
+
+
+def rebuild():
+    """Reconstruye el índice completo. Retorna (peticiones, proveedores)."""
+    petition_ids = list(Petition.objects.values_list('id_petition', flat=True))
+    provider_ids = list(Provider.objects.values_list('id_provider', flat=True))
+
+    with transaction.atomic():
+        PetitionMatchIndex.objects.all().delete()
+        ProviderMatchIndex.objects.all().delete()
+        for petition_id in petition_ids:
+            reindex_petition(petition_id)
+        for provider_id in provider_ids:
+            reindex_provider(provider_id)
+
+    return len(petition_ids), len(provider_ids)
+
+
+# ====================================================
+# Búsquedas
+# ====================================================
+def _provider_keys(provider_id):
+    """Ciudades explícitas y categorías del proveedor (las filas del índice)."""
+    city_ids = sorted(set(
+        ProviderCity.objects.filter(provider_id=provider_id).values_list('city_id', flat=True)
+    ))
+    category_ids = list(
+        ProviderCategory.objects.filter(provider_id=provider_id).values_list('category_id', flat=True)
+    )
+    return city_ids, category_ids
+
+
+def petition_ids_for_provider(provider):
+    """
+    Retorna (como subconsulta) los ids de las peticiones que coinciden con el proveedor.
+    Las categorías y ciudades solo filtran si el proveedor tiene alguna asignada;
+    las ciudades incluyen las de su radio de servicio.
+    """
+    city_ids, category_ids = _provider_keys(provider.id_provider)
+    city_ids = sorted(set(city_ids) | set(geo.cities_in_service_area(provider.id_provider)))
+
+    keys = PetitionMatchIndex.objects.filter(
+        Q(id_profession=provider.profession_id) | Q(id_profession__isnull=True),
+        Q(id_type_provider=provider.type_provider_id) | Q(id_type_provider__isnull=True),
+    )
+    if category_ids:
+        keys = keys.filter(id_category__in=category_ids)
+    if city_ids:
+        keys = keys.filter(id_city__in=city_ids)
+    return keys.values('id_petition')
+
+
+def provider_ids_for_petition(petition):
+    """
+    Retorna (como subconsulta) los ids de los proveedores que coinciden con la petición,
+    o None si el cliente de la petición no existe.
+    """
+    customer_city = list(
+        Customer.objects.filter(id_customer=petition.id_customer)
+        .values_list('address__city_id', flat=True)
+    )
+    if not customer_city:
+        return None
+    city_id = customer_city[0]
+
+    keys = ProviderMatchIndex.objects.all()
+    if petition.id_profession_id:
+        keys = keys.filter(id_profession=petition.id_profession_id)
+    if petition.id_type_provider_id:
+        keys = keys.filter(id_type_provider=petition.id_type_provider_id)
+
+    category_ids = list(
+        PetitionCategory.objects.filter(id_petition=petition.id_petition)
+        .values_list('id_category_id', flat=True)
+    )
+    if category_ids:
+        keys = keys.filter(id_category__in=category_ids)
+    if city_id:
+        city_filter = Q(id_city=city_id)
+        coordinates = geo.city_coordinates(city_id)
+        if coordinates is not None:
+            covering = geo.providers_covering(*coordinates)
+            if covering:
+                city_filter |= Q(id_provider__in=covering)
+        keys = keys.filter(city_filter)
+    return keys.values('id_provider')
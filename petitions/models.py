@@ -1,5 +1,8 @@
 from django.db import models
 
+from files.storage import content_addressed_storage
+from integracion_comunitaria.tracking import FieldTrackerMixin
+
 
 def petition_upload_path(instance, filename):
     """
@@ -59,7 +62,7 @@ class PetitionManager(models.Manager):
 # ====================================================
 # MODELO: Petition
 # ====================================================
-class Petition(models.Model):
+class Petition(FieldTrackerMixin, models.Model):
     """
     Modelo principal de Peticiones.
     Contiene información general de la petición, tipo, cliente, fechas, estado,
@@ -85,6 +88,9 @@ class Petition(models.Model):
     # Campo para soft delete
     is_deleted = models.BooleanField(default=False)
 
+    # Campos cuyo valor previo consultan las señales (petitions.signals)
+    tracked_fields = ('is_deleted',)
+
     # Asignar manager personalizado
     objects = PetitionManager()
     all_objects = models.Manager()  # Incluye los borrados
@@ -125,7 +131,8 @@ class PetitionAttachment(models.Model):
     """
     id_petition_attachment = models.AutoField(primary_key=True)
     id_petition = models.ForeignKey(Petition, on_delete=models.CASCADE, db_column='id_petition')
-    file = models.FileField(upload_to=petition_upload_path, db_column='url')
+    # Deduplicado por contenido: el archivo se guarda como blob (files.storage)
+    file = models.FileField(upload_to=petition_upload_path, db_column='url', storage=content_addressed_storage)
     # type = models.CharField(max_length=50)
     id_user_create = models.IntegerField(null=True, blank=True)
     id_user_update = models.IntegerField(null=True, blank=True)
@@ -176,4 +183,53 @@ class PetitionStateHistory(models.Model):
 
     class Meta:
         db_table = 'n_petition_state_history'
-        managed = False
\ No newline at end of file
+        managed = False
+
+# ====================================================
+# MODELO: PetitionMatchIndex
+# ====================================================
+class PetitionMatchIndex(models.Model):
+    """
+    Índice materializado de matching del lado de las peticiones.
+    Una fila por cada categoría de la petición (o una sola con categoría nula
+    si no tiene), con la ciudad del cliente, la profesión y el tipo de
+    proveedor requeridos. Se mantiene desde petitions.matching.
+    """
+    id = models.BigAutoField(primary_key=True)
+    id_petition = models.IntegerField()
+    id_city = models.IntegerField(null=True, blank=True)
+    id_category = models.IntegerField(null=True, blank=True)
+    id_profession = models.IntegerField(null=True, blank=True)
+    id_type_provider = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'n_petition_match_index'
+        indexes = [
+            models.Index(fields=['id_city', 'id_category', 'id_profession', 'id_type_provider']),
+            models.Index(fields=['id_petition']),
+        ]
+
+
+# ====================================================
+# MODELO: ProviderMatchIndex
+# ====================================================
+class ProviderMatchIndex(models.Model):
+    """
+    Índice materializado de matching del lado de los proveedores.
+    Una fila por cada par (ciudad, categoría) del proveedor (nulos si no tiene
+    ciudades o categorías), junto con su profesión y tipo de proveedor.
+    Se mantiene desde petitions.matching.
+    """
+    id = models.BigAutoField(primary_key=True)
+    id_provider = models.IntegerField()
+    id_city = models.IntegerField(null=True, blank=True)
+    id_category = models.IntegerField(null=True, blank=True)
+    id_profession = models.IntegerField(null=True, blank=True)
+    id_type_provider = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'n_provider_match_index'
+        indexes = [
+            models.Index(fields=['id_city', 'id_category', 'id_profession', 'id_type_provider']),
+            models.Index(fields=['id_provider']),
+        ]
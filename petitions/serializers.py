@@ -1,5 +1,8 @@
 from rest_framework import serializers
 
+from integracion_comunitaria.values_serializers import ValuesSerializer
+from files.derivatives import derivatives
+
 from .models import (
     TypePetition,
     PetitionState,
@@ -72,11 +75,17 @@ class PetitionAttachmentSerializer(serializers.ModelSerializer):
     """
     Serializer para los archivos adjuntos a una petición.
     Gestiona la serialización de los attachments.
+    variants: URLs de las versiones redimensionadas (el original mientras no estén listas).
     """
+    variants = serializers.SerializerMethodField()
+
     class Meta:
         model = PetitionAttachment
         fields = '__all__'
 
+    def get_variants(self, obj):
+        return derivatives.variants(obj.file.name) if obj.file else None
+
 # ====================================================
 # SERIALIZER: PetitionMaterialSerializer
 # ====================================================
@@ -129,6 +138,17 @@ class PetitionListSerializer(serializers.ModelSerializer):
         )
 
 
+# ====================================================
+# SERIALIZER: PetitionListValuesSerializer (lista, solo lectura)
+# ====================================================
+class PetitionListValuesSerializer(ValuesSerializer):
+    """
+    Versión de solo lectura de PetitionListSerializer sobre filas .values().
+    Misma salida JSON; las categorías se cargan en una sola consulta.
+    """
+    serializer_class = PetitionListSerializer
+
+
 # ====================================================
 # SERIALIZER PRINCIPAL: PetitionSerializer (para vista de detalle)
 # ====================================================
@@ -1,6 +1,15 @@
-from django.db.models import Q, Subquery, Prefetch
+import json
+import os
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Subquery, Prefetch
+from rest_framework import serializers
+from . import matching
 from .models import Petition, PetitionCategory, PetitionAttachment, PetitionMaterial, PetitionStateHistory
-from authentication.models import Customer, Provider
+from authentication.models import Provider
+from files.blobs import blobs
+from files.derivatives import derivatives
+from files.storage import content_addressed_storage
 
 # ====================================================
 # FUNCIÓN: get_petition_list_queryset
@@ -78,53 +87,25 @@ def filter_petitions_for_provider(provider):
     3. Coincidencia de tipo de proveedor (si se especifica) o sin tipo requerido
     4. Coincidencia de categorías entre proveedor y petición
     5. Coincidencia geográfica: ciudades del proveedor y clientes
-    """
 
-    qs = get_petition_list_queryset()
-    # ------------------------------------------------
-    # Filtrar por profesión del proveedor
-    # Si la petición especifica una profesión, debe coincidir con la del proveedor.
-    # Si la petición no especifica profesión (isnull=True), también se incluye.
-    # ------------------------------------------------
-    qs = qs.filter(
-        Q(id_profession=provider.profession) | Q(id_profession__isnull=True)
-    )
-    # ------------------------------------------------
-    # Filtrar por tipo de proveedor
-    # Similar al filtro de profesión: se incluye si coincide o si no se especifica
-    # ------------------------------------------------
-    qs = qs.filter(
-        Q(id_type_provider=provider.type_provider) | Q(id_type_provider__isnull=True)
+    El cruce se resuelve sobre el índice materializado (petitions.matching),
+    sin JOIN entre categorías, ciudades y direcciones.
+    """
+    return get_petition_list_queryset().filter(
+        id_petition__in=Subquery(matching.petition_ids_for_provider(provider))
     )
-    # ------------------------------------------------
-    # Filtrar por categorías del proveedor
-    # Si el proveedor tiene categorías asignadas, la petición debe tener al menos una coincidencia
-    # ------------------------------------------------
-    if provider.categories.exists():
-        qs = qs.filter(categories__in=provider.categories.all())
-
-    # ------------------------------------------------
-    # Filtrar por zonas geográficas (ciudades del proveedor)
-    # Solo se incluyen las peticiones cuyo cliente está en alguna de las ciudades del proveedor
-    # ------------------------------------------------
-    if provider.cities.exists():
-        customer_ids = Customer.objects.filter(
-            address__city__in=provider.cities.all()
-        ).values('id_customer')
-        qs = qs.filter(id_customer__in=Subquery(customer_ids))
-    return qs.distinct() # aca recien se ejecuta la consulta
-
-    """
-    SELECT DISTINCT *
-    FROM petition
-
-    WHERE
-        (id_profession = :provider_profession OR id_profession IS NULL)
-    AND (id_type_provider = :provider_type OR id_type_provider IS NULL)
-    AND (petition.category_id IN (...categorías del provider...))
-    AND (id_customer IN (SELECT id_customer FROM customers WHERE city_id IN (...)))
 
     """
+    SELECT *
+    FROM petition
+    WHERE id_petition IN (
+        SELECT id_petition FROM n_petition_match_index
+        WHERE (id_profession = :provider_profession OR id_profession IS NULL)
+        AND (id_type_provider = :provider_type OR id_type_provider IS NULL)
+        AND id_category IN (...categorías del provider...)
+        AND id_city IN (...ciudades del provider...)
+    )
+    """
 
 
 # ====================================================
@@ -140,32 +121,219 @@ def filter_providers_for_petition(petition):
     3. Coincidencia de tipo de proveedor: si la petición requiere uno, el proveedor debe coincidir.
     4. Coincidencia de categorías: si la petición tiene categorías, el proveedor debe tener al menos una.
     5. Coincidencia geográfica: el cliente de la petición debe estar en una de las ciudades del proveedor.
+
+    El cruce se resuelve sobre el índice materializado (petitions.matching).
     """
-    providers = Provider.objects.filter(user__is_active=True)
+    provider_ids = matching.provider_ids_for_petition(petition)
+    if provider_ids is None:
+        # Si el cliente no existe, no se puede filtrar por ubicación,
+        # se devuelve un queryset vacío para no notificar a nadie.
+        return Provider.objects.none()
 
-    # 1. Filtrar por profesión
-    if petition.id_profession:
-        providers = providers.filter(profession=petition.id_profession)
+    return Provider.objects.filter(
+        user__is_active=True,
+        id_provider__in=Subquery(provider_ids),
+    ).select_related('user')
 
-    # 2. Filtrar por tipo de proveedor
-    if petition.id_type_provider:
-        providers = providers.filter(type_provider=petition.id_type_provider)
 
-    # 3. Filtrar por categorías
-    petition_categories = petition.categories.all()
-    if petition_categories.exists():
-        providers = providers.filter(categories__in=petition_categories)
+# ====================================================
+# ESCRITURA: relaciones anidadas de una petición
+# ====================================================
+"""
+Las categorías, materiales y adjuntos de una petición se escriben con un
+diff contra lo que ya existe: solo se insertan (bulk_create) las filas
+nuevas, se actualizan (bulk_update) las que cambiaron y se eliminan las que
+ya no vienen. Las vistas llaman a estas funciones dentro de la misma
+transacción que guarda la petición.
+"""
+def request_list(data, field):
+    """
+    Valores de un campo de la petición como lista: getlist() en FormData
+    (QueryDict); en un cuerpo JSON (dict) la lista tal cual, un valor suelto
+    envuelto en una lista, o una lista vacía si el campo no viene.
+    """
+    if field not in data:
+        return []
+    if hasattr(data, "getlist"):
+        return data.getlist(field)
+    value = data.get(field)
+    if value is None:
+        return []
+    return value if isinstance(value, (list, tuple)) else [value]
+
 
-    # 4. Filtrar por zona geográfica
+def _parse_int(value, field):
     try:
-        customer = Customer.objects.get(id_customer=petition.id_customer)
-        if customer.address and customer.address.city:
-            customer_city = customer.address.city
-            # Filtra proveedores que tienen la ciudad del cliente en sus zonas de trabajo
-            providers = providers.filter(cities=customer_city)
-    except Customer.DoesNotExist:
-        # Si el cliente no existe, no se puede filtrar por ubicación,
-        # se devuelve un queryset vacío para no notificar a nadie.
-        return Provider.objects.none()
+        return int(value)
+    except (TypeError, ValueError):
+        raise serializers.ValidationError({field: f"Valor inválido: {value!r}."})
+
+
+def parse_category_ids(values):
+    """
+    Normaliza la lista de categorías recibida (ints, strings de FormData
+    o dicts con id_category) a un conjunto de ids.
+    Un valor no numérico es un error de validación (400).
+    """
+    category_ids = set()
+    for cat in values:
+        if isinstance(cat, dict):
+            cat = cat.get("id_category")
+        if cat not in (None, ""):
+            category_ids.add(_parse_int(cat, "categories"))
+    return category_ids
+
+
+def parse_attachment_ids(values):
+    """Ids de adjuntos a conservar (keep_attachments); ignora los vacíos."""
+    return {_parse_int(value, "keep_attachments") for value in values if value not in (None, "")}
 
-    return providers.distinct().select_related('user')
+
+def parse_materials(value):
+    """
+    Normaliza los materiales recibidos (lista o JSON en FormData) a
+    {id_article: (quantity, unit_price)}. Si un artículo se repite, vale el último.
+    Un JSON mal formado o un material incompleto es un error de validación (400).
+    """
+    if isinstance(value, str):
+        try:
+            value = json.loads(value) if value.strip() else []
+        except ValueError:
+            raise serializers.ValidationError({"materials": "JSON inválido."})
+    if value is None:
+        return {}
+    if not isinstance(value, list):
+        raise serializers.ValidationError({"materials": "Debe ser una lista."})
+
+    materials = {}
+    for mat in value:
+        if not isinstance(mat, dict):
+            raise serializers.ValidationError({"materials": "Cada material debe ser un objeto."})
+        id_article = _parse_int(mat.get("id_article"), "materials")
+        quantity = _parse_int(mat.get("quantity"), "materials")
+        try:
+            unit_price = Decimal(str(mat.get("unit_price")))
+        except InvalidOperation:
+            unit_price = None
+        if unit_price is None or not unit_price.is_finite():
+            raise serializers.ValidationError(
+                {"materials": f"unit_price inválido: {mat.get('unit_price')!r}."}
+            )
+        materials[id_article] = (quantity, unit_price)
+    return materials
+
+
+def sync_petition_categories(petition, category_ids):
+    """Deja a la petición exactamente con las categorías indicadas."""
+    existing = set(
+        PetitionCategory.objects.filter(id_petition=petition).values_list('id_category_id', flat=True)
+    )
+    removed = existing - category_ids
+    added = category_ids - existing
+
+    if removed:
+        PetitionCategory.objects.filter(id_petition=petition, id_category_id__in=removed).delete()
+    if added:
+        PetitionCategory.objects.bulk_create([
+            PetitionCategory(id_petition=petition, id_category_id=id_category)
+            for id_category in sorted(added)
+        ])
+        # bulk_create no dispara señales: se reindexa explícitamente
+        matching.schedule_petition(petition.id_petition)
+
+
+def sync_petition_materials(petition, materials, user_id):
+    """
+    Deja a la petición exactamente con los materiales indicados
+    ({id_article: (quantity, unit_price)}), reutilizando las filas existentes.
+    """
+    existing = {
+        material.id_article: material
+        for material in PetitionMaterial.objects.filter(id_petition=petition)
+    }
+
+    removed = [material.pk for id_article, material in existing.items() if id_article not in materials]
+    if removed:
+        PetitionMaterial.objects.filter(pk__in=removed).delete()
+
+    changed, added = [], []
+    for id_article, (quantity, unit_price) in materials.items():
+        material = existing.get(id_article)
+        if material is None:
+            added.append(PetitionMaterial(
+                id_petition=petition,
+                id_article=id_article,
+                quantity=quantity,
+                unit_price=unit_price,
+                id_user_create=user_id
+            ))
+            continue
+        if (material.quantity, material.unit_price) != (quantity, unit_price):
+            material.quantity = quantity
+            material.unit_price = unit_price
+            material.id_user_update = user_id
+            changed.append(material)
+
+    if changed:
+        PetitionMaterial.objects.bulk_update(changed, ['quantity', 'unit_price', 'id_user_update'])
+    if added:
+        PetitionMaterial.objects.bulk_create(added)
+
+
+def sync_petition_attachments(petition, files, user_id, keep_ids=None):
+    """
+    Sincroniza los adjuntos con los archivos recibidos. Un adjunto existente
+    se conserva sin reescribir el archivo si está en keep_ids o si se vuelve
+    a subir el mismo contenido (mismo blob; para archivos anteriores a la
+    deduplicación, mismo nombre y tamaño); el resto se elimina y solo los
+    archivos nuevos se guardan en el storage.
+    """
+    keep_ids = set(keep_ids or [])
+    pending = list(files)
+    blob_names = {}
+
+    def blob_name(upload):
+        if id(upload) not in blob_names:
+            blob_names[id(upload)] = content_addressed_storage.name_for(upload)
+        return blob_names[id(upload)]
+
+    removed = []
+    for attachment in PetitionAttachment.objects.filter(id_petition=petition):
+        if attachment.pk in keep_ids:
+            continue
+        if blobs.is_blob(attachment.file.name):
+            same = next((u for u in pending if blob_name(u) == attachment.file.name), None)
+        else:
+            same = next((
+                upload for upload in pending
+                if upload.name == os.path.basename(attachment.file.name)
+                and _stored_size(attachment) == upload.size
+            ), None)
+        if same is not None:
+            pending.remove(same)
+        else:
+            removed.append(attachment.pk)
+
+    if removed:
+        PetitionAttachment.objects.filter(pk__in=removed).delete()
+    add_petition_attachments(petition, pending, user_id)
+
+
+def add_petition_attachments(petition, files, user_id):
+    """Guarda los archivos como adjuntos nuevos de la petición en un solo INSERT."""
+    if files:
+        attachments = PetitionAttachment.objects.bulk_create([
+            PetitionAttachment(id_petition=petition, file=upload, id_user_create=user_id)
+            for upload in files
+        ])
+        # bulk_create no dispara post_save: referencias a los blobs y derivados a mano
+        blobs.acquire([attachment.file.name for attachment in attachments])
+        for attachment in attachments:
+            derivatives.schedule('petitions.PetitionAttachment', attachment.file.name)
+
+
+def _stored_size(attachment):
+    try:
+        return attachment.file.size
+    except (OSError, ValueError):
+        return None
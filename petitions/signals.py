@@ -1,4 +1,4 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save, pre_save, post_delete, m2m_changed
 """
 post_save → se dispara después de guardar un objeto.
 
@@ -7,11 +7,15 @@ pre_save → se dispara antes de guardar un objeto.
 post_delete → se dispara cuando se borra un objeto.
 
 """
+from django.db import transaction
 from django.dispatch import receiver
 from notifications.services import notification_service
-from .models import Petition
-from .services import filter_providers_for_petition
-from authentication.models import Customer, Provider
+from . import matching
+from .models import Petition, PetitionCategory
+from .tasks import notify_providers_new_petition
+from authentication.models import Customer, Provider, ProviderCategory
+from locations.models import Address
+from locations.signals import service_area_changed
 
 
 
@@ -28,26 +32,15 @@ def notify_on_petition_created(sender, instance, created, **kwargs):
     
     Se dispara automáticamente después de guardar una instancia de Petition.
     Solo se ejecuta si la petición es recién creada (created=True).
+
+    El envío se delega a Celery (notify_providers_new_petition) una vez
+    confirmada la transacción, por lo que la request no depende de la
+    cantidad de proveedores que coinciden con la petición.
     """
     if created:
         print(f"SIGNAL: 'notify_on_petition_created' disparado para la petición: '{instance.description}'")
-        # Obtener solo los proveedores que coinciden con el perfil de la petición
-        providers = filter_providers_for_petition(instance)
-        
-        print(f"SIGNAL: Se notificarán a {providers.count()} proveedores.")
-        for provider in providers:
-            notification_service.send_notification(
-                user_id=provider.user.id_user,
-                title="Nueva petición disponible",
-                message=f"Se ha publicado una nueva petición: '{instance.description}'",
-                notification_type='petition_created',
-                related_petition_id=instance.id_petition,
-                metadata={
-                    'petition_id': instance.id_petition,
-                    'petition_description': instance.description,
-                    'petition_type': 'new_petition'
-                }
-            )
+        petition_id = instance.id_petition
+        transaction.on_commit(lambda: notify_providers_new_petition.delay(petition_id))
 
 # ====================================================
 # SIGNAL: notify_on_petition_closed
@@ -58,14 +51,12 @@ def notify_on_petition_closed(sender, instance, **kwargs):
     Notificar cuando una petición se cierra.
     
     Se dispara antes de guardar una instancia de Petition.
-    Compara el estado anterior de la petición para detectar cierre.
+    Compara el estado anterior de la petición (FieldTrackerMixin) para detectar cierre.
     """
     if instance.pk:  # Solo para peticiones existentes
         try:
-            old_instance = Petition.objects.get(pk=instance.pk)
-            
-            # Verificar si la petición se está cerrando
-            if old_instance.is_deleted and not instance.is_deleted:
+            # Verificar si la petición se está cerrando (valor previo sin consultar la base)
+            if instance.previous_value('is_deleted') and not instance.is_deleted:
                 # Notificar al customer
                 customer = Customer.objects.get(id_customer=instance.id_customer)
                 notification_service.send_notification(
@@ -104,5 +95,83 @@ def notify_on_petition_closed(sender, instance, **kwargs):
                         }
                     )
                     
-        except (Petition.DoesNotExist, Customer.DoesNotExist, Provider.DoesNotExist):
+        except (Customer.DoesNotExist, Provider.DoesNotExist):
             return
+
+
+# ====================================================
+# SIGNALS: mantenimiento del índice de matching
+# ====================================================
+"""
+Mantienen actualizado el índice materializado de petitions.matching.
+Cada cambio en los datos de origen agenda la reindexación de la petición o
+del proveedor afectado; se ejecuta una sola vez al confirmar la transacción.
+"""
+@receiver(post_save, sender=Petition)
+def index_petition_on_save(sender, instance, **kwargs):
+    """Reindexa la petición al crearla, editarla o eliminarla (soft delete)."""
+    matching.schedule_petition(instance.id_petition)
+
+
+@receiver([post_save, post_delete], sender=PetitionCategory)
+def index_petition_on_category_change(sender, instance, **kwargs):
+    """Reindexa la petición cuando se agregan o quitan categorías."""
+    matching.schedule_petition(instance.id_petition_id)
+
+
+@receiver(m2m_changed, sender=Petition.categories.through)
+def index_petition_on_categories_set(sender, instance, action, reverse, pk_set, **kwargs):
+    """Reindexa peticiones cuando sus categorías cambian vía petition.categories.set()."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        matching.schedule_petition(instance.pk)
+    else:
+        for petition_id in pk_set or []:
+            matching.schedule_petition(petition_id)
+
+
+@receiver(post_save, sender=Provider)
+def index_provider_on_save(sender, instance, **kwargs):
+    """Reindexa el proveedor al cambiar su perfil (profesión, tipo de proveedor)."""
+    matching.schedule_provider(instance.id_provider)
+
+
+@receiver([post_save, post_delete], sender=ProviderCategory)
+def index_provider_on_relation_change(sender, instance, **kwargs):
+    """Reindexa el proveedor cuando cambian sus categorías."""
+    matching.schedule_provider(instance.provider_id)
+
+
+@receiver(service_area_changed)
+def index_provider_on_cities_change(sender, provider_id, **kwargs):
+    """Reindexa el proveedor una vez por sincronización de sus ciudades."""
+    matching.schedule_provider(provider_id)
+
+
+@receiver(m2m_changed, sender=Provider.categories.through)
+@receiver(m2m_changed, sender=Provider.cities.through)
+def index_provider_on_m2m_set(sender, instance, action, reverse, pk_set, **kwargs):
+    """Reindexa proveedores cuando sus categorías o ciudades cambian vía .set()/.add()."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        matching.schedule_provider(instance.pk)
+    else:
+        for provider_id in pk_set or []:
+            matching.schedule_provider(provider_id)
+
+
+@receiver(post_save, sender=Customer)
+def index_customer_petitions_on_save(sender, instance, **kwargs):
+    """Reindexa las peticiones del cliente (su dirección define la ciudad)."""
+    matching.schedule_customer(instance.id_customer)
+
+
+@receiver(post_save, sender=Address)
+def index_customer_petitions_on_address_save(sender, instance, created, **kwargs):
+    """Reindexa las peticiones de los clientes cuya dirección cambió de ciudad."""
+    if created:
+        return
+    for customer_id in Customer.objects.filter(address=instance).values_list('id_customer', flat=True):
+        matching.schedule_customer(customer_id)
@@ -0,0 +1,52 @@
+from celery import shared_task, group
+from django.conf import settings
+
+from notifications.tasks import send_notification_batch
+from .models import Petition
+from .services import filter_providers_for_petition
+
+
+# ====================================================
+# TAREA: notify_providers_new_petition
+# ====================================================
+@shared_task
+def notify_providers_new_petition(petition_id):
+    """
+    Notifica a los proveedores compatibles que se publicó una nueva petición.
+
+    Calcula los usuarios de los proveedores que coinciden con la petición,
+    los divide en lotes de NOTIFICATION_BATCH_SIZE y despacha un
+    send_notification_batch por lote en paralelo (celery.group).
+
+    Retorna la cantidad de proveedores a notificar.
+    """
+    petition = Petition.objects.filter(pk=petition_id).first()
+    if petition is None:
+        return 0
+
+    user_ids = list(
+        filter_providers_for_petition(petition).values_list('user_id', flat=True)
+    )
+    if not user_ids:
+        return 0
+
+    batch_size = getattr(settings, 'NOTIFICATION_BATCH_SIZE', 500)
+    batches = [user_ids[i:i + batch_size] for i in range(0, len(user_ids), batch_size)]
+
+    group(
+        send_notification_batch.s(
+            batch,
+            title="Nueva petición disponible",
+            message=f"Se ha publicado una nueva petición: '{petition.description}'",
+            notification_type='petition_created',
+            related_petition_id=petition.id_petition,
+            metadata={
+                'petition_id': petition.id_petition,
+                'petition_description': petition.description,
+                'petition_type': 'new_petition'
+            }
+        )
+        for batch in batches
+    ).apply_async()
+
+    return len(user_ids)
@@ -1,23 +1,33 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from rest_framework.permissions import IsAuthenticated
 
-from .services import filter_petitions_for_provider, get_petition_detail_queryset, get_petition_list_queryset
-from .models import (
-    Petition,
-    PetitionAttachment,
-    PetitionCategory,
-    PetitionMaterial,
-    TypePetition
+from .services import (
+    add_petition_attachments,
+    filter_petitions_for_provider,
+    get_petition_detail_queryset,
+    get_petition_list_queryset,
+    parse_attachment_ids,
+    parse_category_ids,
+    parse_materials,
+    request_list,
+    sync_petition_attachments,
+    sync_petition_categories,
+    sync_petition_materials
 )
+from .models import Petition
 from .serializers import (
     PetitionSerializer,
     PetitionListSerializer,
+    PetitionListValuesSerializer,
     TypePetitionSerializer
 )
 from authentication.models import Provider
+from integracion_comunitaria.pagination import DateCreateCursorPagination, paginated_response
+from integracion_comunitaria.registry import registry_response
 
 
 # ====================================================
@@ -26,13 +36,11 @@ from authentication.models import Provider
 class TypePetitionAPIView(APIView):
     """
     APIView para listar todos los tipos de peticiones.
-    GET: devuelve todos los registros de TypePetition.
+    GET: devuelve todos los registros de TypePetition (desde el registro de catálogos).
     """
     def get(self, request):
-        typePetition = TypePetition.objects.all()
-        serializer = TypePetitionSerializer(typePetition, many=True)
-        
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # Servido desde el registro en memoria, con ETag / 304
+        return registry_response(request, 'type_petition', TypePetitionSerializer)
 
 
 # ====================================================
@@ -88,8 +96,9 @@ class PetitionAPIView(APIView):
             else:
                 return Response({'detail': 'El usuario no tiene un perfil válido.'}, status=status.HTTP_403_FORBIDDEN)
             
-            serializer = serializer_class(petitions, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return paginated_response(request, petitions, serializer_class,
+                                      DateCreateCursorPagination, view=self,
+                                      values_serializer_class=PetitionListValuesSerializer)
         
     def post(self, request):
         """
@@ -101,43 +110,19 @@ class PetitionAPIView(APIView):
         serializer = PetitionSerializer(data=request.data)
 
         if serializer.is_valid():
-            petition = serializer.save(
-                id_customer=request.user.customer.id_customer,
-                id_user_create=request.user.id_user
-            )
-
-            # Crear categorías - CORRECCIÓN: usar getlist() para obtener todos los valores
-            categories_list = request.data.getlist("categories")  # Cambio aquí
-            for cat in categories_list:
-                # cat viene como string desde FormData, convertir a int
-                id_category = int(cat) if isinstance(cat, str) else cat
-                if isinstance(cat, dict):
-                    id_category = int(cat.get("id_category")) if cat.get("id_category") else None
-                
-                if id_category:
-                    PetitionCategory.objects.create(
-                        id_petition=petition,
-                        id_category_id=id_category
-                    )
-
-            # Crear adjuntos
-            for att in request.FILES.getlist("attachments"):
-                PetitionAttachment.objects.create(
-                    id_petition=petition,
-                    file=att,
-                    #type=None,  # si tenés un campo type, enviarlo como input adicional
-                    id_user_create=request.user.pk
-                )
-
-            # Crear materiales si vienen en JSON
-            for mat in request.data.get("materials", []):
-                PetitionMaterial.objects.create(
-                    id_petition=petition,
-                    id_article=mat.get("id_article"),
-                    quantity=mat.get("quantity"),
-                    unit_price=mat.get("unit_price"),
-                    id_user_create=request.user.id
+            # Se validan antes de escribir: un valor inválido responde 400
+            category_ids = parse_category_ids(request_list(request.data, "categories"))
+            materials = parse_materials(request.data.get("materials", []))
+
+            with transaction.atomic():
+                petition = serializer.save(
+                    id_customer=request.user.customer.id_customer,
+                    id_user_create=request.user.id_user
                 )
+                # Categorías, adjuntos y materiales: un INSERT por tipo
+                sync_petition_categories(petition, category_ids)
+                add_petition_attachments(petition, request.FILES.getlist("attachments"), request.user.pk)
+                sync_petition_materials(petition, materials, request.user.pk)
 
             return Response(PetitionSerializer(petition).data, status=status.HTTP_201_CREATED)
         print('errores del serializador ', serializer.errors)
@@ -146,56 +131,39 @@ class PetitionAPIView(APIView):
 
     def patch(self, request, pk):
         """
-        PATCH: Actualizar una petición existente y sus relaciones anidadas
+        PATCH: Actualizar una petición existente y sus relaciones anidadas.
+        Solo se insertan o eliminan las categorías, materiales y adjuntos que
+        cambiaron; keep_attachments (ids) conserva adjuntos sin volver a subirlos.
         """
         petition = get_object_or_404(Petition, pk=pk)
         serializer = PetitionSerializer(petition, data=request.data, partial=True)
         if serializer.is_valid():
-            petition = serializer.save(id_user_update=request.user.id_user)
-
-            # Actualizar categorías - CORRECCIÓN: usar getlist()
-            if "categories" in request.data:
-                PetitionCategory.objects.filter(id_petition=petition).delete()
-                categories_list = request.data.getlist("categories")  # Cambio aquí
-                for cat in categories_list:
-                    # Convertir string a int si es necesario
-                    if isinstance(cat, str):
-                        id_category = int(cat)
-                    elif isinstance(cat, dict):
-                        id_category = int(cat.get("id_category")) if cat.get("id_category") else None
-                    else:
-                        id_category = int(cat) if cat else None
-                    
-                    if id_category:
-                        PetitionCategory.objects.create(
-                            id_petition=petition,
-                            id_category_id=id_category
-                        )
-
-
-            # Actualizar adjuntos
-            if "attachments" in request.FILES:
-                PetitionAttachment.objects.filter(id_petition=petition).delete()
-                for att in request.FILES.getlist("attachments"):
-                    PetitionAttachment.objects.create(
-                        id_petition=petition,
-                        file=att,
-                        id_user_create=request.user.pk
-                    )
+            # Se validan antes de escribir: un valor inválido responde 400
+            category_ids = (
+                parse_category_ids(request_list(request.data, "categories")) if "categories" in request.data else None
+            )
+            keep_ids = parse_attachment_ids(request_list(request.data, "keep_attachments"))
+            materials = (
+                parse_materials(request.data.get("materials", [])) if "materials" in request.data else None
+            )
+
+            with transaction.atomic():
+                petition = serializer.save(id_user_update=request.user.id_user)
 
-            # Actualizar materiales
-            if "materials" in request.data:
-                PetitionMaterial.objects.filter(id_petition=petition).delete()
-                materials_list = request.data.get("materials", [])
-                for mat in materials_list:
-                    PetitionMaterial.objects.create(
-                        id_petition=petition,
-                        id_article=mat.get("id_article"),
-                        quantity=mat.get("quantity"),
-                        unit_price=mat.get("unit_price"),
-                        id_user_create=request.user.pk
+                if category_ids is not None:
+                    sync_petition_categories(petition, category_ids)
+
+                if "attachments" in request.FILES or "keep_attachments" in request.data:
+                    sync_petition_attachments(
+                        petition,
+                        request.FILES.getlist("attachments"),
+                        request.user.pk,
+                        keep_ids=keep_ids
                     )
 
+                if materials is not None:
+                    sync_petition_materials(petition, materials, request.user.pk)
+
             return Response(PetitionSerializer(petition).data, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -221,6 +189,6 @@ class ProviderPetitionsFeedAPIView(APIView):
             return Response({'detail': 'El usuario no es un proveedor'}, status=status.HTTP_403_FORBIDDEN)
 
         petitions = filter_petitions_for_provider(provider)
-        serializer = PetitionListSerializer(petitions, many=True)
-
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return paginated_response(request, petitions, PetitionListSerializer,
+                                  DateCreateCursorPagination, view=self,
+                                  values_serializer_class=PetitionListValuesSerializer)
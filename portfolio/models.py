@@ -1,5 +1,7 @@
 from django.db import models
 
+from files.storage import content_addressed_storage
+
 
 # ====================================================
 # Modelo: Portfolio
@@ -56,7 +58,7 @@ class PortfolioAttachment(models.Model):
         db_column='id_portfolio',
         related_name='attachments'
     )
-    file = models.FileField(upload_to='portfolio_attachments/')
+    file = models.FileField(upload_to='portfolio_attachments/', storage=content_addressed_storage)
     file_type = models.CharField(
         max_length=10,
         choices=FileType.choices,
@@ -114,7 +116,7 @@ class MaterialAttachment(models.Model):
         db_column='id_material',
         related_name='material_attachments'
     )
-    file = models.FileField(upload_to='material_attachments/')
+    file = models.FileField(upload_to='material_attachments/', storage=content_addressed_storage)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     id_user_upload = models.IntegerField(null=True, blank=True)
     is_deleted = models.BooleanField(default=False)
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from .models import Portfolio, PortfolioAttachment, Material, MaterialAttachment
 from postulations.models import PostulationMaterial
+from integracion_comunitaria.values_serializers import ValuesSerializer
+from files.derivatives import derivatives
 
 # ====================================================
 # Serializer: PortfolioAttachmentSerializer
@@ -9,11 +11,17 @@ class PortfolioAttachmentSerializer(serializers.ModelSerializer):
     """
     Serializador para los archivos adjuntos de un portafolio.
     Permite convertir los objetos PortfolioAttachment a JSON y viceversa.
+    variants: URLs de las versiones redimensionadas (el original mientras no estén listas).
     """
+    variants = serializers.SerializerMethodField()
+
     class Meta:
         model = PortfolioAttachment
         fields = '__all__'
 
+    def get_variants(self, obj):
+        return derivatives.variants(obj.file.name) if obj.file else None
+
 # ====================================================
 # Serializer: PortfolioSerializer
 # ====================================================
@@ -47,11 +55,17 @@ class MaterialAttachmentSerializer(serializers.ModelSerializer):
     """
     Serializador para los archivos asociados a materiales.
     Permite CRUD sobre MaterialAttachment.
+    variants: URLs de las versiones redimensionadas (el original mientras no estén listas).
     """
+    variants = serializers.SerializerMethodField()
+
     class Meta:
         model = MaterialAttachment
         fields = '__all__'
 
+    def get_variants(self, obj):
+        return derivatives.variants(obj.file.name) if obj.file else None
+
 
 
 class PostulationMaterialSerializer(serializers.ModelSerializer):
@@ -86,3 +100,24 @@ class PostulationMaterialSerializer(serializers.ModelSerializer):
                 'category': getattr(material, 'category', None),
             }
         return None
+
+
+# ====================================================
+# Serializer: PostulationMaterialValuesSerializer
+# ====================================================
+class PostulationMaterialValuesSerializer(ValuesSerializer):
+    """
+    Versión de solo lectura de PostulationMaterialSerializer sobre filas .values().
+    """
+    serializer_class = PostulationMaterialSerializer
+    extra_lookups = ('id_material', 'id_material__name', 'id_material__description', 'id_material__unit')
+
+    def get_material(self, row):
+        # Material no tiene 'category': se mantiene la clave en None como el serializer original
+        return {
+            'id': row['id_material'],
+            'name': row['id_material__name'],
+            'description': row['id_material__description'],
+            'unit': row['id_material__unit'],
+            'category': None,
+        }
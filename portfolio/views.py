@@ -2,6 +2,9 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
+from integracion_comunitaria.pagination import (DateCreateCursorPagination,
+                                                PrimaryKeyCursorPagination,
+                                                paginated_response)
 
 from .models import Portfolio, PortfolioAttachment, Material, MaterialAttachment
 from .serializers import PortfolioSerializer, PortfolioAttachmentSerializer, MaterialSerializer, MaterialAttachmentSerializer
@@ -24,8 +27,8 @@ class PortfolioAPIView(APIView):
         else:
             portfolios = Portfolio.objects.all()
 
-        serializer = PortfolioSerializer(portfolios, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return paginated_response(request, portfolios, PortfolioSerializer,
+                                  DateCreateCursorPagination, view=self)
     
 
     def post(self, request):
@@ -54,8 +57,8 @@ class MaterialAPIView(APIView):
         else:
             materials = Material.objects.all()
 
-        serializer = MaterialSerializer(materials, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return paginated_response(request, materials, MaterialSerializer,
+                                  PrimaryKeyCursorPagination, view=self)
         
     
     def post(self, request):
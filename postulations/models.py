@@ -2,6 +2,8 @@ from django.utils import timezone
 from django.db import models
 from django.forms import ValidationError
 
+from integracion_comunitaria.registry import registry
+from integracion_comunitaria.tracking import FieldTrackerMixin
 from portfolio.models import Material
 from petitions.models import Petition
 
@@ -17,6 +19,12 @@ class PostulationState(models.Model):
     """
 
 
+    # Estados que usa la lógica de negocio: (nombre, id histórico de respaldo)
+    PENDING = ('Pendiente', 1)
+    APPROVED = ('Aprobada', 2)
+    REJECTED = ('Rechazada', 3)
+    WINNER = ('Ganadora', 4)
+
     id_state = models.AutoField(primary_key=True)
     name = models.CharField(max_length=50)
     description = models.CharField(max_length=255, null=True, blank=True)
@@ -28,11 +36,20 @@ class PostulationState(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def resolve(cls, state):
+        """
+        Retorna el id de uno de los estados de la clase (ej. PostulationState.PENDING)
+        a partir del registro en memoria, sin consultar la base.
+        """
+        name, default = state
+        return registry.table('postulation_state').id_for(name, default)
+
 
 # ==========================
 # MODELO: Postulation
 # ==========================
-class Postulation(models.Model):
+class Postulation(FieldTrackerMixin, models.Model):
 
     """
     Modelo central de postulaciones realizadas por proveedores
@@ -60,17 +77,28 @@ class Postulation(models.Model):
     date_update = models.DateTimeField(auto_now=True)
     is_deleted = models.BooleanField(default=False)
 
+    # Campos cuyo valor previo consultan las señales (postulations.signals)
+    tracked_fields = ('id_state', 'winner')
+
     class Meta:
         db_table = 'n_postulation'
         managed = False
-        
+        # Un proveedor postula una sola vez por petición. La tabla no es
+        # administrada: el índice se crea con
+        # postulations/sql/uniq_postulation_petition_provider.sql
+        constraints = [
+            models.UniqueConstraint(
+                fields=['id_petition', 'id_provider'],
+                name='uniq_postulation_petition_provider'
+            ),
+        ]
 
     def clean(self):
         """
-        Valida la consistencia y unicidad de la postulación antes de guardarla:
+        Valida la consistencia de la postulación antes de guardarla:
         - Verifica que la petición asociada exista.
         - Controla que las fechas de la petición permitan postularse.
-        - Impide duplicar postulaciones activas del mismo proveedor sobre la misma petición.
+        La unicidad (petición, proveedor) la validan PostulationSerializer y el índice único.
         """
         petition = self.id_petition
         
@@ -81,14 +109,6 @@ class Postulation(models.Model):
             raise ValidationError("La postulación aún no está habilitada.")
         if petition.date_until and today > petition.date_until:
             raise ValidationError("La postulacion ya cerró.")
-        
-        # validacion de unicidad entre postulaciones activas
-        if Postulation.objects.filter(
-            id_petition=self.id_petition_id,
-            id_provider=self.id_provider,
-            is_deleted = False
-        ).exclude(pk=self.pk).exists():
-            raise ValidationError("Ya tienes una postulación activa para esta petición.")
 
 
     def save(self, *args, **kwargs):
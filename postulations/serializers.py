@@ -1,3 +1,4 @@
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from .models import (
     Postulation,
@@ -6,6 +7,7 @@ from .models import (
     PostulationState
 )
 from petitions.models import Petition
+from integracion_comunitaria.values_serializers import ValuesSerializer
 
 # ==========================================
 # SERIALIZER: PetitionInfoSerializer
@@ -50,6 +52,11 @@ class PostulationBudgetSerializer(serializers.ModelSerializer):
         ]
 
 
+class PostulationBudgetValuesSerializer(ValuesSerializer):
+    """Versión de solo lectura de PostulationBudgetSerializer sobre filas .values()."""
+    serializer_class = PostulationBudgetSerializer
+
+
 # ==========================================
 # SERIALIZER: PostulationMaterialSerializer
 # ==========================================
@@ -106,6 +113,10 @@ class PostulationSerializer(serializers.ModelSerializer):
             'is_deleted',
             'petition'
         ]
+        # La unicidad (petición, proveedor) se valida en validate(); se omite
+        # UniqueTogetherValidator para no repetir la consulta.
+        validators = []
+
     # -----------------------------
     # Validaciones personalizadas
     # -----------------------------
@@ -113,39 +124,58 @@ class PostulationSerializer(serializers.ModelSerializer):
         """
         Valida que un proveedor no pueda postular más de una vez a la misma petición.
         Se omite esta validación si la instancia ya existe (update).
+        La tabla es no administrada: el índice único
+        uniq_postulation_petition_provider se crea a mano
+        (postulations/sql/uniq_postulation_petition_provider.sql) y, mientras
+        falte, esta consulta es la única protección contra duplicados.
         """
-        
         if self.instance:
-            return data  # Si es una actualización, no validamos esto
-        
-        id_petition = data.get('id_petition')
-        id_provider = data.get('id_provider')
+            return data
 
-        if Postulation.objects.filter(id_petition=id_petition, id_provider=id_provider).exists():
+        if Postulation.objects.filter(
+            id_petition=data.get('id_petition'),
+            id_provider=data.get('id_provider')
+        ).exists():
             raise serializers.ValidationError(
                 "El proveedor ya ha postulado a esta petición."
             )
-
         return data
 
+    # -----------------------------
+    # Método CREATE
+    # -----------------------------
     def create(self, validated_data):
-        print("Creando postulación con datos:", validated_data)
-        budgets_data = validated_data.pop('budgets', [])
-        materials_data = validated_data.pop('materials', [])
-
-        postulation = Postulation.objects.create(**validated_data)
-
-        # Crear presupuestos
-        for budget in budgets_data:
-            PostulationBudget.objects.create(id_postulation=postulation, **budget)
+        """
+        Crea la postulación y sus presupuestos y materiales en una sola
+        transacción, con un INSERT por tipo de relación.
+        Si otro pedido concurrente insertó la misma postulación, el índice
+        único rechaza el INSERT y se devuelve el mismo error de validación.
+        """
+        budgets_data = validated_data.pop('budgets', None) or []
+        materials_data = validated_data.pop('materials', None) or []
 
-        # Crear materiales
-        for material in materials_data:
-            PostulationMaterial.objects.create(id_postulation=postulation, **material)
+        try:
+            with transaction.atomic():
+                postulation = Postulation.objects.create(**validated_data)
+                PostulationBudget.objects.bulk_create([
+                    PostulationBudget(id_postulation=postulation, **budget)
+                    for budget in budgets_data
+                ])
+                PostulationMaterial.objects.bulk_create([
+                    PostulationMaterial(id_postulation=postulation, **material)
+                    for material in materials_data
+                ])
+        except IntegrityError:
+            if Postulation.objects.filter(
+                id_petition=validated_data.get('id_petition'),
+                id_provider=validated_data.get('id_provider')
+            ).exists():
+                raise serializers.ValidationError(
+                    "El proveedor ya ha postulado a esta petición."
+                )
+            raise
 
         return postulation
-    
-
 
     # -----------------------------
     # Método UPDATE
@@ -153,44 +183,74 @@ class PostulationSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         """
         Actualiza una postulación existente y sus relaciones anidadas (presupuestos y materiales).
-        Si un presupuesto/material tiene ID, se actualiza. Si no, se crea uno nuevo.
+        Cuando se envía la lista de presupuestos o materiales, se compara contra
+        los existentes (una consulta por relación): los que traen ID se actualizan,
+        los que no se crean y los que ya no vienen se eliminan.
         """
-        budgets_data = validated_data.pop('budgets', [])
-        materials_data = validated_data.pop('materials', [])
-
-        # Actualizamos campos de la postulación
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
-
-        # Actualizar/crear presupuestos
-        for budget in budgets_data:
-            budget_id = budget.get('id_budget', None)
-            if budget_id:
-                budget_obj = PostulationBudget.objects.get(pk=budget_id, id_postulation=instance)
-                for attr, value in budget.items():
-                    if attr != 'id_budget':
-                        setattr(budget_obj, attr, value)
-                budget_obj.save()
-            else:
-                PostulationBudget.objects.create(id_postulation=instance, **budget)
-
-        # Actualizar/crear materiales
-        for material in materials_data:
-            material_id = material.get('id_postulation_material', None)
-            if material_id:
-                material_obj = PostulationMaterial.objects.get(pk=material_id, id_postulation=instance)
-                for attr, value in material.items():
-                    if attr != 'id_postulation_material':
-                        setattr(material_obj, attr, value)
-                material_obj.save()
-            else:
-                PostulationMaterial.objects.create(id_postulation=instance, **material)
+        budgets_data = validated_data.pop('budgets', None)
+        materials_data = validated_data.pop('materials', None)
+
+        with transaction.atomic():
+            # Actualizamos campos de la postulación
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save()
+
+            if budgets_data is not None:
+                self._sync_children(instance, 'budgets', budgets_data, 'id_budget')
+            if materials_data is not None:
+                self._sync_children(instance, 'materials', materials_data, 'id_postulation_material')
 
         return instance
 
+    def _sync_children(self, instance, related_name, items, pk_name):
+        """
+        Aplica a una relación hija los conjuntos de inserción, actualización
+        y eliminación calculados a partir de los datos recibidos.
+        """
+        existing_qs = getattr(instance, related_name).all()
+        model = existing_qs.model
+        existing = {child.pk: child for child in existing_qs}
+
+        to_create, to_update, fields = [], [], set()
+        for item in items:
+            item = dict(item)
+            child_id = item.pop(pk_name, None)
+            if not child_id:
+                to_create.append(model(id_postulation=instance, **item))
+                continue
+            child = existing.pop(child_id, None)
+            if child is None:
+                raise serializers.ValidationError(
+                    {pk_name: f"{child_id} no pertenece a esta postulación."}
+                )
+            for attr, value in item.items():
+                setattr(child, attr, value)
+            fields.update(item)
+            to_update.append(child)
+
+        # Lo que quedó en existing no vino en la solicitud
+        if existing:
+            model.objects.filter(pk__in=existing.keys()).delete()
+        if to_update and fields:
+            model.objects.bulk_update(to_update, sorted(fields))
+        if to_create:
+            model.objects.bulk_create(to_create)
+
+        # Descarta la precarga para que la respuesta refleje los cambios
+        getattr(instance, '_prefetched_objects_cache', {}).pop(related_name, None)
 
 
+# ==========================================
+# SERIALIZER: PostulationValuesSerializer
+# ==========================================
+class PostulationValuesSerializer(ValuesSerializer):
+    """
+    Versión de solo lectura de PostulationSerializer sobre filas .values().
+    Misma salida JSON; presupuestos y materiales en una consulta cada uno.
+    """
+    serializer_class = PostulationSerializer
+
 
 # ===========================================
 # SERIALIZER: PostulationReadSerializer
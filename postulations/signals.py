@@ -2,6 +2,7 @@ from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from notifications.models import Notification
 from notifications.services import notification_service
+from integracion_comunitaria.registry import registry
 from .models import Postulation
 from petitions.models import Petition
 from authentication.models import Customer, Provider
@@ -57,7 +58,7 @@ def notify_on_state_change(sender, instance, **kwargs):
         → Detectar cambios en el estado de la postulación (id_state).
         → Notificar al proveedor (Provider) sobre el cambio.
     Flujo:
-        1. Se compara el estado anterior con el nuevo.
+        1. Se compara el estado anterior (registrado al cargar la instancia) con el nuevo.
         2. Si hay un cambio, se envía una notificación al proveedor.
         3. El tipo y contenido del mensaje dependen del nuevo estado:
             - 'Aceptada' → notificación de aceptación.
@@ -66,14 +67,11 @@ def notify_on_state_change(sender, instance, **kwargs):
     """
     if not instance.pk:
         return  # no existe aún, no hay estado previo
-    
-    try:
-        old_instance = Postulation.objects.get(pk=instance.pk)
-    except Postulation.DoesNotExist:
-        return
-    
-    if old_instance.id_state_id != instance.id_state_id:
+
+    # Estado previo guardado al cargar la instancia (FieldTrackerMixin)
+    if instance.has_changed('id_state'):
         # El estado cambió
+        old_state = registry.table('postulation_state').get(instance.previous_value('id_state'))
         try:
             provider = Provider.objects.get(id_provider=instance.id_provider)
             petition = Petition.objects.get(pk=instance.id_petition_id)
@@ -81,7 +79,7 @@ def notify_on_state_change(sender, instance, **kwargs):
             # Determinar el tipo de notificación según el nuevo estado
             notification_type = 'postulation_state_changed'
             title = "Actualización de tu postulación"
-            message = f"El estado de tu postulación para '{petition.description}' cambió de '{old_instance.id_state}' a '{instance.id_state}'."
+            message = f"El estado de tu postulación para '{petition.description}' cambió de '{old_state}' a '{instance.id_state}'."
             
             # Si el estado es "aceptada" o "rechazada", usar tipos específicos
             if instance.id_state.name.lower() in ['aceptada', 'aceptado', 'approved']:
@@ -103,7 +101,7 @@ def notify_on_state_change(sender, instance, **kwargs):
                 metadata={
                     'postulation_id': instance.id_postulation, # ID
                     'petition_id': instance.id_petition_id, # ID
-                    'old_state': str(old_instance.id_state),
+                    'old_state': str(old_state),
                     'new_state': str(instance.id_state)
                 }
             )
@@ -115,19 +113,23 @@ def notify_on_state_change(sender, instance, **kwargs):
 # SIGNAL: notify_on_postulation_winner
 # ====================================================
 @receiver(post_save, sender=Postulation)
-def notify_on_postulation_winner(sender, instance, **kwargs):
+def notify_on_postulation_winner(sender, instance, created, **kwargs):
     """
     Señal que se ejecuta luego de guardar una postulación (post_save).
     Objetivo:
         → Notificar al proveedor cuando su postulación es marcada como ganadora.
     Flujo:
-        1. Se verifica si el campo 'winner' está en True.
+        1. Se verifica si el campo 'winner' pasó a True en este guardado.
         2. Se obtiene el proveedor y la petición asociados.
         3. Se envía una notificación de tipo 'postulation_accepted'.
         4. Se marca la instancia temporalmente como notificada (_winner_notified)
            para evitar duplicados en ejecuciones múltiples del signal.
     """
-    if instance.winner and not getattr(instance, '_winner_notified', False):
+    if (
+        instance.winner
+        and (created or instance.has_changed('winner'))
+        and not getattr(instance, '_winner_notified', False)
+    ):
         try:
             provider = Provider.objects.get(id_provider=instance.id_provider)
             petition = Petition.objects.get(pk=instance.id_petition_id)
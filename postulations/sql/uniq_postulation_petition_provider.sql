@@ -0,0 +1,11 @@
+-- Un proveedor postula una sola vez por petición (Postulation.Meta.constraints).
+-- n_postulation no es administrada por Django: migrate no crea este índice.
+--
+-- Antes de aplicarlo, verificar que no haya duplicados:
+--   SELECT id_petition, id_provider, COUNT(*)
+--   FROM n_postulation
+--   GROUP BY id_petition, id_provider
+--   HAVING COUNT(*) > 1;
+
+ALTER TABLE n_postulation
+    ADD UNIQUE KEY uniq_postulation_petition_provider (id_petition, id_provider);
@@ -13,9 +13,12 @@ from .models import (
     PostulationBudget
 )
 from .serializers import (PostulationSerializer, 
+                            PostulationValuesSerializer,
                             PostulationReadSerializer, 
                             PostulationMaterialSerializer)
 from petitions.models import Petition
+from integracion_comunitaria.pagination import DateCreateCursorPagination, paginated_response
+from integracion_comunitaria.registry import registry
 
 # ====================================================
 # API VIEW: PostulationAPIView
@@ -59,10 +62,10 @@ class PostulationAPIView(APIView):
                         queryset=PostulationMaterial.objects.select_related('id_material')
                     ),
                 )
-                .order_by('-date_create')
             )
-            serializer = PostulationSerializer(postulations, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return paginated_response(request, postulations, PostulationSerializer,
+                                      DateCreateCursorPagination, view=self,
+                                      values_serializer_class=PostulationValuesSerializer)
 
         # --- Cliente ---
         elif customer:
@@ -88,10 +91,10 @@ class PostulationAPIView(APIView):
                         queryset=PostulationMaterial.objects.select_related('id_material')
                     ),
                 )
-                .order_by('-date_create')
             )
-            serializer = PostulationSerializer(postulations, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return paginated_response(request, postulations, PostulationSerializer,
+                                      DateCreateCursorPagination, view=self,
+                                      values_serializer_class=PostulationValuesSerializer)
 
         # Usuario sin rol válido
         return Response({"detail": "Usuario no válido."}, status=status.HTTP_403_FORBIDDEN)
@@ -184,7 +187,9 @@ class PostulationAPIView(APIView):
             if not new_state_id:
                 return Response({"detail": "Debe especificar id_state en el cuerpo de la solicitud."}, status=status.HTTP_400_BAD_REQUEST)
 
-            new_state = get_object_or_404(PostulationState, pk=new_state_id)
+            new_state = registry.table('postulation_state').get(new_state_id)
+            if new_state is None:
+                return Response({"detail": "Estado no encontrado."}, status=status.HTTP_404_NOT_FOUND)
             postulation.id_state = new_state
             postulation.id_user_update = request.user.id_user
             postulation.save(update_fields=["id_state", "id_user_update","date_update"])
@@ -341,18 +346,12 @@ class PostulationStatisticsAPIView(APIView):
             is_deleted=False
         )
 
-        # IDs de estados según la base de datos:
-        # 1: Pendiente
-        # 2: Aprobada
-        # 3: Rechazada
-        # 4: Ganadora
-        
-        # Contar por categorías usando IDs específicos
+        # Contar por estado (ids resueltos por nombre desde el registro de catálogos)
         total = postulations.count()
-        pending_count = postulations.filter(id_state_id=1).count()
-        approved_count = postulations.filter(id_state_id=2).count()
-        rejected_count = postulations.filter(id_state_id=3).count()
-        winner_count = postulations.filter(id_state_id=4).count()
+        pending_count = postulations.filter(id_state_id=PostulationState.resolve(PostulationState.PENDING)).count()
+        approved_count = postulations.filter(id_state_id=PostulationState.resolve(PostulationState.APPROVED)).count()
+        rejected_count = postulations.filter(id_state_id=PostulationState.resolve(PostulationState.REJECTED)).count()
+        winner_count = postulations.filter(id_state_id=PostulationState.resolve(PostulationState.WINNER)).count()
         
         # Contar por cada estado individual
         state_counts = postulations.values('id_state__name', 'id_state__id_state').annotate(
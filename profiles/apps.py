@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class ProfilesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'profiles'
+
+    def ready(self):
+        """
+        Importacion de las señales al iniciar la aplicacion y del registro
+        de catálogos (conecta su invalidación).
+        """
+        import profiles.signals
+        import integracion_comunitaria.registry
@@ -0,0 +1,48 @@
+from django.core.cache import cache
+from django.db import transaction
+
+"""
+Caché por usuario de la respuesta del dashboard.
+
+El resumen se guarda en la caché compartida con un TTL corto y se invalida
+desde las señales de postulaciones, peticiones y mensajes (profiles.signals)
+y desde las escrituras masivas que no disparan señales (ChatService.mark_as_read).
+Las notificaciones no leídas no se guardan aquí: se leen en cada request de
+unread_counter, que ya está en caché y siempre al día.
+"""
+
+
+# ====================================================
+# Caché del dashboard
+# ====================================================
+class DashboardCache:
+    """Resumen del dashboard por usuario, respaldado por la caché"""
+
+    key_template = 'dashboard:{user_id}'
+    timeout = 60
+
+    def _key(self, user_id):
+        return self.key_template.format(user_id=user_id)
+
+    def get(self, user_id):
+        """Retorna el resumen cacheado del usuario o None."""
+        return cache.get(self._key(user_id))
+
+    def set(self, user_id, data):
+        """Guarda el resumen del usuario."""
+        cache.set(self._key(user_id), data, self.timeout)
+
+    def invalidate(self, *user_ids):
+        """
+        Descarta el resumen de los usuarios indicados una vez confirmada la
+        transacción, para no recachear datos que todavía no son visibles.
+        """
+        keys = [self._key(user_id) for user_id in user_ids if user_id]
+        if keys:
+            transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+# ====================================================
+# Instancia global de la caché del dashboard
+# ====================================================
+dashboard_cache = DashboardCache()
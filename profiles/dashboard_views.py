@@ -2,22 +2,32 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Avg
+from django.db.models import Count, IntegerField, Q, Subquery, Value
 from django.utils import timezone
 
-from authentication.models import Provider, Customer
-from postulations.models import Postulation
+from authentication.models import User
+from postulations.models import Postulation, PostulationState
 from petitions.models import Petition
-from grades.models import GradeProvider, GradeCustomer
-from notifications.models import Notification
-from chat.models import Conversation, Message
+from grades.aggregates import provider_rating
+from grades.models import GradeCustomer
+from notifications.counters import unread_counter
+from chat.models import Message
 from petitions.services import filter_petitions_for_provider
+from .dashboard_cache import dashboard_cache
 try:
     from offers.models import Offer
 except ImportError:
     Offer = None
 
 
+class SubqueryCount(Subquery):
+    """COUNT(*) de un queryset como subconsulta escalar (varios conteos en una sola consulta)."""
+    template = '(SELECT COUNT(*) FROM (%(subquery)s) AS _count)'
+    output_field = IntegerField()
+    # Un queryset vacío (.none()) no se compila: cuenta 0
+    empty_result_set_value = 0
+
+
 class DashboardAPIView(APIView):
     """
     API para obtener datos del dashboard según el rol del usuario.
@@ -29,102 +39,110 @@ class DashboardAPIView(APIView):
     def get(self, request):
         """
         Obtiene datos del dashboard según el rol del usuario autenticado.
+        El resumen se cachea por usuario (profiles.dashboard_cache); las
+        notificaciones no leídas se leen siempre de unread_counter.
         
         Returns:
             Response: Datos del dashboard personalizados por rol.
         """
-        provider = getattr(request.user, 'provider', None)
-        customer = getattr(request.user, 'customer', None)
+        user_id = request.user.id_user
+        data = dashboard_cache.get(user_id)
+
+        if data is None:
+            provider = getattr(request.user, 'provider', None)
+            customer = getattr(request.user, 'customer', None)
+
+            if provider:
+                data = self._get_provider_dashboard(request, provider)
+            elif customer:
+                data = self._get_customer_dashboard(request, customer)
+            else:
+                return Response(
+                    {"detail": "Usuario sin rol válido."},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            dashboard_cache.set(user_id, data)
+
+        data['summary']['communications']['unread_notifications'] = unread_counter.get(user_id)
+        return Response(data, status=status.HTTP_200_OK)
+
+    def _unread_messages_queryset(self, user):
+        """Mensajes recibidos y no leídos en las conversaciones del usuario"""
+        return Message.objects.filter(
+            conversation__participants=user,
+            read=False
+        ).exclude(sender=user)
 
-        if provider:
-            return self._get_provider_dashboard(request, provider)
-        elif customer:
-            return self._get_customer_dashboard(request, customer)
-        else:
-            return Response(
-                {"detail": "Usuario sin rol válido."},
-                status=status.HTTP_403_FORBIDDEN
-            )
+    def _unread_messages(self, user):
+        return self._unread_messages_queryset(user).count()
 
     def _get_provider_dashboard(self, request, provider):
-        """Dashboard para proveedores"""
-        # Estadísticas de postulaciones
+        """
+        Dashboard para proveedores.
+        Las postulaciones por estado salen de una sola agregación condicional;
+        las peticiones que coinciden, las ofertas activas y los mensajes sin
+        leer, de una consulta con subconsultas escalares sobre la fila del usuario.
+        """
         postulations = Postulation.objects.filter(
             id_provider=provider.id_provider,
             is_deleted=False
         )
-        
-        # IDs de estados según la base de datos:
-        # 1: Pendiente
-        # 2: Aprobada
-        # 3: Rechazada
-        # 4: Ganadora
-
-        total_postulations = postulations.count()
-        approved_count = postulations.filter(id_state_id=2).count()
-        pending_count = postulations.filter(id_state_id=1).count()
-        winner_count = postulations.filter(id_state_id=4).count()
-
-        # Calificaciones
-        provider_grades = GradeProvider.objects.filter(provider=request.user, is_visible=True)
-        avg_rating = provider_grades.aggregate(avg=Avg('rating'))['avg'] or 0
-        total_reviews = provider_grades.count()
+
+        def state_filter(state):
+            return Q(id_state_id=PostulationState.resolve(state))
+
+        postulation_stats = postulations.aggregate(
+            total=Count('id_postulation'),
+            approved=Count('id_postulation', filter=state_filter(PostulationState.APPROVED)),
+            pending=Count('id_postulation', filter=state_filter(PostulationState.PENDING)),
+            winners=Count('id_postulation', filter=state_filter(PostulationState.WINNER)),
+        )
 
         # Peticiones activas (para postular) que coinciden con el perfil del proveedor
-        # Se utiliza el filtro de petitions.services
-        active_petitions = filter_petitions_for_provider(provider).filter(
+        # Se resuelve sobre el índice de matching (petitions.services)
+        matching_petitions = filter_petitions_for_provider(provider).filter(
             date_until__gte=timezone.now().date()
-        ).count() # Se añade el filtro de fecha y se cuenta
+        )
 
-        # Mensajes no leídos
-        unread_messages = Message.objects.filter(
-            conversation__participants=request.user,
-            read=False
-        ).exclude(sender=request.user).count()
+        if Offer:
+            active_offers = SubqueryCount(
+                Offer.objects.filter(id_provider=provider.id_provider).values('offer_id')
+            )
+        else:
+            active_offers = Value(0, output_field=IntegerField())
 
-        # Notificaciones no leídas
-        unread_notifications = Notification.objects.filter(
-            user=request.user,
-            is_read=False
-        ).count()
+        counts = User.objects.filter(pk=request.user.pk).annotate(
+            active_petitions=SubqueryCount(matching_petitions.values('id_petition')),
+            active_offers=active_offers,
+            unread_messages=SubqueryCount(self._unread_messages_queryset(request.user).values('id_message')),
+        ).values('active_petitions', 'active_offers', 'unread_messages').get()
+
+        # Calificaciones (agregado precalculado del proveedor)
+        rating = provider_rating(request.user.id_user)
 
         # Postulaciones recientes (últimas 5)
         recent_postulations = postulations.order_by('-date_create')[:5].values(
             'id_postulation', 'id_petition', 'id_state__name', 'date_create', 'winner'
         )
 
-        # Ofertas activas
-        active_offers = 0
-        if Offer:
-            active_offers = Offer.objects.filter(
-                id_provider=provider.id_provider,
-                is_deleted=False
-            ).count()
-
-        return Response({
+        return {
             'role': 'provider',
             'summary': {
-                'postulations': {
-                    'total': total_postulations,
-                    'approved': approved_count,
-                    'pending': pending_count,
-                    'winners': winner_count,
-                },
+                'postulations': postulation_stats,
                 'ratings': {
-                    'average': round(float(avg_rating), 2),
-                    'total_reviews': total_reviews,
+                    'average': round(float(rating.average or 0), 2),
+                    'total_reviews': rating.total_count,
                 },
                 'opportunities': {
-                    'active_petitions': active_petitions,
-                    'active_offers': active_offers,
+                    'active_petitions': counts['active_petitions'],
+                    'active_offers': counts['active_offers'],
                 },
                 'communications': {
-                    'unread_messages': unread_messages,
-                    'unread_notifications': unread_notifications,
+                    'unread_messages': counts['unread_messages'],
                 }
             },
             'recent_postulations': list(recent_postulations),
-        }, status=status.HTTP_200_OK)
+        }
 
     def _get_customer_dashboard(self, request, customer):
         """Dashboard para clientes"""
@@ -134,32 +152,24 @@ class DashboardAPIView(APIView):
             is_deleted=False
         )
 
-        total_petitions = petitions.count()
-        active_petitions = petitions.filter(
-            date_until__gte=timezone.now().date()
-        ).count()
+        petition_stats = petitions.aggregate(
+            total=Count('id_petition'),
+            active=Count('id_petition', filter=Q(date_until__gte=timezone.now().date())),
+        )
 
-        # Postulaciones recibidas
-        all_postulations = Postulation.objects.filter(
-            id_petition__in=petitions.values_list('id_petition', flat=True),
+        # Postulaciones recibidas y pendientes de revisión
+        postulation_stats = Postulation.objects.filter(
+            id_petition__id_customer=customer.id_customer,
+            id_petition__is_deleted=False,
             is_deleted=False
+        ).aggregate(
+            total=Count('id_postulation'),
+            pending=Count('id_postulation', filter=Q(id_state_id=PostulationState.resolve(PostulationState.PENDING))),
         )
-        total_postulations_received = all_postulations.count()
 
         # Calificaciones dadas
-        customer_grades = GradeCustomer.objects.filter(customer=request.user, is_visible=True)
-        total_grades_given = customer_grades.count()
-
-        # Mensajes no leídos
-        unread_messages = Message.objects.filter(
-            conversation__participants=request.user,
-            read=False
-        ).exclude(sender=request.user).count()
-
-        # Notificaciones no leídas
-        unread_notifications = Notification.objects.filter(
-            user=request.user,
-            is_read=False
+        total_grades_given = GradeCustomer.objects.filter(
+            customer=request.user, is_visible=True
         ).count()
 
         # Peticiones recientes (últimas 5)
@@ -167,27 +177,23 @@ class DashboardAPIView(APIView):
             'id_petition', 'description', 'id_state__name', 'date_create', 'date_until'
         )
 
-        # Postulaciones pendientes de revisión (ID 1: Pendiente)
-        pending_review = all_postulations.filter(id_state_id=1).count()
-
-        return Response({
+        return {
             'role': 'customer',
             'summary': {
                 'petitions': {
-                    'total': total_petitions,
-                    'active': active_petitions,
-                    'pending_review': pending_review,
+                    'total': petition_stats['total'],
+                    'active': petition_stats['active'],
+                    'pending_review': postulation_stats['pending'],
                 },
                 'postulations': {
-                    'total_received': total_postulations_received,
+                    'total_received': postulation_stats['total'],
                 },
                 'ratings': {
                     'total_given': total_grades_given,
                 },
                 'communications': {
-                    'unread_messages': unread_messages,
-                    'unread_notifications': unread_notifications,
+                    'unread_messages': self._unread_messages(request.user),
                 }
             },
             'recent_petitions': list(recent_petitions),
-        }, status=status.HTTP_200_OK)
+        }
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 
 from authentication.models import User, Provider, Customer
+from files.derivatives import derivatives
 from locations.serializers import AddressSerializer
 from .models import Category, TypeProvider, Profession
 
@@ -14,10 +15,11 @@ class ProfileSerializer(serializers.ModelSerializer):
     junto con su imagen de perfil y dirección asociada.
     """
     profile_image = serializers.SerializerMethodField()  # <-- aquí
+    profile_image_variants = serializers.SerializerMethodField()
     address = AddressSerializer(read_only=True)
     class Meta:
         model = User
-        fields = ['name', 'lastname', 'email', 'profile_image', 'address']
+        fields = ['name', 'lastname', 'email', 'profile_image', 'profile_image_variants', 'address']
 
     def get_profile_image(self, obj):
         """
@@ -29,6 +31,22 @@ class ProfileSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.profile_image.url)
         return None
 
+    def get_profile_image_variants(self, obj):
+        """
+        URLs de las versiones redimensionadas de la imagen de perfil
+        ({tamaño: {'webp', 'jpeg'}}); el original mientras no estén listas.
+        """
+        if not obj.profile_image:
+            return None
+        request = self.context.get('request')
+        variants = derivatives.variants(obj.profile_image.name)
+        if request is None:
+            return variants
+        return {
+            size: {fmt: request.build_absolute_uri(url) for fmt, url in urls.items()}
+            for size, urls in variants.items()
+        }
+
 
 # ====================================
 # SERIALIZERS DE CATEGORIAS
@@ -0,0 +1,83 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from authentication.models import Customer, Provider
+from chat.models import Conversation, Message
+from grades.models import GradeCustomer, GradeProvider
+from petitions.models import Petition
+from postulations.models import Postulation
+from .dashboard_cache import dashboard_cache
+
+
+# ====================================================
+# SIGNAL: invalidate_dashboard_on_postulation
+# ====================================================
+@receiver(post_save, sender=Postulation)
+@receiver(post_delete, sender=Postulation)
+def invalidate_dashboard_on_postulation(sender, instance, **kwargs):
+    """
+    Invalida el dashboard del proveedor que postuló y del cliente dueño
+    de la petición cuando una postulación se crea, cambia o se elimina.
+    """
+    provider_user_id = (
+        Provider.objects.filter(id_provider=instance.id_provider)
+        .values_list('user_id', flat=True).first()
+    )
+    customer_user_id = (
+        Customer.objects.filter(
+            id_customer__in=Petition.objects.filter(pk=instance.id_petition_id).values('id_customer')
+        )
+        .values_list('user_id', flat=True).first()
+    )
+    dashboard_cache.invalidate(provider_user_id, customer_user_id)
+
+
+# ====================================================
+# SIGNAL: invalidate_dashboard_on_petition
+# ====================================================
+@receiver(post_save, sender=Petition)
+@receiver(post_delete, sender=Petition)
+def invalidate_dashboard_on_petition(sender, instance, **kwargs):
+    """
+    Invalida el dashboard del cliente dueño de la petición.
+    """
+    customer_user_id = (
+        Customer.objects.filter(id_customer=instance.id_customer)
+        .values_list('user_id', flat=True).first()
+    )
+    dashboard_cache.invalidate(customer_user_id)
+
+
+# ====================================================
+# SIGNAL: invalidate_dashboard_on_message
+# ====================================================
+@receiver(post_save, sender=Message)
+def invalidate_dashboard_on_message(sender, instance, created, **kwargs):
+    """
+    Invalida el dashboard de los destinatarios de un mensaje nuevo
+    (cambia su cantidad de mensajes no leídos).
+    """
+    if not created:
+        return
+    recipient_ids = (
+        Conversation.participants.through.objects
+        .filter(conversation_id=instance.conversation_id)
+        .exclude(user_id=instance.sender_id)
+        .values_list('user_id', flat=True)
+    )
+    dashboard_cache.invalidate(*recipient_ids)
+
+
+# ====================================================
+# SIGNAL: invalidate_dashboard_on_grade
+# ====================================================
+@receiver(post_save, sender=GradeProvider)
+@receiver(post_delete, sender=GradeProvider)
+@receiver(post_save, sender=GradeCustomer)
+@receiver(post_delete, sender=GradeCustomer)
+def invalidate_dashboard_on_grade(sender, instance, **kwargs):
+    """
+    Invalida el dashboard de ambos usuarios de una calificación
+    (cambian el promedio del proveedor y el total del cliente).
+    """
+    dashboard_cache.invalidate(instance.provider_id, instance.customer_id)
@@ -4,6 +4,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.core.exceptions import ObjectDoesNotExist
 from django.shortcuts import get_object_or_404
+from integracion_comunitaria.registry import registry_response
 from locations.models import Address
 from locations.serializers import AddressSerializer
 from .models import Category, TypeProvider, Profession
@@ -193,17 +194,32 @@ class ProfileDetailAPIView(APIView):
 # ====================================
 # VIEWSETS DE CATÁLOGOS
 # ====================================
-class CategoryViewSet(viewsets.ModelViewSet):
+class RegistryListMixin:
+    """
+    Sirve el listado desde el registro en memoria (integracion_comunitaria.registry)
+    con ETag: si el cliente ya tiene la versión vigente se responde 304.
+    Las escrituras del ModelViewSet invalidan el registro por señales.
+    """
+    registry_key = None
+
+    def list(self, request, *args, **kwargs):
+        return registry_response(request, self.registry_key, self.get_serializer_class())
+
+
+class CategoryViewSet(RegistryListMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    registry_key = 'category'
 
-class TypeProviderViewSet(viewsets.ModelViewSet):
+class TypeProviderViewSet(RegistryListMixin, viewsets.ModelViewSet):
     queryset = TypeProvider.objects.all()
     serializer_class = TypeProviderSerializer
+    registry_key = 'type_provider'
 
-class ProfessionViewSet(viewsets.ModelViewSet):
+class ProfessionViewSet(RegistryListMixin, viewsets.ModelViewSet):
     queryset = Profession.objects.all()
     serializer_class = ProfessionSerializer
+    registry_key = 'profession'
 
 
 # ====================================